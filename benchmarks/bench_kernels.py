@@ -0,0 +1,45 @@
+"""Compares the reference python loop kernels with the vectorized numpy kernels.
+
+The crankn rows compare the row by row Thomas solve with the cyclic reduction solve.
+
+Usage: python benchmarks/bench_kernels.py [steps]
+"""
+import sys
+from timeit import default_timer as timer
+import numpy as np
+from heateq_design.kernels import WORK_POINTS, ftcs_loop, ftcs_step, upwind15_coefficients, upwind15_loop, upwind15_step
+from heateq_design.tridiag import cn_factorization, cn_matrix, thomas_factor, thomas_solve
+
+
+def time_steps(step, steps):
+    t0 = timer()
+    for _ in range(steps):
+        step()
+    return (timer() - t0) / steps
+
+
+def main(steps=5):
+    r = 0.2
+    coeffs = upwind15_coefficients(r)
+    print("{0:>10} {1:>10} {2:>12} {3:>12} {4:>9}".format("Nx", "scheme", "python[s]", "numpy[s]", "speedup"))
+    for nx in (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6):
+        last = np.random.default_rng(0).random(nx)
+        curr = np.zeros(nx)
+        work = np.zeros(min(nx - 2, WORK_POINTS))
+        lower, upper = thomas_factor(*cn_matrix(nx, r))
+        sup = cn_matrix(nx, r)[2]
+        factor = cn_factorization(nx, r)
+        cn_work = factor.workspace(last.shape)
+        cases = (("ftcs", lambda: ftcs_loop(last, curr, r), lambda: ftcs_step(last, curr, r)),
+                 ("upwind15", lambda: upwind15_loop(last, curr, r),
+                  lambda: upwind15_step(last, curr, r, coeffs, work)),
+                 ("crankn", lambda: thomas_solve(lower, upper, sup, curr),
+                  lambda: factor.solve(last, curr, cn_work)))
+        for name, loop, vec in cases:
+            t_loop = time_steps(loop, 1 if nx >= 10 ** 5 else steps)
+            t_vec = time_steps(vec, steps * 20)
+            print("{0:>10} {1:>10} {2:>12.3e} {3:>12.3e} {4:>9.1f}".format(nx, name, t_loop, t_vec, t_loop / t_vec))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,34 @@
+"""Reports solve time and accuracy of every scheme at every precision.
+
+Accuracy is the maximum difference of the final solution to a quad precision
+(longdouble) run of the same scheme.
+
+Usage: python benchmarks/bench_precision.py [Nx] [steps]
+"""
+import sys
+from timeit import default_timer as timer
+import numpy as np
+from heateq_design.ftcs import FTCS
+from heateq_design.upwind15 import UpWind15
+from heateq_design.crankn import CrankN
+from heateq_design.heateq import PRECISIONS
+
+
+def main(nx=100001, steps=100):
+    dx = 1.0 / (nx - 1)
+    dt = 0.2 * dx * dx / 0.2
+    print("{0:>10} {1:>8} {2:>12} {3:>12}".format("scheme", "prec", "solve[s]", "max error"))
+    for scheme in (FTCS, UpWind15, CrankN):
+        results = {}
+        for prec in reversed(list(PRECISIONS)):
+            heat_solver = scheme(1.0, steps * dt, 0.2, dx, dt, 0, 1, 'step(0,0.5,1)', 0, 0, "numpy", prec)
+            t0 = timer()
+            heat_solver.solve('bench_precision', noout=1)
+            elapsed = timer() - t0
+            results[prec] = heat_solver.curr
+            error = np.max(np.abs(heat_solver.curr.astype(np.longdouble) - results["quad"]))
+            print("{0:>10} {1:>8} {2:>12.3e} {3:>12.3e}".format(scheme.__name__, prec, elapsed, float(error)))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,51 @@
+"""Strong scaling of the domain-decomposed schemes on 1 to N worker processes.
+
+Every scheme advances the same grid by the same number of steps with a growing
+number of workers. Speedup and efficiency are relative to the serial scheme.
+The pool is started before timing, so process start up is not included.
+
+Usage: python benchmarks/bench_scaling.py [Nx] [steps] [max workers]
+"""
+import os
+import sys
+from timeit import default_timer as timer
+from heateq_design.parallel import PARALLEL_SCHEMES
+from heateq_design.sweep import SCHEMES
+
+
+def worker_counts(max_workers):
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def main(nx=10 ** 7, steps=20, max_workers=os.cpu_count()):
+    dx = 1.0 / (nx - 1)
+    dt = 0.4 * dx * dx / 0.2
+    args = (1.0, steps * dt, 0.2, dx, dt, 0, 1, 'step(0,0.5,1)', 0, 0)
+    print("{0:>10} {1:>10} {2:>8} {3:>12} {4:>9} {5:>11}".format(
+        "scheme", "Nx", "workers", "solve[s]", "speedup", "efficiency"))
+    for alg in SCHEMES:
+        heat_solver = SCHEMES[alg](*args)
+        heat_solver.initialize()
+        t0 = timer()
+        heat_solver.advance(steps)
+        serial = timer() - t0
+        print("{0:>10} {1:>10} {2:>8} {3:>12.3e} {4:>9.2f} {5:>11.2f}".format(alg, nx, "serial", serial, 1, 1))
+        for workers in worker_counts(max_workers):
+            heat_solver = PARALLEL_SCHEMES[alg](*args, workers=workers)
+            heat_solver.initialize()
+            heat_solver.advance(1)
+            t0 = timer()
+            heat_solver.advance(steps)
+            elapsed = timer() - t0
+            heat_solver.close()
+            print("{0:>10} {1:>10} {2:>8} {3:>12.3e} {4:>9.2f} {5:>11.2f}".format(
+                alg, nx, workers, elapsed, serial / elapsed, serial / elapsed / workers))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -1,12 +1,18 @@
 """Solving one dimensional heat conduction equation."""
 
-try:
-    from importlib.metadata import version, PackageNotFoundError  # type: ignore
-except ImportError:  # pragma: no cover
-    from importlib_metadata import version, PackageNotFoundError  # type: ignore
 
-
-try:
-    __version__ = version(__name__)
-except PackageNotFoundError:  # pragma: no cover
-    __version__ = "unknown"
+def __getattr__(name):
+    # The version is looked up on first use, importing importlib.metadata
+    # costs more than the rest of the command line startup.
+    if name != "__version__":
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+    try:
+        from importlib.metadata import version, PackageNotFoundError  # type: ignore
+    except ImportError:  # pragma: no cover
+        from importlib_metadata import version, PackageNotFoundError  # type: ignore
+    global __version__
+    try:
+        __version__ = version(__name__)
+    except PackageNotFoundError:  # pragma: no cover
+        __version__ = "unknown"
+    return __version__
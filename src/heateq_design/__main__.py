@@ -1,19 +1,50 @@
+import os.path
 import click
 from time import time
-from .ftcs import FTCS
-from .upwind15 import UpWind15
-from .crankn import CrankN
-from . import __version__
 
+# The solver modules import numpy and are only imported by the commands that
+# need them, so --help, --version and the server startup stay fast.
 
-@click.version_option(__version__)
-@click.command()
+
+class DefaultGroup(click.Group):
+    """
+    Command group that falls back to a default command when no subcommand is named.
+
+    This keeps ``heateq-design --alg crankn ...`` working as a shortcut for ``heateq-design run ...``.
+    """
+    def __init__(self, *args, default_command=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx, args):
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names + ['--version']:
+            args.insert(0, self.default_command)
+        elif not args:
+            args.append(self.default_command)
+        return super().parse_args(ctx, args)
+
+
+def print_version(ctx, param, value):
+    if value and not ctx.resilient_parsing:
+        from . import __version__
+        click.echo("{0}, version {1}".format(ctx.find_root().info_name, __version__))
+        ctx.exit()
+
+
+@click.option('--version', is_flag=True, expose_value=False, is_eager=True, callback=print_version,
+              help="Show the version and exit.")
+@click.group(cls=DefaultGroup, default_command="run")
+def main() -> None:
+    """Main entry point for heateq_design."""
+
+
+@main.command()
 @click.option('--runame', required=False, default="heat_results", show_default=True,
               type=click.STRING,
               help="name to give run and results dir.")
 @click.option('--prec', required=False, default="double", show_default=True,
               type=click.Choice(["half", "float", "double", "quad"]),
-              help="precision of the solution convergence.")
+              help="floating point precision of the solution.")
 @click.option("--alpha", required=False, default=0.2, show_default=True,
               type=click.FLOAT,
               help="material thermal diffusivity (sq-meters/second).")
@@ -41,6 +72,9 @@ from . import __version__
 @click.option('--alg', required=False, default="ftcs", show_default=True,
               type=click.Choice(["ftcs", "upwind15", "crankn"]),
               help="algorithm")
+@click.option('--kernel', required=False, default="numpy", show_default=True,
+              type=click.Choice(["numpy", "python"]),
+              help="update kernel: vectorized numpy or reference python loops")
 @click.option("--savi", required=False, default=0, show_default=True,
               type=click.INT,
               help="save every i-th solution step")
@@ -53,20 +87,289 @@ from . import __version__
 @click.option("--noout", required=False, default=0, show_default=True,
               type=click.INT,
               help="disable all file outputs")
-def main(runame: str, prec: str, alpha: float, lenx: float,
+@click.option('--output', required=False, default="curve", show_default=True,
+              type=click.Choice(["curve", "npy"]),
+              help="snapshot format: text file per snapshot or one memory-mapped npy array")
+@click.option("--outq", required=False, default=0, show_default=True,
+              type=click.INT,
+              help="snapshot buffers of a background writer thread (0: write synchronously)")
+@click.option('--profile', required=False, default=None, is_flag=False, flag_value="-",
+              type=click.STRING,
+              help="print a per-phase timing breakdown, or write it as JSON to the given file")
+@click.option('--adaptive', is_flag=True, default=False,
+              help="choose the time step automatically, starting from --dt.")
+@click.option("--tol", required=False, default=1e-2, show_default=True,
+              type=click.FLOAT,
+              help="target relative rms solution change per step with --adaptive.")
+@click.option('--mode', required=False, default="transient", show_default=True,
+              type=click.Choice(["transient", "steady"]),
+              help="step in time, or solve for the steady state directly")
+@click.option("--warm", required=False, default=0, show_default=True,
+              type=click.INT,
+              help="time steps taken before the direct solve with --mode steady")
+@click.option("--chki", required=False, default=0, show_default=True,
+              type=click.INT,
+              help="write a restart checkpoint every i-th solution step")
+@click.option('--restart', is_flag=True, default=False,
+              help="continue from the last checkpoint in the results dir.")
+@click.option("--workers", required=False, default=1, show_default=True,
+              type=click.INT,
+              help="split the grid across this many worker processes")
+@click.option('--no-cache', 'no_cache', is_flag=True, default=False,
+              help="always solve, neither reading nor storing the result cache.")
+def run(runame: str, prec: str, alpha: float, lenx: float,
          dx: float, dt: float, maxt: float, bc0: float,
-         bc1: float, ic: str, alg: str, savi: int,
-         save: int, outi: int, noout: int) -> None:
-    """Main entry point for heateq_design."""
+         bc1: float, ic: str, alg: str, kernel: str, savi: int,
+         save: int, outi: int, noout: int, output: str, outq: int,
+         profile: str, adaptive: bool, tol: float, mode: str, warm: int,
+         chki: int, restart: bool, workers: int, no_cache: bool) -> None:
+    """Runs one heat equation solve."""
+    if adaptive and mode == "steady":
+        raise click.UsageError("--adaptive only applies to --mode transient")
+    if adaptive and (chki or restart):
+        raise click.UsageError("--chki and --restart do not apply to --adaptive runs")
     click.echo('Invoking heat equation solver...')
     t0 = time()
-    if alg == 'ftcs':
-        heat_solver = FTCS(lenx, maxt, alpha, dx, dt, bc0, bc1, ic, outi, savi)
+    if workers > 1:
+        from .parallel import PARALLEL_SCHEMES
+        try:
+            heat_solver = PARALLEL_SCHEMES[alg](lenx, maxt, alpha, dx, dt, bc0, bc1, ic, outi, savi, kernel, prec,
+                                                workers=workers)
+        except ValueError as err:
+            raise click.UsageError(str(err))
+    elif alg == 'ftcs':
+        from .ftcs import FTCS
+        heat_solver = FTCS(lenx, maxt, alpha, dx, dt, bc0, bc1, ic, outi, savi, kernel, prec)
     elif alg == 'upwind15':
-        heat_solver = UpWind15(lenx, maxt, alpha, dx, dt, bc0, bc1, ic, outi, savi)
+        from .upwind15 import UpWind15
+        heat_solver = UpWind15(lenx, maxt, alpha, dx, dt, bc0, bc1, ic, outi, savi, kernel, prec)
+    else:
+        from .crankn import CrankN
+        heat_solver = CrankN(lenx, maxt, alpha, dx, dt, bc0, bc1, ic, outi, savi, kernel, prec)
+    heat_solver.chki = chki
+    if save:
+        try:
+            heat_solver.track_errors()
+        except ValueError as err:
+            raise click.UsageError(str(err))
+    if profile:
+        from .profiling import PhaseTimer
+        heat_solver.profiler = PhaseTimer()
+    cached = False
+    if adaptive:
+        from .adaptive import AdaptiveSolver
+        AdaptiveSolver(heat_solver, tol).solve(runame, noout, output, outq)
+    elif no_cache or restart or profile:
+        # a restart continues its own output and a profile times the solve, neither uses the cache
+        heat_solver.solve(runame, noout, output, outq, mode, warm, restart)
     else:
-        heat_solver = CrankN(lenx, maxt, alpha, dx, dt, bc0, bc1, ic, outi, savi)
-    heat_solver.solve(runame)
+        from .cache import ResultCache
+        _, cached = ResultCache().solve(heat_solver, runame, noout, output, outq, mode, warm)
     t1 = time() - t0
+    if cached:
+        click.echo('Result restored from cache.')
     click.echo('Solver complete. Results generated here:' + runame)
     click.echo("Time elapsed: " + str(t1))
+    if save and len(heat_solver.error_history):
+        step, t, l1, l2, linf = heat_solver.error_history[-1]
+        click.echo("Error at t={0}: L1={1} L2={2} Linf={3}".format(t, l1, l2, linf))
+    if profile == "-":
+        click.echo(heat_solver.profiler.format(), nl=False)
+    elif profile:
+        heat_solver.profiler.save(profile)
+        click.echo('Profile written here:' + profile)
+
+
+@main.command()
+@click.option('--runame', required=False, default="heat_sweep", show_default=True,
+              type=click.STRING,
+              help="name to give the sweep and its results dir.")
+@click.option('--grid', 'grid_file', required=False, default=None,
+              type=click.Path(exists=True, dir_okay=False),
+              help="JSON or TOML file mapping settings to lists of values.")
+@click.option('--param', 'params', multiple=True, metavar="NAME=VALUE",
+              help="add VALUE to the values swept for setting NAME (repeatable).")
+@click.option("--jobs", required=False, default=None, type=click.INT,
+              help="number of worker processes [default: all cores]")
+@click.option("--resume/--fresh", default=True, show_default=True,
+              help="skip jobs already completed in the results dir.")
+@click.option("--noout", required=False, default=0, show_default=True,
+              type=click.INT,
+              help="disable solution file outputs of the jobs")
+@click.option('--no-cache', 'no_cache', is_flag=True, default=False,
+              help="solve every job, neither reading nor storing the result cache.")
+def sweep(runame: str, grid_file: str, params: tuple, jobs: int, resume: bool, noout: int,
+          no_cache: bool) -> None:
+    """Runs a grid of solver settings on a process pool."""
+    from .cache import ResultCache
+    from .sweep import expand_grid, format_summary, load_grid, run_sweep, DEFAULTS
+    grid = load_grid(grid_file) if grid_file else {}
+    for param in params:
+        name, sep, value = param.partition("=")
+        if not sep or name not in DEFAULTS:
+            raise click.BadParameter("expected NAME=VALUE with NAME one of " + ", ".join(DEFAULTS),
+                                     param_hint="--param")
+        grid.setdefault(name, []).append(value)
+    try:
+        configs = expand_grid(grid)
+    except ValueError as err:
+        raise click.UsageError(str(err))
+
+    click.echo('Running {0} sweep jobs...'.format(len(configs)))
+    t0 = time()
+    records = run_sweep(configs, runame, jobs, resume, bool(noout),
+                        progress=lambda record: click.echo('Job {0} {1} in {2:.3f}s{3}{4}'.format(
+                            record["job"], record["result"]["status"], record["result"]["elapsed"],
+                            " (cached)" if record["result"].get("cached") else "",
+                            ": " + record["result"]["error"] if "error" in record["result"] else "")),
+                        cache=None if no_cache else ResultCache())
+    click.echo(format_summary(records), nl=False)
+    click.echo('Sweep complete. Results generated here:' + runame)
+    click.echo("Time elapsed: " + str(time() - t0))
+
+
+@main.command()
+@click.option('--runame', required=False, default="heat_convergence", show_default=True,
+              type=click.STRING,
+              help="name to give the study and its results dir.")
+@click.option('--alg', required=False, default="ftcs", show_default=True,
+              type=click.Choice(["ftcs", "upwind15", "crankn"]),
+              help="algorithm")
+@click.option('--prec', required=False, default="double", show_default=True,
+              type=click.Choice(["half", "float", "double", "quad"]),
+              help="floating point precision of the solution.")
+@click.option("--alpha", required=False, default=0.2, show_default=True, type=click.FLOAT,
+              help="material thermal diffusivity (sq-meters/second).")
+@click.option("--lenx", required=False, default=1.0, show_default=True, type=click.FLOAT,
+              help="material length (meters).")
+@click.option("--dx", required=False, default=0.1, show_default=True, type=click.FLOAT,
+              help="x-incriment of the coarsest level (meters).")
+@click.option("--dt", required=False, default=0.004, show_default=True, type=click.FLOAT,
+              help="t-incriment of the coarsest level (seconds).")
+@click.option("--maxt", required=False, default=2.0, show_default=True, type=click.FLOAT,
+              help=">0:max sim time (seconds) | <0:min l2 change in soln of the coarsest level.")
+@click.option("--bc0", required=False, default=0, show_default=True, type=click.FLOAT,
+              help="boundary condition @ x=0: u(0,t) (Kelvin)")
+@click.option("--bc1", required=False, default=1, show_default=True, type=click.FLOAT,
+              help="boundary condition @ x=lenx: u(lenx,t) (Kelvin)")
+@click.option('--ic', required=False, default="const(1)", show_default=True, type=click.STRING,
+              help="initial condition @ t=0: u(x,0) (Kelvin)")
+@click.option("--levels", required=False, default=4, show_default=True, type=click.INT,
+              help="number of grid levels")
+@click.option("--ratio", required=False, default=2, show_default=True, type=click.INT,
+              help="refinement ratio of dx between levels, dt is refined by its square")
+@click.option("--warm-start/--cold-start", default=True, show_default=True,
+              help="start each level of a threshold run from the coarser solution.")
+@click.option("--jobs", required=False, default=None, type=click.INT,
+              help="number of worker processes [default: one per level]")
+@click.option('--no-cache', 'no_cache', is_flag=True, default=False,
+              help="always solve, neither reading nor storing the result cache.")
+def converge(runame: str, alg: str, prec: str, alpha: float, lenx: float, dx: float, dt: float, maxt: float,
+             bc0: float, bc1: float, ic: str, levels: int, ratio: int, warm_start: bool, jobs: int,
+             no_cache: bool) -> None:
+    """Runs a grid refinement study and reports the observed order of accuracy."""
+    from .cache import ResultCache
+    from .convergence import format_report, run_study, save_report
+    from .sweep import DEFAULTS
+    config = dict(DEFAULTS, alg=alg, prec=prec, alpha=alpha, lenx=lenx, dx=dx, dt=dt, maxt=maxt, bc0=bc0,
+                  bc1=bc1, ic=ic)
+    click.echo('Running a convergence study over {0} levels...'.format(levels))
+    t0 = time()
+    try:
+        report = run_study(config, levels, ratio, warm_start, jobs, None if no_cache else ResultCache(),
+                           progress=lambda level, result: click.echo('Level {0}: {1} steps in {2:.3f}s'.format(
+                               level, result["steps"], result["elapsed"])))
+    except ValueError as err:
+        raise click.UsageError(str(err))
+    save_report(report, runame)
+    click.echo(format_report(report), nl=False)
+    click.echo('Study complete. Results generated here:' + runame)
+    click.echo("Time elapsed: " + str(time() - t0))
+
+
+@main.command()
+@click.option('--socket', 'socket_path', required=False, default=None, type=click.Path(dir_okay=False),
+              help="listen on this Unix socket instead of reading requests from stdin.")
+@click.option('--no-cache', 'no_cache', is_flag=True, default=False,
+              help="solve every request, neither reading nor storing the result cache.")
+def serve(socket_path: str, no_cache: bool) -> None:
+    """Answers run requests sent as JSON lines, keeping the solver caches warm."""
+    from .cache import ResultCache
+    from .server import SolverServer, serve_lines
+    import sys
+    cache = None if no_cache else ResultCache()
+    if not socket_path:
+        serve_lines(sys.stdin, sys.stdout, cache)
+        return
+    try:
+        server = SolverServer(socket_path, cache)
+    except ValueError as err:
+        raise click.UsageError(str(err))
+    click.echo('Serving on ' + socket_path, err=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@main.command()
+@click.option('--runame', required=False, default="heat_results", show_default=True,
+              type=click.STRING,
+              help="name of the run written with --output npy.")
+def export(runame: str) -> None:
+    """Exports the npy snapshots of a run as .curve text files."""
+    from .output import export_curves
+    export_curves(os.path.join(runame, os.path.basename(os.path.normpath(runame))))
+    click.echo('Exported .curve files here:' + runame)
+
+
+@main.command()
+@click.option('--alg', 'algs', multiple=True, default=["ftcs", "upwind15", "crankn"], show_default=True,
+              type=click.Choice(["ftcs", "upwind15", "crankn"]),
+              help="algorithm to time (repeatable)")
+@click.option('--nx', 'nxs', multiple=True, show_default="10^2 to 10^7", type=click.INT,
+              help="number of grid points (repeatable)")
+@click.option('--steps', 'steps', multiple=True, show_default="20", type=click.INT,
+              help="number of time steps (repeatable)")
+@click.option('--prec', required=False, default="double", show_default=True,
+              type=click.Choice(["half", "float", "double", "quad"]),
+              help="floating point precision of the solution.")
+@click.option('--kernel', required=False, default="numpy", show_default=True,
+              type=click.Choice(["numpy", "python"]),
+              help="update kernel: vectorized numpy or reference python loops")
+@click.option('--output', required=False, default="npy", show_default=True,
+              type=click.Choice(["curve", "npy"]),
+              help="snapshot format timed for the I/O phase")
+@click.option("--snapshots", required=False, default=2, show_default=True, type=click.INT,
+              help="number of snapshots written in the I/O phase")
+@click.option("--repeat", required=False, default=1, show_default=True, type=click.INT,
+              help="report the best of this many runs")
+@click.option('--save', 'save_file', required=False, default=None, type=click.Path(dir_okay=False),
+              help="write the results to this JSON file")
+@click.option('--baseline', required=False, default=None, type=click.Path(exists=True, dir_okay=False),
+              help="compare the solve times against results saved earlier")
+@click.option("--tolerance", required=False, default=0.1, show_default=True, type=click.FLOAT,
+              help="allowed relative slow down against the baseline")
+def bench(algs: tuple, nxs: tuple, steps: tuple, prec: str, kernel: str, output: str, snapshots: int,
+          repeat: int, save_file: str, baseline: str, tolerance: float) -> None:
+    """Times the schemes across grid sizes and step counts."""
+    from .benchmark import HEADER, NX_DEFAULT, STEPS_DEFAULT, compare_results, format_result, load_results, \
+        run_benchmarks, save_results
+    nxs = nxs or NX_DEFAULT
+    steps = steps or STEPS_DEFAULT
+    click.echo(HEADER)
+    results = run_benchmarks(algs, nxs, steps, progress=lambda result: click.echo(format_result(result)),
+                             prec=prec, kernel=kernel, output=output, snapshots=snapshots, repeat=repeat)
+    if save_file:
+        save_results(results, save_file)
+        click.echo('Benchmark results saved here:' + save_file)
+    if baseline:
+        regressions = compare_results(results, load_results(baseline), tolerance)
+        for result, base_solve in regressions:
+            click.echo('Regression: {0} nx={1} steps={2} solve {3:.3e}s vs baseline {4:.3e}s'.format(
+                result["scheme"], result["nx"], result["steps"], result["solve"], base_solve))
+        if regressions:
+            raise SystemExit(1)
+        click.echo('No regressions against ' + baseline)
@@ -0,0 +1,196 @@
+"""Adaptive time stepping on top of the heat equation schemes."""
+import math
+import os.path
+
+
+class AdaptiveSolver:
+    """
+    This class integrates a heat equation solver with an automatically chosen time step.
+
+    The time step starts at the solver's dt, capped at the largest stable time
+    step of the scheme, and then changes by powers of ``growth``. After every step
+    the root mean square change of the interior solution relative to its magnitude is
+    compared to ``tol``: the time step grows while the change stays well below
+    ``tol``, as it does when the solution relaxes towards steady state, and a
+    step whose change exceeds ``growth * tol`` is rejected and retried with a
+    smaller time step. Time steps never exceed the stability limit, so explicit
+    schemes run at their largest stable step and implicit schemes keep growing.
+    The last step is shortened to end exactly at maxt. A solver set up with a
+    change threshold (negative maxt) stops at the first accepted step whose
+    change, scaled to the solver's own dt, drops below it, so it stops at the
+    same rate of change of the solution as a solve with fixed time steps.
+
+    Args:
+        solver (HeatEq): The scheme to integrate with.
+        tol (float): Target relative rms solution change per time step.
+        growth (float): Factor the time step grows or shrinks by.
+        safety (float): Fraction of the stable time step that may be used.
+        dt_max (float, optional): Upper bound on the time step.
+
+    Attributes:
+        t (float): Time of the current solution.
+        times (list): Times of all accepted steps.
+        dts (list): Time step sizes of all accepted steps.
+        changes (list): Solution change of all accepted steps.
+        rejected (int): Number of rejected steps.
+    """
+    def __init__(self, solver, tol=1e-2, growth=2.0, safety=0.9, dt_max=None):
+        if tol <= 0 or growth <= 1:
+            raise ValueError("Adaptive stepping needs tol > 0 and growth > 1")
+        self.solver = solver
+        self.tol = tol
+        self.growth = growth
+        self.dt_ref = solver.dt
+        self.dt_limit = min(safety * solver.stable_dt(), dt_max or math.inf)
+        self.dt0 = min(solver.dt, self.dt_limit)
+        self.min_level = -10
+        self.t = 0.0
+        self.times = []
+        self.dts = []
+        self.changes = []
+        self.rejected = 0
+
+    def level_dt(self, level):
+        """
+        Returns the time step of a growth level, capped at the time step limit.
+        """
+        return min(self.dt0 * self.growth ** level, self.dt_limit)
+
+    def solve(self, output_name, noout=0, output="curve", outq=0):
+        """
+        Solves the heat equation to maxt with adaptive time steps.
+
+        Saved snapshots carry the actual time of each solution, and a
+        ``<runame>_steps.txt`` table lists the time, time step size and change of
+        every accepted step. Tracked errors go to ``<runame>_errors.txt``. A
+        profiler set on the solver times the phases of the adaptive loop.
+
+        Args:
+            output_name (str): Directory to write the solution files to. Its base name prefixes the file names.
+            noout (int): Disable all file outputs when non-zero.
+            output (str): Snapshot format, "curve" (one text file per snapshot) or "npy" (one memory-mapped array).
+            outq (int): Number of snapshot buffers of a background writer thread, 0 to write synchronously.
+
+        Returns:
+            bool: True if the solve completed, False if the solution criteria were violated.
+        """
+        solver = self.solver
+        prof = solver.profiler
+        if prof:
+            prof.start()
+        solver.set_dt(self.dt0)
+        writer = None if noout else solver.open_writer(output_name, output, outq)
+        if prof:
+            prof.lap("open")
+        try:
+            ok = self.iterate(writer)
+        finally:
+            if writer:
+                writer.close()
+                if prof:
+                    prof.lap("close")
+        if not noout:
+            prefix = os.path.join(output_name, os.path.basename(os.path.normpath(output_name)))
+            with open(prefix + '_steps.txt', 'w') as out_f:
+                out_f.write('# step time dt change\n')
+                for ti, (t, dt, change) in enumerate(zip(self.times, self.dts, self.changes)):
+                    out_f.write('{0} {1!r} {2!r} {3!r}\n'.format(ti, t, dt, change))
+            if solver.errors:
+                solver.errors.save(prefix + '_errors.txt')
+        return ok
+
+    def iterate(self, writer=None):
+        """
+        Runs the adaptive time loop, handing the saved snapshots to a writer.
+
+        Args:
+            writer (CurveWriter, NpyWriter or AsyncWriter, optional): Receives the saved snapshots.
+
+        Returns:
+            bool: True if the solve completed, False if the solution criteria were violated.
+        """
+        solver = self.solver
+        prof = solver.profiler
+        solver.initialize()
+        if writer:
+            writer.write(0, solver.last, t=0.0)
+        if solver.errors:
+            solver.errors.record(0, 0.0, solver.last)
+        if prof:
+            prof.lap("init")
+
+        ti = 0
+        level = 0
+        self.t = 0.0
+        solver.change = 0.0
+        while solver.maxt - self.t > 1e-12 * solver.maxt:
+            dt = min(self.level_dt(level), solver.maxt - self.t)
+            if dt != solver.dt:
+                solver.set_dt(dt)
+            if not solver.update_solution():
+                print("Solution criteria violated. Make better choices\n")
+                solver.iterations = ti
+                return False
+            if prof:
+                prof.lap("update")
+
+            # relative rms change of the solution in this step. The boundary points are
+            # left out of the control, they jump to the boundary values whatever the dt
+            interior, boundary = solver.change_sums()
+            change = (interior + boundary) / solver.Nx
+            inner = interior / max(solver.Nx - 2, 1)
+            scale = max(float(solver.curr.max()), -float(solver.curr.min()), 1e-30)
+            relative = math.sqrt(inner) / scale
+            if prof:
+                prof.lap("norm")
+
+            if relative > self.growth * self.tol and level > self.min_level and self.level_dt(level - 1) < dt:
+                # reject the step, last still holds the previous solution
+                self.rejected = self.rejected + 1
+                level = level - 1
+                if prof:
+                    prof.lap("reject")
+                continue
+
+            self.t = self.t + dt
+            self.times.append(self.t)
+            self.dts.append(dt)
+            self.changes.append(float(change))
+            solver.change = change
+
+            if ti > 0 and solver.savi and ti % solver.savi == 0:
+                if writer:
+                    writer.write(ti, solver.curr, t=self.t)
+                if solver.errors:
+                    solver.errors.record(ti, self.t, solver.curr)
+                if prof:
+                    prof.lap("write")
+
+            if solver.outi and ti % solver.outi == 0:
+                print("Iteration {0}: t={1} dt={2} last change l2={3}\n".format(ti, self.t, dt, change))
+                if prof:
+                    prof.lap("print")
+
+            # Handle possible termination by change threshold. The change grows with the
+            # square of the step, so it is compared at the configured time step size
+            if solver.maxt == solver.max_iter and change * (self.dt_ref / dt) ** 2 < solver.min_change:
+                print("Stopped after {0} iterations for threshold {1}\n".format(ti, change))
+                break
+
+            if relative < self.tol / self.growth and self.level_dt(level + 1) > self.level_dt(level):
+                level = level + 1
+            elif relative > self.tol and level > self.min_level:
+                level = level - 1
+
+            solver.last[:] = solver.curr
+            ti = ti + 1
+            if prof:
+                prof.lap("copy")
+        solver.iterations = ti
+        if writer:
+            writer.write(ti, solver.curr, final=True, t=self.t)
+        if solver.errors:
+            solver.errors.record(ti, self.t, solver.curr)
+        if prof:
+            prof.lap("write")
+        return True
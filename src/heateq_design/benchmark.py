@@ -0,0 +1,160 @@
+"""Benchmark suite timing the schemes across grid sizes and step counts."""
+import json
+import os.path
+import platform
+import tempfile
+from timeit import default_timer as timer
+import numpy as np
+from . import __version__
+from .profiling import PhaseTimer
+from .sweep import SCHEMES
+
+NX_DEFAULT = (10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7)
+STEPS_DEFAULT = (20,)
+CASE_KEYS = ("scheme", "nx", "steps", "prec", "kernel", "output")
+HEADER = "{0:>9} {1:>9} {2:>6} {3:>7} {4:>10} {5:>10} {6:>10} {7:>11} {8:>11}".format(
+    "scheme", "nx", "steps", "prec", "setup[s]", "solve[s]", "io[s]", "steps/s", "points/s")
+
+
+def bench_case(alg, nx, steps, prec="double", kernel="numpy", output="npy", snapshots=2, repeat=1):
+    """
+    Times one solver configuration.
+
+    The solver runs ``steps`` stable time steps (mesh ratio 0.4) on ``nx``
+    points. Setup covers construction and the initial condition, solve covers
+    the time loop and I/O covers writing ``snapshots`` solution snapshots in
+    the ``output`` format. The best of ``repeat`` runs is reported.
+
+    Args:
+        alg (str): Algorithm, one of "ftcs", "upwind15" or "crankn".
+        nx (int): Number of grid points.
+        steps (int): Number of time steps.
+        prec (str): Precision of the solution.
+        kernel (str): Update kernel.
+        output (str): Snapshot format, "curve" or "npy".
+        snapshots (int): Number of snapshots to write.
+        repeat (int): Number of runs.
+
+    Returns:
+        dict: Case settings with the setup, solve and I/O times and the throughput.
+    """
+    alpha = 0.2
+    # slightly below 1 / (nx - 1) so the solver rounds to exactly nx points
+    dx = 1.0 / (nx - 1) * (1 - 1e-12)
+    dt = 0.4 * dx * dx / alpha
+    setup = solve = io = float("inf")
+    for _ in range(repeat):
+        t0 = timer()
+        heat_solver = SCHEMES[alg](1.0, steps * dt, alpha, dx, dt, 0, 1, 'step(0,0.5,1)', 0, 0, kernel, prec)
+        heat_solver.initialize()
+        setup = min(setup, timer() - t0)
+        # the phase timer charges the initial condition iterate() sets to "init", the rest is the time loop
+        heat_solver.profiler = PhaseTimer()
+        heat_solver.iterate()
+        solve = min(solve, heat_solver.profiler.total() - heat_solver.profiler.seconds.get("init", 0.0))
+        heat_solver.profiler = None
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            heat_solver.savi = 1
+            t4 = timer()
+            writer = heat_solver.open_writer(os.path.join(tmp_dir, "bench"), output)
+            for ti in range(min(snapshots, heat_solver.time_steps() + 1)):
+                writer.write(ti, heat_solver.curr)
+            writer.close()
+            io = min(io, timer() - t4)
+
+    return {
+        "scheme": alg,
+        "nx": heat_solver.Nx,
+        "steps": heat_solver.iterations,
+        "prec": prec,
+        "kernel": kernel,
+        "output": output,
+        "setup": setup,
+        "solve": solve,
+        "io": io,
+        "steps_per_s": heat_solver.iterations / solve,
+        "points_per_s": heat_solver.iterations * heat_solver.Nx / solve,
+    }
+
+
+def run_benchmarks(algs=tuple(SCHEMES), nxs=NX_DEFAULT, steps=STEPS_DEFAULT, progress=None, **kwargs):
+    """
+    Runs ``bench_case`` for every combination of scheme, grid size and step count.
+
+    Args:
+        algs (sequence): Algorithms to time.
+        nxs (sequence): Grid sizes.
+        steps (sequence): Step counts.
+        progress (callable, optional): Called with the result of each case.
+        **kwargs: Passed on to ``bench_case``.
+
+    Returns:
+        list: Results of all cases.
+    """
+    results = []
+    for alg in algs:
+        for nx in nxs:
+            for nsteps in steps:
+                result = bench_case(alg, nx, nsteps, **kwargs)
+                results.append(result)
+                if progress:
+                    progress(result)
+    return results
+
+
+def save_results(results, file_name):
+    """
+    Writes benchmark results with a description of the machine to a JSON file.
+    """
+    report = {
+        "meta": {
+            "version": __version__,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "system": platform.platform(),
+        },
+        "results": results,
+    }
+    with open(file_name, 'w') as out_f:
+        json.dump(report, out_f, indent=1)
+
+
+def load_results(file_name):
+    """
+    Reads the benchmark results saved by ``save_results``.
+    """
+    with open(file_name) as in_f:
+        return json.load(in_f)["results"]
+
+
+def compare_results(results, baseline, tolerance=0.1):
+    """
+    Finds the cases whose solve time regressed against a baseline.
+
+    Args:
+        results (list): New benchmark results.
+        baseline (list): Baseline benchmark results.
+        tolerance (float): Allowed relative slow down.
+
+    Returns:
+        list: (result, baseline solve time) pairs of the regressed cases.
+    """
+    base = {tuple(case[key] for key in CASE_KEYS): case["solve"] for case in baseline}
+    regressions = []
+    for result in results:
+        base_solve = base.get(tuple(result[key] for key in CASE_KEYS))
+        if base_solve is not None and result["solve"] > base_solve * (1 + tolerance):
+            regressions.append((result, base_solve))
+    return regressions
+
+
+def format_result(result):
+    """
+    Formats one benchmark result as a table row.
+    """
+    return "{scheme:>9} {nx:>9} {steps:>6} {prec:>7} {setup:>10.3e} {solve:>10.3e} {io:>10.3e} " \
+           "{steps_per_s:>11.3e} {points_per_s:>11.3e}".format(**result)
+
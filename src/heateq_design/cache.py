@@ -0,0 +1,268 @@
+"""Content-addressed on-disk cache of solve results."""
+import hashlib
+import json
+import os
+import numbers
+import numpy as np
+from .checkpoint import solver_params
+from .initial import parse_ic
+from .output import RecordingWriter
+
+# Environment variables overriding the cache directory and its size bound in bytes.
+CACHE_DIR_ENV = "HEATEQ_CACHE_DIR"
+CACHE_SIZE_ENV = "HEATEQ_CACHE_SIZE"
+DEFAULT_CACHE_SIZE = 1 << 30
+ENTRY_SUFFIX = ".npz"
+
+
+def default_cache_dir():
+    """
+    Returns the cache directory, ``$HEATEQ_CACHE_DIR`` or ``heateq_design`` in the user cache directory.
+    """
+    root = os.environ.get(CACHE_DIR_ENV)
+    if root:
+        return root
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "heateq_design")
+
+
+def normalize_value(value):
+    """
+    Returns a setting in the form it is hashed in: numbers as floats, strings stripped.
+    """
+    if isinstance(value, numbers.Real) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def solve_config(solver, mode="transient", warm=0):
+    """
+    Returns the normalized settings that determine the result of a solve.
+
+    These are the settings a checkpoint must agree with, plus the end of the
+    solve, the snapshot interval and whether errors are tracked. The initial
+    condition is keyed by its parsed form, so "const(1)" and "const(1.0)" share
+    an entry. Progress output, checkpoints and the snapshot file format do not
+    change the result and are left out.
+
+    Args:
+        solver (HeatEq): The solver.
+        mode (str): "transient" or "steady".
+        warm (int): Number of time steps taken before a steady state solve.
+
+    Returns:
+        dict: Setting name to normalized value.
+    """
+    config = solver_params(solver)
+    form = parse_ic(solver.ic)
+    config.update(ic="{0}{1}".format(form.kind, form.args), maxt=solver.maxt, savi=solver.savi,
+                  mode=mode, warm=warm if mode == "steady" else 0, errors=solver.errors is not None,
+                  workers=getattr(solver, "workers", 1))
+    return {name: normalize_value(value) for name, value in config.items()}
+
+
+def config_key(config):
+    """
+    Returns the cache key of a normalized configuration and the package version.
+    """
+    # looked up here, the version lookup is the largest import cost of the package
+    from . import __version__
+    text = json.dumps({"config": config, "version": __version__}, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed cache of solve results with least recently used eviction.
+
+    Each entry is one uncompressed ``<key>.npz`` file named by the hash of the
+    solve settings and the package version. It holds the final solution, the
+    saved snapshots at full precision and a JSON header with the step and time of
+    each snapshot and the scalar results of the solve. Entries are written to a
+    temporary file and then renamed, so concurrent sweep workers never see a
+    partial entry. Reading an entry refreshes its modification time, and
+    entries are evicted oldest first once the cache exceeds ``max_bytes``.
+
+    Args:
+        root (str, optional): Cache directory. Defaults to ``default_cache_dir()``.
+        max_bytes (int, optional): Size bound of the cache. Defaults to ``$HEATEQ_CACHE_SIZE`` or 1 GiB.
+
+    Methods:
+        get():
+            Returns the cached result of a key, or None.
+
+        put():
+            Stores the result of a finished solve.
+
+        evict():
+            Removes the least recently used entries until the cache fits its size bound.
+
+        solve():
+            Solves with a solver, or restores its result from the cache.
+    """
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or default_cache_dir()
+        if max_bytes is None:
+            max_bytes = int(os.environ.get(CACHE_SIZE_ENV, DEFAULT_CACHE_SIZE))
+        if max_bytes <= 0:
+            raise ValueError("The result cache needs a positive size bound")
+        self.max_bytes = max_bytes
+
+    def path(self, key):
+        return os.path.join(self.root, key + ENTRY_SUFFIX)
+
+    def entries(self):
+        """
+        Returns (mtime, size, path) of every cache entry.
+        """
+        entries = []
+        if os.path.isdir(self.root):
+            for name in os.listdir(self.root):
+                if name.endswith(ENTRY_SUFFIX):
+                    path = os.path.join(self.root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        # evicted by another process meanwhile
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return entries
+
+    def size(self):
+        """
+        Returns the total size of the cache entries in bytes.
+        """
+        return sum(size for _, size, _ in self.entries())
+
+    def get(self, key):
+        """
+        Returns the cached result of a key, or None.
+
+        Args:
+            key (str): Cache key from ``config_key``.
+
+        Returns:
+            dict: The header, with the arrays "final", "snapshots" and "errors" added, or None.
+        """
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                result = json.loads(str(data["meta"]))
+                if len(result["times"]) != len(result["steps"]):
+                    raise ValueError("Snapshot steps and times differ in length")
+                for name in ("final", "snapshots", "errors"):
+                    result[name] = data[name]
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError):
+            # a corrupt entry counts as a miss and is replaced by the next put
+            return None
+        return result
+
+    def put(self, key, solver, record, config=None):
+        """
+        Stores the result of a finished solve.
+
+        Args:
+            key (str): Cache key from ``config_key``.
+            solver (HeatEq): The solver after the solve.
+            record (RecordingWriter): Snapshots saved during the solve.
+            config (dict, optional): Settings the key was computed from, kept for inspection.
+
+        Returns:
+            bool: True if the result was stored, False if it is larger than the cache.
+        """
+        snapshots = record.snapshots
+        errors = solver.error_history
+        if record.overflow or snapshots.nbytes + solver.curr.nbytes + errors.nbytes > self.max_bytes:
+            return False
+        meta = {"steps": record.steps, "times": record.times, "final_row": record.final, "iterations": solver.iterations,
+                "change": float(solver.change), "residual": getattr(solver, "residual", None),
+                "config": config}
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path(key)
+        tmp_name = "{0}.{1}.tmp".format(path, os.getpid())
+        with open(tmp_name, 'wb') as out_f:
+            np.savez(out_f, final=solver.curr, snapshots=snapshots, errors=errors, meta=np.array(json.dumps(meta)))
+        os.replace(tmp_name, path)
+        self.evict()
+        return True
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits its size bound.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed = removed + 1
+            except FileNotFoundError:
+                pass
+            total = total - size
+        return removed
+
+    def solve(self, solver, output_name, noout=0, output="curve", outq=0, mode="transient", warm=0):
+        """
+        Solves with a solver, or restores its result from the cache.
+
+        On a hit the solver ends up in the same state as after a solve: the
+        final solution, iteration count, change and error history are restored,
+        and the cached snapshots are written to ``output_name`` like a solve
+        would have written them. On a miss the solver solves and a successful
+        result is stored. The snapshots of a miss are recorded in memory only up
+        to the size bound of the cache, a larger result is solved but not stored.
+
+        Args:
+            solver (HeatEq): The solver.
+            output_name (str): Directory to write the solution files to.
+            noout (int): Disable all file outputs when non-zero.
+            output (str): Snapshot format, "curve" or "npy".
+            outq (int): Number of snapshot buffers of a background writer thread.
+            mode (str): "transient" or "steady".
+            warm (int): Number of time steps taken before a steady state solve.
+
+        Returns:
+            tuple: Whether the solve completed and whether the result came from the cache.
+        """
+        config = solve_config(solver, mode, warm)
+        key = config_key(config)
+        result = self.get(key)
+        if result is None:
+            record = RecordingWriter(solver.Nx, solver.curr.dtype, max_bytes=self.max_bytes - solver.curr.nbytes)
+            ok = solver.solve(output_name, noout, output, outq, mode, warm, record=record)
+            if ok:
+                self.put(key, solver, record, config)
+            return ok, False
+
+        solver.curr[:] = result["final"]
+        solver.last[:] = solver.curr
+        solver.iterations = result["iterations"]
+        solver.change = result["change"]
+        if result["residual"] is not None:
+            solver.residual = result["residual"]
+        if solver.errors and len(result["errors"]):
+            solver.errors.rows = result["errors"].copy()
+            solver.errors.count = len(solver.errors.rows)
+        if not noout:
+            writer = solver.open_writer(output_name, output, outq)
+            try:
+                steps = result["steps"]
+                for row, (ti, t) in enumerate(zip(steps, result["times"])):
+                    writer.write(ti, result["snapshots"][row], result["final_row"] and row == len(steps) - 1, t)
+            finally:
+                writer.close()
+            if solver.errors:
+                prefix = os.path.join(output_name, os.path.basename(os.path.normpath(output_name)))
+                solver.errors.save(prefix + '_errors.txt')
+        return True, True
@@ -0,0 +1,82 @@
+"""Checkpoints that let an interrupted solve continue where it stopped."""
+import json
+import os
+import numpy as np
+
+# Solver settings a checkpoint must agree with to be restored. maxt, outi and
+# savi may differ, so a finished run can be continued to a later time.
+PARAMS = ("lenx", "alpha", "dx", "dt", "bc0", "bc1", "ic", "kernel", "prec", "Nx", "min_change")
+
+
+def checkpoint_file(prefix):
+    """
+    Returns the checkpoint file name of a run with the given path prefix.
+    """
+    return prefix + '_checkpoint.npz'
+
+
+def solver_params(solver):
+    """
+    Returns the settings of a solver that determine its solution.
+    """
+    params = {name: getattr(solver, name) for name in PARAMS}
+    params["scheme"] = type(solver).__name__
+    return params
+
+
+def save_checkpoint(file_name, solver, ti):
+    """
+    Writes the state of a solver at the start of time step ti.
+
+    The state is the solution vector ``last`` at full precision, the step index,
+    the last solution change, the error history of a solver that tracks its
+    errors and the solver settings, in one uncompressed
+    ``.npz`` file. It is written to a temporary file that then replaces the
+    previous checkpoint, so a solve killed at any moment leaves either the old
+    or the new checkpoint behind, never a partial one.
+
+    Args:
+        file_name (str): Checkpoint file name.
+        solver (HeatEq): The solver.
+        ti (int): Index of the next time step.
+    """
+    meta = {"ti": ti, "change": float(solver.change), "params": solver_params(solver)}
+    tmp_name = file_name + '.tmp'
+    arrays = {"last": solver.last}
+    if solver.errors is not None:
+        arrays["errors"] = solver.errors.history
+    with open(tmp_name, 'wb') as out_f:
+        np.savez(out_f, meta=np.array(json.dumps(meta)), **arrays)
+    os.replace(tmp_name, file_name)
+
+
+def load_checkpoint(file_name, solver):
+    """
+    Restores the state of a solver from a checkpoint.
+
+    Solver setup derived from the settings, like the Crank-Nicolson factors,
+    is deterministic and is rebuilt by the solver itself rather than stored.
+
+    Args:
+        file_name (str): Checkpoint file name.
+        solver (HeatEq): Solver built with the settings of the checkpointed run.
+
+    Returns:
+        int: Index of the time step to continue with.
+    """
+    with np.load(file_name) as data:
+        meta = json.loads(str(data["meta"]))
+        params = solver_params(solver)
+        if meta["params"] != params:
+            changed = sorted(name for name in params if meta["params"].get(name) != params[name])
+            raise ValueError("Checkpoint {0} was written with different settings: {1}".format(
+                file_name, ", ".join(changed)))
+        solver.last[:] = data["last"]
+        solver.curr[:] = solver.last
+        if solver.errors is not None and "errors" in data.files:
+            # keep the free rows, the tracker grows its history in place
+            history = data["errors"]
+            solver.errors.rows = np.concatenate([history, np.zeros_like(solver.errors.rows)])
+            solver.errors.count = len(history)
+    solver.change = meta["change"]
+    return meta["ti"]
@@ -0,0 +1,290 @@
+"""Grid refinement studies with observed order of accuracy and Richardson extrapolation."""
+import json
+import math
+import os.path
+from concurrent.futures import ProcessPoolExecutor
+from time import time
+import numpy as np
+from .exact import EXACT_FORMS, ErrorTracker, ExactSolution
+from .initial import parse_ic
+from .output import write_array
+from .sweep import SCHEMES, make_solver
+
+# The time step is divided by the square of the refinement ratio per level. All
+# schemes are first order in time (crankn solves with the implicit matrix only),
+# so this keeps them second order overall and the explicit schemes stable.
+DT_POWER = 2
+FORMAL_ORDER = 2
+# Smallest observed order Richardson extrapolation is done with, below it the
+# levels are not converging and the formal order is used instead.
+MIN_ORDER = 0.5
+REPORT_COLUMNS = ("level", "nx", "dx", "dt", "steps", "time", "error", "order", "elapsed")
+
+
+def level_configs(config, levels, ratio=2):
+    """
+    Returns the configurations of a hierarchy of refined grids.
+
+    Level 0 is ``config``. Every further level divides dx by ``ratio`` and dt by
+    ``ratio**2``. The grids are nested: every point of a level is also a point of
+    all finer levels. The change threshold of a run with negative maxt is scaled
+    with dt, so all levels stop at the same rate of change of the solution.
+
+    The initial condition must not depend on the grid, so every level solves the
+    same problem.
+
+    Args:
+        config (dict): Job configuration of the coarsest level, as in ``sweep.DEFAULTS``.
+        levels (int): Number of levels.
+        ratio (int): Refinement ratio between successive levels.
+
+    Returns:
+        list: One job configuration per level, coarsest first.
+    """
+    if levels < 2 or ratio < 2:
+        raise ValueError("A convergence study needs at least 2 levels and a refinement ratio of at least 2")
+    if config["alg"] not in SCHEMES:
+        raise ValueError("Unknown algorithm '{0}', expected one of {1}".format(config["alg"], tuple(SCHEMES)))
+    if parse_ic(config["ic"]).kind not in EXACT_FORMS:
+        raise ValueError("Initial condition '{0}' depends on the grid, expected one of {1}".format(
+            config["ic"], EXACT_FORMS))
+    intervals = int(config["lenx"] / config["dx"])
+    configs = []
+    for level in range(levels):
+        # slightly below lenx / n so the solver rounds to exactly n intervals
+        dx = config["dx"] if level == 0 else config["lenx"] / (intervals * ratio ** level) * (1 - 1e-12)
+        scale = ratio ** (level * DT_POWER)
+        maxt = config["maxt"] / scale if config["maxt"] < 0 else config["maxt"]
+        configs.append(dict(config, dx=dx, dt=config["dt"] / scale, maxt=maxt))
+    return configs
+
+
+def run_level(config, start=None, cache=None):
+    """
+    Solves one level of a convergence study without file output.
+
+    Args:
+        config (dict): Job configuration of the level.
+        start (np.ndarray, optional): Solution to start from instead of the initial condition.
+        cache (ResultCache, optional): Result cache for the levels solved from the initial condition.
+
+    Returns:
+        dict: The final solution, its time, the number of steps, the change of the last step,
+            the diffusivity of the scheme, whether the solve completed and the elapsed time.
+    """
+    t0 = time()
+    heat_solver = make_solver(config)
+    if start is not None:
+        # grid sequencing: continue from the interpolated coarser solution
+        heat_solver.initialize()
+        heat_solver.last[:] = start
+        heat_solver.change = 0.0
+        ok = False
+        for ok in (final for _, _, final in heat_solver.states(0, start=0)):
+            pass
+    elif cache:
+        ok, _ = cache.solve(heat_solver, "", noout=1)
+    else:
+        ok = heat_solver.solve("", noout=1)
+    return {
+        "solution": heat_solver.curr.astype(np.float64),
+        "time": heat_solver.iterations * heat_solver.dt,
+        "steps": heat_solver.iterations,
+        "change": float(heat_solver.change),
+        "diffusivity": float(heat_solver.diffusivity()),
+        "dx": heat_solver.dx,
+        "dt": heat_solver.dt,
+        "ok": ok,
+        "elapsed": time() - t0,
+    }
+
+
+def prolong(coarse, ratio):
+    """
+    Interpolates a solution linearly to the grid refined by ``ratio``.
+    """
+    fine_x = np.arange((len(coarse) - 1) * ratio + 1) / ratio
+    return np.interp(fine_x, np.arange(len(coarse)), coarse)
+
+
+def run_levels(configs, ratio=2, warm_start=True, jobs=None, cache=None, progress=None):
+    """
+    Solves all levels of a convergence study.
+
+    Runs to a change threshold (negative maxt) with ``warm_start`` solve the
+    levels one after the other, each starting from the interpolated solution of
+    the level below, so the finer levels only take the steps still needed to
+    reach the threshold. All other studies solve the levels concurrently on a
+    process pool, finest level first as it takes longest.
+
+    Args:
+        configs (list): Level configurations from ``level_configs``.
+        ratio (int): Refinement ratio between successive levels.
+        warm_start (bool): Start the levels of a threshold run from the coarser solution.
+        jobs (int, optional): Number of worker processes. Defaults to the number of levels.
+        cache (ResultCache, optional): Result cache for the levels solved from the initial condition.
+        progress (callable, optional): Called with the level index and result of each solved level.
+
+    Returns:
+        list: ``run_level`` results, coarsest level first.
+    """
+    results = [None] * len(configs)
+    if warm_start and configs[0]["maxt"] < 0:
+        start = None
+        for level, config in enumerate(configs):
+            results[level] = run_level(config, start, None if level else cache)
+            if level:
+                results[level]["time"] += results[level - 1]["time"]
+            start = prolong(results[level]["solution"], ratio)
+            if progress:
+                progress(level, results[level])
+        return results
+    with ProcessPoolExecutor(max_workers=jobs or len(configs)) as pool:
+        futures = [(level, pool.submit(run_level, configs[level], None, cache))
+                   for level in reversed(range(len(configs)))]
+        for level, future in futures:
+            results[level] = future.result()
+            if progress:
+                progress(level, results[level])
+    return results
+
+
+def analyze(configs, results, ratio=2):
+    """
+    Computes the errors, observed orders and Richardson extrapolation of a study.
+
+    The error of a level is the root mean square error against the exact
+    solution, the Fourier series solution at the final time of the level, or the
+    linear steady state for threshold runs. The observed order of a level is
+    log(e_coarse / e_fine) / log(ratio).
+
+    The finest two levels are extrapolated on the coarsest grid with the last
+    observed order, or the formal order if it is below MIN_ORDER:
+    ``u_fine + (u_fine - u_coarse) / (ratio**p - 1)``. The difference between
+    the extrapolated and the finest solution estimates the error of the latter.
+
+    Every grid represents the linear steady state exactly, so the error of a
+    threshold run is the distance left to steady state when the run stopped
+    rather than a discretization error. Threshold studies get no orders and no
+    extrapolation, their orders, extrapolated solution and estimates are None.
+
+    Args:
+        configs (list): Level configurations.
+        results (list): ``run_level`` results of the levels.
+        ratio (int): Refinement ratio between successive levels.
+
+    Returns:
+        dict: Per level rows of REPORT_COLUMNS, the error kind, the observed and used order,
+            the extrapolated solution on the coarsest grid and summary values.
+    """
+    config = configs[0]
+    exact_kind = "steady" if config["maxt"] < 0 else "exact"
+    coarse = [result["solution"][::ratio ** level] for level, result in enumerate(results)]
+    rows = []
+    for level, result in enumerate(results):
+        u = result["solution"]
+        if exact_kind == "steady":
+            error = math.sqrt(np.mean((u - np.linspace(config["bc0"], config["bc1"], len(u))) ** 2))
+        else:
+            exact = ExactSolution(config["ic"], config["bc0"], config["bc1"], config["lenx"],
+                                  result["diffusivity"], len(u))
+            error = float(ErrorTracker(exact).record(result["steps"], result["time"], u)[3])
+        order = math.nan
+        if exact_kind == "exact" and rows and rows[-1]["error"] > 0 and error > 0:
+            order = math.log(rows[-1]["error"] / error) / math.log(ratio)
+        rows.append({"level": level, "nx": len(u), "dx": result["dx"], "dt": result["dt"], "steps": result["steps"],
+                     "time": result["time"], "error": error, "order": order, "elapsed": result["elapsed"]})
+
+    report = {
+        "alg": config["alg"], "ic": config["ic"], "ratio": ratio, "error_kind": exact_kind,
+        "formal_order": FORMAL_ORDER, "observed_order": None, "extrapolation_order": None,
+        "levels": rows,
+        "finest_error_estimate": None,
+        "mean": [float(np.mean(u)) for u in coarse],
+        "extrapolated_mean": None,
+        "extrapolated": None,
+        "completed": all(result["ok"] for result in results),
+    }
+    if exact_kind == "exact":
+        observed = rows[-1]["order"]
+        order = observed if math.isfinite(observed) and observed >= MIN_ORDER else FORMAL_ORDER
+        extrapolated = coarse[-1] + (coarse[-1] - coarse[-2]) / (ratio ** order - 1)
+        report.update(observed_order=observed, extrapolation_order=order, extrapolated=extrapolated,
+                      finest_error_estimate=math.sqrt(np.mean((extrapolated - coarse[-1]) ** 2)),
+                      extrapolated_mean=float(np.mean(extrapolated)))
+        last = results[-1]
+        exact = ExactSolution(config["ic"], config["bc0"], config["bc1"], config["lenx"], last["diffusivity"],
+                              len(last["solution"]))
+        reference = exact.evaluate(last["time"], np.zeros(len(last["solution"])))[::ratio ** (len(results) - 1)]
+        report["extrapolated_error"] = math.sqrt(np.mean((extrapolated - reference) ** 2))
+    return report
+
+
+def format_report(report):
+    """
+    Formats a convergence study report as a compact text table and summary.
+    """
+    lines = ["# {0} {1}, refinement ratio {2}, error: {3}".format(
+        report["alg"], report["ic"], report["ratio"], report["error_kind"]),
+        "{0:>5} {1:>9} {2:>10} {3:>10} {4:>8} {5:>10} {6:>10} {7:>6} {8:>10}".format(*REPORT_COLUMNS)]
+    for row in report["levels"]:
+        lines.append("{level:5d} {nx:9d} {dx:10.3e} {dt:10.3e} {steps:8d} {time:10.4g} {error:10.3e} "
+                     "{order:6.2f} {elapsed:10.3f}".format(**row))
+    if report["extrapolated"] is None:
+        lines.append("Error is the distance to the linear steady state, which every grid represents exactly. "
+                     "It depends on the change threshold only, so no order or extrapolation is given.")
+    else:
+        lines.append("Observed order: {0:.3f} (formal {1})".format(report["observed_order"], report["formal_order"]))
+        lines.append("Richardson extrapolation with order {0:.3f}: mean {1!r}, finest level error estimate "
+                     "{2:.3e}".format(report["extrapolation_order"], report["extrapolated_mean"],
+                                      report["finest_error_estimate"]))
+    if "extrapolated_error" in report:
+        lines.append("Extrapolated solution error: {0:.3e}".format(report["extrapolated_error"]))
+    if not report["completed"]:
+        lines.append("Solution criteria violated on some levels, the results are not meaningful")
+    return "\n".join(lines) + "\n"
+
+
+def save_report(report, output_name):
+    """
+    Writes a convergence study report to a directory.
+
+    The files are ``<runame>_convergence.txt`` with the formatted report,
+    ``<runame>_convergence.json`` with all values and, unless the study is a
+    threshold study, ``<runame>_extrapolated.curve`` with the extrapolated
+    solution on the coarsest grid.
+
+    Args:
+        report (dict): Report from ``analyze``.
+        output_name (str): Directory to write the files to. Its base name prefixes the file names.
+    """
+    os.makedirs(output_name, exist_ok=True)
+    prefix = os.path.join(output_name, os.path.basename(os.path.normpath(output_name)))
+    with open(prefix + '_convergence.txt', 'w') as out_f:
+        out_f.write(format_report(report))
+    extrapolated = report["extrapolated"]
+    with open(prefix + '_convergence.json', 'w') as out_f:
+        json.dump(dict(report, extrapolated=None if extrapolated is None else extrapolated.tolist()), out_f, indent=1)
+    if extrapolated is not None:
+        write_array(prefix + '_extrapolated.curve', 'Temperature', report["levels"][0]["dx"], extrapolated)
+
+
+def run_study(config, levels=4, ratio=2, warm_start=True, jobs=None, cache=None, progress=None):
+    """
+    Runs a convergence study: solves a hierarchy of grids and analyzes the results.
+
+    Args:
+        config (dict): Job configuration of the coarsest level, as in ``sweep.DEFAULTS``.
+        levels (int): Number of levels.
+        ratio (int): Refinement ratio between successive levels.
+        warm_start (bool): Start the levels of a threshold run from the coarser solution.
+        jobs (int, optional): Number of worker processes.
+        cache (ResultCache, optional): Result cache for the levels solved from the initial condition.
+        progress (callable, optional): Called with the level index and result of each solved level.
+
+    Returns:
+        dict: Report from ``analyze``.
+    """
+    configs = level_configs(config, levels, ratio)
+    results = run_levels(configs, ratio, warm_start, jobs, cache, progress)
+    return analyze(configs, results, ratio)
@@ -1,5 +1,5 @@
 from .heateq import HeatEq
-import numpy as np
+from .tridiag import cn_factorization, cn_matrix, thomas_factor, thomas_solve
 
 
 class CrankN(HeatEq):
@@ -17,6 +17,8 @@ class CrankN(HeatEq):
         ic (str): Initial condition type.
         outi (int): Output interval.
         savi (int): Save interval.
+        kernel (str): Update kernel, "numpy" (vectorized) or "python" (reference loops).
+        prec (str): Precision of the solution, one of "half", "float", "double" or "quad".
     Methods:
         __init__(lenx, maxt, alpha, dx, dt, bc0, bc1, ic, outi):
             Initializes the Crank-Nicolson scheme.
@@ -30,12 +32,21 @@ class CrankN(HeatEq):
         update_solution():
             Updates the solution using the Crank-Nicolson algorithm.
 
+        set_dt():
+            Changes the time step size and refactors the matrix.
+
     Attributes:
         Inherits attributes from the base class HeatEq.
+        w (np.floating): Mesh ratio alpha * dt / dx^2.
+        cn_Amat (np.ndarray): Sub, main and super diagonals of the system matrix, shape (3, Nx).
+        cn_factor (TridiagFactor): Shared cyclic reduction factorization (numpy kernel).
+        cn_LU (tuple): LU factors of the system matrix (python kernel).
 
     """
+    __slots__ = ("w", "cn_Amat", "cn_factor", "cn_work", "cn_LU")
+
     def __init__(self, lenx: float, maxt: float, alpha: float, dx: float, dt: float, bc0: float, bc1: float, ic: str,
-                 outi: int, savi: int):
+                 outi: int, savi: int, kernel: str = "numpy", prec: str = "double"):
         """
         Initializes the Crank-Nicolson scheme.
 
@@ -50,25 +61,14 @@ class CrankN(HeatEq):
             ic (str): Initial condition type.
             outi (int): Output interval.
             savi (int): Save interval.
+            kernel (str): Update kernel, "numpy" (vectorized) or "python" (reference loops).
+            prec (str): Precision of the solution, one of "half", "float", "double" or "quad".
         """
-        super().__init__(lenx, maxt, alpha, dx, dt, bc0, bc1, ic, outi, savi)
-        w = self.alpha * self.dt / self.dx / self.dx
+        super().__init__(lenx, maxt, alpha, dx, dt, bc0, bc1, ic, outi, savi, kernel, prec)
+        self.w = self.ratio(self.alpha)
 
         # Build a tri-diagonal matrix
-        self.cn_Amat = np.zeros(3 * self.Nx)
-
-        self.cn_Amat[0 + 0 * 3] = 0.0
-        self.cn_Amat[1 + 0 * 3] = 1.0
-        self.cn_Amat[0 + 1 * 3] = 0.0
-
-        for idx in range(1, self.Nx - 1):
-            self.cn_Amat[2 + (idx - 1) * 3] = - w
-            self.cn_Amat[1 + idx * 3] = 1.0 + 2.0 * w
-            self.cn_Amat[0 + (idx + 1) * 3] = - w
-
-        self.cn_Amat[2 + (self.Nx - 2) * 3] = 0.0
-        self.cn_Amat[1 + (self.Nx - 1) * 3] = 1.0
-        self.cn_Amat[2 + (self.Nx - 1) * 3] = 0.0
+        self.cn_Amat = cn_matrix(self.Nx, self.w, self.dtype)
 
         # Factor the matrix.
         self.r83_np_fa()
@@ -76,23 +76,19 @@ class CrankN(HeatEq):
     def r83_np_fa(self):
         """
         Factors the tridiagonal matrix.
-        """
-        for idx in range(1, self.Nx):
-            assert (self.cn_Amat[1 + (idx - 1) * 3] != 0.0)
 
-            # Store the multiplier in L.
-            self.cn_Amat[2 + (idx - 1) * 3] = self.cn_Amat[2 + (idx - 1) * 3] / \
-                                              self.cn_Amat[1 + (idx - 1) * 3]
-
-            # Modify the diagonal entry in the next column.
-            self.cn_Amat[1 + idx * 3] = self.cn_Amat[1 + idx * 3] - \
-                                        self.cn_Amat[2 + (idx - 1) * 3] * \
-                                        self.cn_Amat[0 + idx * 3]
-        assert (self.cn_Amat[1 + (self.Nx - 1) * 3] != 0.0)
+        The vectorized kernel reuses a cached cyclic reduction factorization for this (Nx, w, dtype),
+        the python kernel computes the LU factors row by row.
+        """
+        if self.kernel == "python":
+            self.cn_LU = thomas_factor(self.cn_Amat[0], self.cn_Amat[1], self.cn_Amat[2])
+        else:
+            self.cn_factor = cn_factorization(self.Nx, self.w, self.dtype.name)
+            self.cn_work = self.cn_factor.workspace(self.curr.shape)
 
     def initialize(self):
         """
-        Factors the tridiagonal matrix.
+        Initializes the Crank-Nicolson scheme by setting the initial conditions.
         """
         self.set_initial_condition()
 
@@ -104,23 +100,27 @@ class CrankN(HeatEq):
             bool: True if the update is successful, False otherwise.
         """
         # r83_np_sl
-        for idx in range(self.Nx):
-            self.curr[idx] = self.last[idx]
-
-        # Solve L * Y = B.
-        for idx in range(1, self.Nx):
-            self.curr[idx] = self.curr[idx] - \
-                             self.cn_Amat[2+(idx-1)*3] * \
-                             self.curr[idx-1]
-
-        # Solve U * X = Y.
-        for idx in range(self.Nx, 0, -1):
-            self.curr[idx-1] = self.curr[idx-1] / self.cn_Amat[1+(idx-1)*3]
-            if 1 < idx:
-                self.curr[idx-2] = self.curr[idx-2] - \
-                                   self.cn_Amat[0+(idx-1)*3] * \
-                                   self.curr[idx-1]
+        if self.kernel == "python":
+            self.curr[:] = self.last
+            thomas_solve(self.cn_LU[0], self.cn_LU[1], self.cn_Amat[2], self.curr)
+        else:
+            self.cn_factor.solve(self.last, self.curr, self.cn_work)
 
         self.curr[0] = self.bc0
         self.curr[self.Nx - 1] = self.bc1
         return True
+
+    def set_dt(self, dt):
+        """
+        Changes the time step size and refactors the matrix.
+
+        Factorizations are cached per mesh ratio, so switching between a few
+        time step sizes only factors each matrix once.
+
+        Args:
+            dt (float): New time step size.
+        """
+        super().set_dt(dt)
+        self.w = self.ratio(self.alpha)
+        self.cn_Amat = cn_matrix(self.Nx, self.w, self.dtype)
+        self.r83_np_fa()
@@ -0,0 +1,178 @@
+"""Batched solver advancing many independent heat equation problems at once."""
+import os.path
+import numpy as np
+from .heateq import PRECISIONS, initial_condition
+from .initial import parse_ic
+from .output import write_array
+from .kernels import WORK_POINTS, ftcs_step, upwind15_coefficients, upwind15_step
+from .tridiag import TridiagFactor, cn_factorization, cn_matrix
+
+ALGORITHMS = ("ftcs", "upwind15", "crankn")
+
+
+class HeatEqEnsemble:
+    """
+    This class advances B independent heat equation problems that share one grid.
+
+    The members may differ in thermal diffusivity, boundary conditions and
+    initial condition. Their solutions are held as rows of a (B, Nx) array and
+    every time step updates all rows with one vectorized FTCS, Upwind 1.5 or
+    Crank-Nicolson update, so each member ends with the same result as a
+    standalone run of the matching HeatEq subclass. With a negative maxt every
+    member stops at its own change threshold, maxt^2, and keeps its solution
+    while the others continue.
+
+    Args:
+        alg (str): Algorithm, one of "ftcs", "upwind15" or "crankn".
+        lenx (float): Length of the domain.
+        maxt (float): Maximum time, or the negated square root of the change threshold if negative.
+        dx (float): Spatial step size.
+        dt (float): Time step size.
+        alpha (float or sequence): Thermal diffusivity of each member.
+        bc0 (float or sequence): Boundary condition at x = 0 of each member.
+        bc1 (float or sequence): Boundary condition at x = lenx of each member.
+        ic (str or sequence): Initial condition string of each member.
+        prec (str): Precision of the solutions, one of "half", "float", "double" or "quad".
+
+    Methods:
+        initialize():
+            Sets the initial condition of every member.
+
+        update_solution():
+            Advances every member by one time step.
+
+        solve():
+            Iterates all members to the maximum time or their change threshold.
+
+    Attributes:
+        B (int): Number of members.
+        Nx (int): Number of spatial grid points.
+        dtype (np.dtype): Floating point type of all solution arrays.
+        curr (np.ndarray): Current solutions, shape (B, Nx).
+        last (np.ndarray): Solutions from the previous time step, shape (B, Nx).
+        change (np.ndarray): Last l2 change in solution of each member.
+        min_change (float): Change threshold of the solve, 0 when solving to maxt.
+        iterations (np.ndarray): Number of time steps taken by each member.
+    """
+    def __init__(self, alg: str, lenx: float, maxt: float, dx: float, dt: float,
+                 alpha, bc0, bc1, ic, prec: str = "double"):
+        if alg not in ALGORITHMS:
+            raise ValueError("Unknown algorithm '{0}', expected one of {1}".format(alg, ALGORITHMS))
+        if prec not in PRECISIONS:
+            raise ValueError("Unknown precision '{0}', expected one of {1}".format(prec, tuple(PRECISIONS)))
+        self.dtype = np.dtype(PRECISIONS[prec])
+        ics = [ic] if isinstance(ic, str) else list(ic)
+        alpha, bc0, bc1, ics = np.broadcast_arrays(np.asarray(alpha, dtype=self.dtype),
+                                                   np.asarray(bc0, dtype=self.dtype),
+                                                   np.asarray(bc1, dtype=self.dtype),
+                                                   np.asarray(ics, dtype=object))
+        if alpha.ndim != 1:
+            raise ValueError("Ensemble parameters must be scalars or 1-D sequences")
+
+        self.alg = alg
+        self.lenx = lenx
+        self.maxt = maxt
+        self.max_iter = 99999
+        self.min_change = 0.0
+        if maxt < 0:
+            # Solve each member until its l2 change drops below maxt^2, as HeatEq does
+            self.min_change = maxt * maxt
+            self.maxt = self.max_iter
+        self.dt = dt
+        self.alpha = alpha.copy()
+        self.bc0 = bc0.copy()
+        self.bc1 = bc1.copy()
+        self.ic = list(ics)
+        for ic in set(self.ic):
+            parse_ic(ic)
+        self.B = len(self.alpha)
+
+        self.Nx = int(lenx / dx) + 1
+        self.dx = lenx / (self.Nx - 1)
+
+        self.curr = np.zeros((self.B, self.Nx), self.dtype)
+        self.last = np.zeros((self.B, self.Nx), self.dtype)
+        self.work = np.zeros((self.B, min(max(self.Nx - 2, 1), WORK_POINTS)), self.dtype)
+        self.change = np.zeros(self.B, np.result_type(self.dtype, np.float64))
+        self.iterations = np.zeros(self.B, int)
+
+        real = np.result_type(self.dtype, np.float64).type
+        ratio = self.dtype.type(real(self.dt) / (real(lenx) / (self.Nx - 1)) ** 2)
+        if alg == "ftcs":
+            self.r = (self.alpha * ratio)[:, np.newaxis]
+            unstable = np.flatnonzero(self.r[:, 0] > 0.5)
+            if len(unstable):
+                raise ValueError("FTCS is unstable (r > 0.5) for members {0}".format(unstable.tolist()))
+        elif alg == "upwind15":
+            self.k = (self.alpha * self.alpha * ratio)[:, np.newaxis]
+            self.coeffs = upwind15_coefficients(self.k)
+        else:
+            w = self.alpha * ratio
+            if np.all(w == w[0]):
+                self.cn_factor = cn_factorization(self.Nx, w[0], self.dtype.name)
+            else:
+                self.cn_factor = TridiagFactor(*cn_matrix(self.Nx, w, self.dtype))
+            self.cn_work = self.cn_factor.workspace(self.curr.shape)
+
+    def initialize(self):
+        """
+        Sets the initial condition of every member.
+
+        Members with the same initial condition copy one cached array.
+        """
+        for member, ic in enumerate(self.ic):
+            initial_condition(ic, self.dx, self.last[member])
+
+    def update_solution(self):
+        """
+        Advances every member by one time step.
+        """
+        if self.alg == "ftcs":
+            ftcs_step(self.last, self.curr, self.r)
+        elif self.alg == "upwind15":
+            upwind15_step(self.last, self.curr, self.k, self.coeffs, self.work)
+        else:
+            self.cn_factor.solve(self.last, self.curr, self.cn_work)
+        self.curr[:, 0] = self.bc0
+        self.curr[:, -1] = self.bc1
+
+    def solve(self, output_name=None):
+        """
+        Iterates all members to the maximum time or their change threshold.
+
+        Args:
+            output_name (str, optional): Directory to write the final solution of each member to.
+
+        Returns:
+            np.ndarray: Final solutions, shape (B, Nx).
+        """
+        self.initialize()
+        active = np.ones(self.B, bool)
+        change = np.zeros_like(self.change)
+        ti = 0
+        while (ti * self.dt) < self.maxt and active.any():
+            self.update_solution()
+            if not active.all():
+                # members that reached their threshold keep their solution
+                self.curr[~active] = self.last[~active]
+
+            # compute amount of change in solution, reusing last as scratch
+            np.subtract(self.curr, self.last, out=self.last)
+            np.einsum('ij,ij->i', self.last, self.last, out=change, dtype=change.dtype)
+            change /= self.Nx
+            self.change[active] = change[active]
+
+            # current solution becomes last by swapping the buffers
+            self.last, self.curr = self.curr, self.last
+            ti = ti + 1
+            self.iterations[active] = ti
+            if self.min_change:
+                active &= change >= self.min_change
+        self.curr[:] = self.last
+
+        if output_name:
+            os.makedirs(output_name, exist_ok=True)
+            for member in range(self.B):
+                write_array(os.path.join(output_name, '{0}_{1}_soln_final.curve'.format(
+                    os.path.basename(output_name), member)), 'Temperature', self.dx, self.curr[member])
+        return self.curr
@@ -0,0 +1,184 @@
+"""Exact solutions of the heat equation and tracking of the solution error."""
+import math
+import numpy as np
+from .initial import initial_values, parse_ic
+
+# Initial condition forms with a closed form Fourier series.
+EXACT_FORMS = ("const", "step", "ramp", "sin")
+# Relative size below which decayed Fourier modes are dropped.
+MODE_TOL = 1e-12
+# Largest number of modes of a series, for times very close to 0.
+MAX_MODES = 100000
+# Largest number of basis values (modes x Nx) kept in memory.
+BASIS_BUDGET = 1 << 24
+HISTORY_COLUMNS = ("step", "time", "l1", "l2", "linf")
+
+
+class ExactSolution:
+    """
+    Exact solution of the heat equation with fixed boundary values on a grid.
+
+    The solution is the linear steady state plus a Fourier sine series,
+    ``u(x, t) = s(x) + sum_n b_n exp(-D (n pi / L)^2 t) sin(n pi x / L)``, with the
+    coefficients ``b_n`` of the initial condition minus the steady state in
+    closed form. Only the modes that have not decayed below ``MODE_TOL`` are
+    summed. Their sines at the grid points are computed once and kept, so the
+    solution at another time only rescales the modes and sums them.
+
+    Args:
+        ic (str): Initial condition string, one of the EXACT_FORMS.
+        bc0 (float): Boundary value at x = 0.
+        bc1 (float): Boundary value at x = lenx.
+        lenx (float): Length of the domain.
+        diffusivity (float): Diffusivity D of the equation the scheme solves.
+        nx (int): Number of grid points.
+
+    Attributes:
+        basis (np.ndarray): Sines of the modes computed so far at the grid points, shape (modes, nx).
+    """
+    def __init__(self, ic, bc0, bc1, lenx, diffusivity, nx):
+        form = parse_ic(ic)
+        if form.kind not in EXACT_FORMS:
+            raise ValueError("No exact solution for initial condition '{0}', expected one of {1}".format(
+                ic, EXACT_FORMS))
+        self.form = form
+        self.bc0 = bc0
+        self.bc1 = bc1
+        self.lenx = lenx
+        self.diffusivity = diffusivity
+        self.nx = nx
+        self.steady = bc0 + (bc1 - bc0) * np.linspace(0.0, 1.0, nx)
+        self.coeffs = np.zeros(0)
+        self.basis = np.zeros((0, nx))
+
+    def coefficients(self, modes):
+        """
+        Returns the Fourier coefficients b_1 to b_modes.
+        """
+        if len(self.coeffs) < modes:
+            n = np.arange(1, modes + 1, dtype=np.float64)
+            k = n * math.pi / self.lenx
+            cos_n = np.where(n % 2 == 0, 1.0, -1.0)
+            kind, args = self.form.kind, self.form.args
+            if kind == "const":
+                integral = args[0] * (1 - cos_n) / k
+            elif kind == "step":
+                left, xmid, right = args
+                cos_mid = np.cos(k * min(max(xmid, 0.0), self.lenx))
+                integral = (left * (1 - cos_mid) + right * (cos_mid - cos_n)) / k
+            elif kind == "ramp":
+                left, right = args
+                integral = (left * (1 - cos_n) - (right - left) * cos_n) / k
+            else:
+                # sin(PI*x), with x in the units of the domain
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    integral = np.sin((math.pi - k) * self.lenx) / (2 * (math.pi - k)) - \
+                        np.sin((math.pi + k) * self.lenx) / (2 * (math.pi + k))
+                resonant = np.isclose(k, math.pi)
+                integral[resonant] = self.lenx / 2 - math.sin(2 * math.pi * self.lenx) / (4 * math.pi)
+            steady = (self.bc0 * (1 - cos_n) - (self.bc1 - self.bc0) * cos_n) / k
+            self.coeffs = 2 / self.lenx * (integral - steady)
+        return self.coeffs[:modes]
+
+    def modes(self, t):
+        """
+        Returns the number of modes still above MODE_TOL at time t.
+        """
+        if self.diffusivity <= 0:
+            return MAX_MODES
+        k_max = math.sqrt(math.log(1 / MODE_TOL) / (self.diffusivity * t))
+        return max(1, min(MAX_MODES, math.ceil(k_max * self.lenx / math.pi)))
+
+    def evaluate(self, t, out):
+        """
+        Evaluates the exact solution at time t on the grid.
+
+        Args:
+            t (float): Time.
+            out (np.ndarray): Array of shape (nx,) receiving the solution.
+
+        Returns:
+            np.ndarray: The solution ``out``.
+        """
+        if t <= 0:
+            out[:] = initial_values(self.form.ic, self.nx, self.lenx / (self.nx - 1))
+            return out
+        modes = self.modes(t)
+        k = np.arange(1, modes + 1) * math.pi / self.lenx
+        weights = self.coefficients(modes) * np.exp(-self.diffusivity * k * k * t)
+        if modes * self.nx <= BASIS_BUDGET:
+            if len(self.basis) < modes:
+                phase = np.linspace(0.0, math.pi, self.nx)
+                self.basis = np.sin(np.outer(np.arange(1, modes + 1), phase))
+                self.basis.flags.writeable = False
+            np.dot(weights, self.basis[:modes], out=out)
+        else:
+            # too many basis values to keep, run the sines up by the Chebyshev recurrence
+            phase = np.linspace(0.0, math.pi, self.nx)
+            two_cos = 2 * np.cos(phase)
+            prev, curr = np.zeros(self.nx), np.sin(phase)
+            out[:] = 0
+            for weight in weights:
+                out += weight * curr
+                prev, curr = curr, two_cos * curr - prev
+        out += self.steady
+        return out
+
+
+class ErrorTracker:
+    """
+    Records the L1, L2 and Linf errors of solution states against an exact solution.
+
+    The history is one (rows, 5) array of step, time and the three norms,
+    grown by doubling. The norms are means over the grid points: L1 is the mean
+    absolute error, L2 the root mean square error and Linf the largest error.
+
+    Args:
+        exact (ExactSolution): Exact solution on the grid of the solver.
+
+    Attributes:
+        exact_values (np.ndarray): Exact solution at the time of the last recorded state.
+    """
+    def __init__(self, exact):
+        self.exact = exact
+        self.exact_values = np.zeros(exact.nx)
+        self.scratch = np.zeros(exact.nx)
+        self.rows = np.zeros((16, len(HISTORY_COLUMNS)))
+        self.count = 0
+
+    @property
+    def history(self):
+        """
+        Returns the recorded rows of step, time, L1, L2 and Linf error.
+        """
+        return self.rows[:self.count]
+
+    def record(self, step, t, u):
+        """
+        Computes the errors of one solution state and appends them to the history.
+
+        Args:
+            step (int): Step index of the state.
+            t (float): Time of the state.
+            u (np.ndarray): Solution.
+
+        Returns:
+            np.ndarray: The new history row.
+        """
+        self.exact.evaluate(t, self.exact_values)
+        err = self.scratch
+        np.subtract(u, self.exact_values, out=err)
+        np.abs(err, out=err)
+        if self.count == len(self.rows):
+            self.rows = np.concatenate([self.rows, np.zeros_like(self.rows)])
+        row = self.rows[self.count]
+        row[:] = (step, t, err.mean(), math.sqrt(np.dot(err, err) / len(err)), err.max())
+        self.count = self.count + 1
+        return row
+
+    def save(self, file_name):
+        """
+        Writes the history as a text table.
+        """
+        np.savetxt(file_name, self.history, fmt=['%d'] + ['%.17g'] * 4,
+                   header=" ".join(HISTORY_COLUMNS))
@@ -1,4 +1,5 @@
 from .heateq import HeatEq
+from .kernels import ftcs_loop, ftcs_step
 
 
 class FTCS(HeatEq):
@@ -12,10 +13,18 @@ class FTCS(HeatEq):
         update_solution():
             Updates the solution using the FTCS algorithm.
 
+        advance():
+            Advances the solution by a number of FTCS steps.
+
+        stable_dt():
+            Returns the largest stable time step, r = alpha * dt / dx^2 <= 0.5.
+
     Attributes:
         Inherits attributes from the base class HeatEq.
 
     """
+    __slots__ = ()
+
     def initialize(self):
         """
         Initializes the FTCS scheme by setting the initial conditions.
@@ -29,20 +38,57 @@ class FTCS(HeatEq):
         Returns:
             bool: True if the update is successful and within stability limits, False otherwise.
         """
-        r = self.alpha * self.dt / (self.dx * self.dx)
+        r = self.ratio(self.alpha)
 
         # sanity check for stability
         if r > 0.5:
             return False
 
         # FTCS update algorithm
-        for idx in range(1, self.Nx - 1):
-            self.curr[idx] = r * self.last[idx + 1] + \
-                             (1 - 2 * r) * self.last[idx] + \
-                             r * self.last[idx - 1]
+        if self.kernel == "python":
+            ftcs_loop(self.last, self.curr, r)
+        else:
+            ftcs_step(self.last, self.curr, r)
 
         # enforce boundary conditions
         self.curr[0] = self.bc0
         self.curr[self.Nx - 1] = self.bc1
 
         return True
+
+    def advance(self, steps):
+        """
+        Advances the solution by a number of FTCS steps without computing the solution change.
+
+        The mesh ratio and stability check are hoisted out of the time loop, and
+        the solution vectors are swapped after every step, leaving the newest
+        solution in ``last``.
+
+        Args:
+            steps (int): Number of time steps.
+
+        Returns:
+            bool: True if the updates are successful and within stability limits, False otherwise.
+        """
+        if self.kernel == "python":
+            return super().advance(steps)
+        r = self.ratio(self.alpha)
+        if r > 0.5:
+            return False
+        last, curr = self.last, self.curr
+        for _ in range(steps):
+            ftcs_step(last, curr, r)
+            curr[0] = self.bc0
+            curr[-1] = self.bc1
+            last, curr = curr, last
+        self.last, self.curr = last, curr
+        return True
+
+    def stable_dt(self):
+        """
+        Returns the largest stable time step, where r = alpha * dt / dx^2 <= 0.5.
+
+        Returns:
+            float: The time step limit.
+        """
+        return 0.5 * self.dx * self.dx / self.alpha
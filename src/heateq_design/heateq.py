@@ -1,22 +1,51 @@
 import os.path
 from abc import ABC, abstractmethod
+from collections import namedtuple
 import numpy as np
-import random
 import math
 import shutil
+from .kernels import KERNELS, WORK_POINTS
+from .initial import initial_values, parse_ic
+from .tridiag import steady_factorization
+from .checkpoint import checkpoint_file, load_checkpoint, save_checkpoint
+from .exact import ErrorTracker, ExactSolution
+from .output import OUTPUTS, AsyncWriter, CurveWriter, NpyWriter, snapshot_rows, write_array
 
+# write_array moved to output, it stays importable from here
+__all__ = ["HeatEq", "MODES", "PRECISIONS", "Reduction", "State", "initial_condition", "write_array"]
 
-def write_array(file_name, var_name, dx, a):
-    with open(file_name, 'w') as out_f:
-        out_f.write('# {0}\n'.format(var_name))
-        for i in range(0, len(a)):
-            out_f.write('{0:8.4f} {1:8.4f}\n'.format(i*dx, a[i]))
+# Floating point type of the solver state for each --prec choice.
+PRECISIONS = {"half": np.float16, "float": np.float32, "double": np.float64, "quad": np.longdouble}
+# Solve modes: time stepping to maxt or a direct solve for the steady state.
+MODES = ("transient", "steady")
+
+# Solution state yielded by HeatEq.iter_states, and its reduced form.
+State = namedtuple("State", "step time solution change final")
+Reduction = namedtuple("Reduction", "step time change final min max mean l2 linf")
+
+
+def initial_condition(ic, dx, out):
+    """
+    Fills a solution vector with the initial condition described by a string.
+
+    Args:
+        ic (str): Initial condition string, e.g. "const(1)" or "step(0,0.5,1)".
+        dx (float): Spatial step size.
+        out (np.ndarray): Solution vector to fill.
+    """
+    out[...] = initial_values(ic, out.shape[-1], dx, out.dtype.name)
 
 
 class HeatEq(ABC):
     """
     Abstract base class representing the heat equation.
 
+    A solver holds the two solution vectors ``curr`` and ``last`` and a scratch
+    block of at most WORK_POINTS points for the change norm and the Upwind-15
+    stencil. Crank-Nicolson adds its system matrix (3 vectors), its solve
+    workspace (about 4 vectors) and a cyclic reduction factorization (about 5
+    vectors) that solvers on the same grid share.
+
     Methods:
         set_initial_condition():
             Sets the initial condition based on the specified string.
@@ -27,12 +56,43 @@ class HeatEq(ABC):
         update_solution():
             Abstract method to be implemented by subclasses. Updates the solution.
 
+        stable_dt():
+            Returns the largest time step for which the scheme is stable on this grid.
+
+        set_dt():
+            Changes the time step size of the solver.
+
+        add_observer():
+            Registers a callback that is called during a solve.
+
+        open_writer():
+            Creates the output directory and the snapshot writer of a solve.
+
         solve():
             Solves the heat equation by iterating until the maximum number of iterations or a change threshold is reached.
 
+        iterate():
+            Runs the time loop of a solve, handing the saved snapshots to a writer.
+
+        iter_states():
+            Solves the heat equation, yielding the solution every few time steps.
+
+        states():
+            Runs the time loop of a solve as a generator of solution states.
+
+        steady_state():
+            Solves directly for the steady state the solution relaxes to.
+
+        iterate_steady():
+            Runs a steady state solve, handing the initial and final solutions to a writer.
+
+        advance():
+            Advances the solution by a number of time steps without computing the solution change.
+
     Attributes:
         lenx (float): Length of the domain.
-        maxt (float): Maximum time.
+        maxt (float): Maximum time, or max_iter when solving to a change threshold.
+        min_change (float): Change threshold of the solve, 0 when solving to maxt.
         alpha (float): Thermal diffusivity.
         dx (float): Spatial step size.
         dt (float): Time step size.
@@ -40,25 +100,42 @@ class HeatEq(ABC):
         bc1 (float): Boundary condition at x = lenx.
         ic (str): Initial condition string.
         outi (int): Output interval.
+        chki (int): Checkpoint interval of a solve that writes output, 0 for no checkpoints.
+        kernel (str): Update kernel, "numpy" (vectorized) or "python" (reference loops).
+        prec (str): Precision of the solution, one of "half", "float", "double" or "quad".
+        dtype (np.dtype): Floating point type of all solution vectors.
+        acc_dtype (np.dtype): Floating point type the solution change is accumulated in.
+        profiler (PhaseTimer): Optional timer of the phases of a solve.
+        observers (list): (interval, callback) pairs registered with add_observer.
         max_iter (int): Maximum number of iterations.
         Nx (int): Number of spatial grid points.
         Nt (int): Number of time steps.
         curr (np.ndarray): Current solution vector.
         last (np.ndarray): Solution vector from the previous time step.
-        exact (np.ndarray): Exact solution vector.
-        change_history (np.ndarray): History of solution changes.
-        error_history (np.ndarray): History of solution errors.
+        work (np.ndarray): Scratch block of up to WORK_POINTS points for the kernels and the change norm.
+        exact (np.ndarray): Exact solution at the last tracked state, allocated on first use.
+        change_history (np.ndarray): History of solution changes, allocated on first use.
+        errors (ErrorTracker): Error tracking enabled by track_errors, or None.
+        error_history (np.ndarray): Rows of step, time, L1, L2 and Linf error of the tracked states.
+        iterations (int): Number of time steps taken by the last solve.
+        change (float): Last l2 change in solution of the last solve.
+        residual (float): Largest residual of the discrete steady state equations after a steady solve.
 
     """
+    __slots__ = ("lenx", "maxt", "max_iter", "min_change", "alpha", "dx", "dt", "bc0", "bc1", "ic", "outi",
+                 "savi", "chki", "kernel", "prec", "dtype", "acc_dtype", "profiler", "observers", "Nx", "Nt",
+                 "curr", "last", "work", "_exact", "_change_history", "errors", "iterations", "change",
+                 "residual")
 
     def __init__(self, lenx: float, maxt: float, alpha: float, dx: float,
-                 dt: float, bc0: float, bc1: float, ic: str, outi: int, savi: int):
+                 dt: float, bc0: float, bc1: float, ic: str, outi: int, savi: int,
+                 kernel: str = "numpy", prec: str = "double"):
         """
         Initializes the HeatEq class with the specified parameters.
 
         Args:
             lenx (float): Length of the domain.
-            maxt (float): Maximum time.
+            maxt (float): Maximum time if positive, the l2 change threshold as -sqrt(threshold) if negative.
             alpha (float): Thermal diffusivity.
             dx (float): Spatial step size.
             dt (float): Time step size.
@@ -67,7 +144,14 @@ class HeatEq(ABC):
             ic (str): Initial condition string.
             outi (int): Output interval.
             savi (int): Save interval.
+            kernel (str): Update kernel, "numpy" (vectorized) or "python" (reference loops).
+            prec (str): Precision of the solution, one of "half", "float", "double" or "quad".
         """
+        if kernel not in KERNELS:
+            raise ValueError("Unknown kernel '{0}', expected one of {1}".format(kernel, KERNELS))
+        if prec not in PRECISIONS:
+            raise ValueError("Unknown precision '{0}', expected one of {1}".format(prec, tuple(PRECISIONS)))
+        parse_ic(ic)
         self.alpha = alpha
         self.dx = dx
         self.dt = dt
@@ -77,68 +161,132 @@ class HeatEq(ABC):
         self.lenx = lenx
         self.maxt = maxt
         self.max_iter = 99999
+        self.min_change = 0.0
+        if maxt < 0:
+            # Solve until the l2 change drops below maxt^2 rather than to a time
+            self.min_change = maxt * maxt
+            self.maxt = self.max_iter
         self.outi = outi
         self.savi = savi
+        self.chki = 0
+        self.kernel = kernel
+        self.prec = prec
+        self.dtype = np.dtype(PRECISIONS[prec])
+        self.acc_dtype = np.result_type(self.dtype, np.float64)
+        self.profiler = None
+        self.observers = []
 
         self.Nx = int(self.lenx / self.dx) + 1
         self.Nt = int(self.maxt / self.dt)
         self.dx = self.lenx / (self.Nx - 1)
 
-        # Init vectors
-        self.curr = np.zeros(self.Nx)
-        self.last = np.zeros(self.Nx)
-        self.exact = np.zeros(self.Nx)
-        self.change_history = np.zeros(self.Nx)
-        self.error_history = np.zeros(self.Nx)
+        # Init vectors, the diagnostic vectors are only allocated when used
+        self.curr = np.zeros(self.Nx, self.dtype)
+        self.last = np.zeros(self.Nx, self.dtype)
+        self.work = np.zeros(min(max(self.Nx - 2, 1), WORK_POINTS), self.dtype)
+        self._exact = None
+        self._change_history = None
+        self.errors = None
+
+    @property
+    def exact(self):
+        if self.errors is not None:
+            return self.errors.exact_values
+        if self._exact is None:
+            self._exact = np.zeros(self.Nx, self.dtype)
+        return self._exact
+
+    @property
+    def change_history(self):
+        if self._change_history is None:
+            self._change_history = np.zeros(self.Nx, self.dtype)
+        return self._change_history
+
+    @property
+    def error_history(self):
+        if self.errors is None:
+            return np.zeros((0, 5))
+        return self.errors.history
+
+    def diffusivity(self):
+        """
+        Returns the diffusivity of the equation the scheme solves.
+        """
+        return self.alpha
+
+    def track_errors(self):
+        """
+        Records the error of every saved solution against the exact solution.
+
+        The errors go to ``error_history`` and, in a solve with output, to
+        ``<runame>_errors.txt``. Only the initial conditions with a closed form
+        Fourier series are supported.
+        """
+        self.errors = ErrorTracker(ExactSolution(self.ic, self.bc0, self.bc1, self.lenx,
+                                                 self.diffusivity(), self.Nx))
+
+    def state_time(self, ti, final=False):
+        """
+        Returns the time of the solution state yielded at step ti.
+
+        The state of step ti > 0 holds the solution after ti + 1 steps, the final
+        state the solution after ti steps.
+        """
+        if final:
+            return ti * self.dt
+        return (ti + 1) * self.dt if ti > 0 else 0.0
+
+    def ratio(self, coeff):
+        """
+        Returns coeff * dt / dx^2 in the precision of the solver.
+
+        The ratio is computed in at least double precision, so small dt and dx do not underflow at half precision.
+
+        Args:
+            coeff (float): Coefficient of the ratio, e.g. alpha.
+
+        Returns:
+            np.floating: The ratio as a scalar of the solver dtype.
+        """
+        real = np.result_type(self.dtype, np.float64).type
+        return self.dtype.type(real(coeff) * real(self.dt) / (real(self.lenx) / (self.Nx - 1)) ** 2)
+
+    def change_sums(self):
+        """
+        Returns the sums of squared changes between last and curr without temporary arrays.
+
+        The interior differences are formed block by block in ``work`` and the
+        squares are accumulated in ``acc_dtype``.
+
+        Returns:
+            tuple: Sums over the interior and over the two boundary points.
+        """
+        real = self.acc_dtype.type
+        interior = real(0)
+        block = len(self.work)
+        for lo in range(1, self.Nx - 1, block):
+            hi = min(lo + block, self.Nx - 1)
+            inner = self.work[:hi - lo]
+            np.subtract(self.curr[lo:hi], self.last[lo:hi], out=inner)
+            interior = interior + np.einsum('i,i->', inner, inner, dtype=self.acc_dtype)
+        boundary = real(0)
+        for idx in {0, self.Nx - 1}:
+            edge = real(self.curr[idx]) - real(self.last[idx])
+            boundary = boundary + edge * edge
+        return interior, boundary
+
+    def change_norm(self):
+        """
+        Returns the l2 change sum((curr - last)^2) / Nx of the last step.
+        """
+        interior, boundary = self.change_sums()
+        return (interior + boundary) / self.Nx
 
     def set_initial_condition(self):
         """
         Sets the initial condition based on the specified string.
         """
-        if self.ic.startswith("const("):  # const(val)
-            cval = float(self.ic[self.ic.find("(") + 1: self.ic.find(")")])
-            self.last[self.last == 0] = cval
-        elif self.ic.startswith("step("):  # step(left,xmid,right)
-            cvals = self.ic[self.ic.find("(") + 1: self.ic.find(")")].split(sep=',')
-            left = float(cvals[0])
-            xmid = float(cvals[1])
-            right = float(cvals[2])
-            x = 0
-            for idx in range(self.Nx):
-                if x < xmid:
-                    self.last[idx] = left
-                else:
-                    self.last[idx] = right
-                x = x + self.dx
-        elif self.ic.startswith("ramp("):  # ramp(left,right)
-            cvals = self.ic[self.ic.find("(") + 1: self.ic.find(")")].split(sep=',')
-            left = float(cvals[0])
-            right = float(cvals[1])
-            dv = (right - left) / (self.Nx - 1)
-            self.last[0] = left
-            for idx in range(1, self.Nx):
-                self.last[idx] = self.last[idx - 1] + dv
-        elif self.ic.startswith("rand("):  # rand(seed,base,amp)
-            cvals = self.ic[self.ic.find("(") + 1: self.ic.find(")")].split(sep=',')
-            seed = int(cvals[0])
-            base = float(cvals[1])
-            amp = float(cvals[2])
-            maxr = (1 << 31) - 1
-            random.seed(seed)
-            for idx in range(self.Nx):
-                self.last[idx] = base + amp * (2 * random.random() / maxr - 1)
-        elif self.ic.startswith("sin("):  # sin(PI*x)
-            self.last[0] = self.dx
-            for idx in range(1, self.Nx):
-                self.last[idx] = math.pi * (self.last[idx - 1] + self.dx)
-        elif self.ic.startswith("spikes("):  # spikes(Const,Amp,Loc,Amp,Loc,...)
-            cvals = self.ic[self.ic.find("(") + 1: self.ic.find(")")].split(sep=',')
-            self.last[self.last == 0] = float(cvals[0])
-            for idx in range(1, len(cvals) - 1):
-                amp = float(cvals[idx])
-                spike_idx = int(cvals[idx + 1])
-                if spike_idx < self.Nx:
-                    self.last[spike_idx] = amp
+        initial_condition(self.ic, self.dx, self.last)
 
     @abstractmethod
     def initialize(self):
@@ -156,46 +304,435 @@ class HeatEq(ABC):
         """
         pass
 
-    def solve(self, output_name):
+    def stable_dt(self):
+        """
+        Returns the largest time step for which the scheme is stable on this grid.
+
+        Returns:
+            float: The time step limit, infinite for unconditionally stable schemes.
+        """
+        return math.inf
+
+    def set_dt(self, dt):
+        """
+        Changes the time step size of the solver.
+
+        Args:
+            dt (float): New time step size.
+        """
+        self.dt = dt
+        self.Nt = int(self.maxt / self.dt)
+
+    def add_observer(self, observer, every=1):
+        """
+        Registers a callback that is called during a solve.
+
+        The observer is called as ``observer(solver, metrics)`` after every
+        ``every``-th time step, where ``solver.curr`` holds the new solution and
+        ``metrics`` is a dict with the step index, the time of the new solution
+        and the l2 change of the step.
+
+        Args:
+            observer (callable): The callback.
+            every (int): Call interval in time steps.
+        """
+        if every < 1:
+            raise ValueError("Observer interval must be at least 1, got {0}".format(every))
+        self.observers.append((every, observer))
+
+    def time_steps(self):
+        """
+        Returns the number of time steps of a solve to maxt.
+        """
+        steps = int(self.maxt / self.dt)
+        while steps * self.dt < self.maxt:
+            steps = steps + 1
+        while steps > 0 and (steps - 1) * self.dt >= self.maxt:
+            steps = steps - 1
+        return steps
+
+    def next_event(self, ti, steps, every=0):
+        """
+        Returns the first step from ti on whose solution change is needed.
+
+        These are the steps whose state is yielded, that print progress or call observers,
+        the steps checked against a change threshold and the last step. Checkpoint
+        steps end a run of fused steps too, so the checkpoint catches ``last``.
+
+        Args:
+            ti (int): Index of the next time step.
+            steps (int): Number of time steps of the solve.
+            every (int): Interval of the yielded states, 0 for none.
+
+        Returns:
+            int: Index of the step.
+        """
+        if self.maxt == self.max_iter:
+            return ti
+        event = steps - 1
+        for interval, _ in self.observers:
+            event = min(event, -(-ti // interval) * interval)
+        if every:
+            event = min(event, -(-max(ti, 1) // every) * every)
+        if self.outi:
+            event = min(event, -(-ti // self.outi) * self.outi)
+        if self.chki:
+            event = min(event, -(-max(ti, 1) // self.chki) * self.chki)
+        return event
+
+    def advance(self, steps):
+        """
+        Advances the solution by a number of time steps without computing the solution change.
+
+        The two solution vectors are swapped after every step instead of copied, so
+        ``last`` holds the newest solution on return.
+
+        Args:
+            steps (int): Number of time steps.
+
+        Returns:
+            bool: True if the updates are successful, False otherwise.
+        """
+        for _ in range(steps):
+            if not self.update_solution():
+                return False
+            self.last, self.curr = self.curr, self.last
+        return True
+
+    def open_writer(self, output_name, output="curve", outq=0, resume=None):
+        """
+        Creates the output directory and the snapshot writer of a solve.
+
+        Args:
+            output_name (str): Directory to write the solution files to. Its base name prefixes the file names.
+            output (str): Snapshot format, "curve" (one text file per snapshot) or "npy" (one memory-mapped array).
+            outq (int): Number of snapshot buffers of a background writer thread, 0 to write synchronously.
+            resume (int, optional): Keep the existing output and continue writing at this time step.
+
+        Returns:
+            CurveWriter, NpyWriter or AsyncWriter: The snapshot writer.
+        """
+        if output not in OUTPUTS:
+            raise ValueError("Unknown output '{0}', expected one of {1}".format(output, OUTPUTS))
+        prefix = os.path.join(output_name, os.path.basename(os.path.normpath(output_name)))
+        if resume is None:
+            if os.path.isdir(output_name):
+                shutil.rmtree(output_name)
+            os.makedirs(output_name)
+        if output == "npy" and resume is not None:
+            writer = NpyWriter.resume(prefix, resume)
+        elif output == "npy":
+            # The number of steps to a change threshold is unknown, the file grows as needed
+            rows = 2 if self.maxt == self.max_iter else snapshot_rows(self.time_steps(), self.savi)
+            writer = NpyWriter(prefix, self.dx, self.dt, self.Nx, rows, type(self).__name__, self.curr.dtype)
+        else:
+            writer = CurveWriter(prefix, self.dx)
+        if outq:
+            writer = AsyncWriter(writer, self.Nx, self.curr.dtype, outq)
+        return writer
+
+    def solve(self, output_name, noout=0, output="curve", outq=0, mode="transient", warm=0, restart=False,
+              record=None):
         """
         Solves the heat equation by iterating until the maximum number of iterations or a change threshold is reached.
+
+        With mode "steady" the time loop is replaced by one direct solve for the steady state.
+
+        A solve with output writes a checkpoint every ``chki`` steps. With ``restart`` it
+        continues from the checkpoint in ``output_name`` instead of the initial condition,
+        keeping the output written so far, and its output is identical to that of an
+        uninterrupted solve. Without a checkpoint it starts from the initial condition.
+
+        Args:
+            output_name (str): Directory to write the solution files to. Its base name prefixes the file names.
+            noout (int): Disable all file outputs when non-zero.
+            output (str): Snapshot format, "curve" (one text file per snapshot) or "npy" (one memory-mapped array).
+            outq (int): Number of snapshot buffers of a background writer thread, 0 to write synchronously.
+            mode (str): "transient" to step in time, "steady" to solve for the steady state.
+            warm (int): Number of time steps taken before a steady state solve.
+            restart (bool): Continue from the last checkpoint of a previous solve.
+            record (RecordingWriter, optional): Also receives the saved snapshots, with or without file output.
+
+        Returns:
+            bool: True if the solve completed, False if the solution criteria were violated.
         """
-        if os.path.isdir(output_name):
-            shutil.rmtree(output_name)
-        os.makedirs(output_name)
+        if mode not in MODES:
+            raise ValueError("Unknown mode '{0}', expected one of {1}".format(mode, MODES))
+        prof = self.profiler
+        if prof:
+            prof.start()
+        checkpoint = None
+        start = None
+        if not noout and mode == "transient":
+            checkpoint = checkpoint_file(os.path.join(output_name, os.path.basename(os.path.normpath(output_name))))
+            if restart and os.path.isfile(checkpoint):
+                start = load_checkpoint(checkpoint, self)
+                print("Restarting from checkpoint at iteration {0}\n".format(start))
+            elif restart:
+                print("No checkpoint found in {0}, starting from the initial condition\n".format(output_name))
+        writer = None if noout else self.open_writer(output_name, output, outq, start)
+        if record is not None:
+            record.writer = writer
+            writer = record
+        if prof:
+            prof.lap("open")
+        try:
+            if mode == "steady":
+                return self.iterate_steady(writer, warm)
+            return self.iterate(writer, start, checkpoint if self.chki else None)
+        finally:
+            if writer:
+                writer.close()
+                if self.errors and not noout:
+                    prefix = os.path.join(output_name, os.path.basename(os.path.normpath(output_name)))
+                    self.errors.save(prefix + '_errors.txt')
+                if prof:
+                    prof.lap("close")
 
-        self.initialize()
+    def iterate(self, writer=None, start=None, checkpoint=None):
+        """
+        Runs the time loop of a solve, handing the saved snapshots to a writer.
+
+        The writer and the error tracking consume the solution states of ``states``.
+
+        Args:
+            writer (CurveWriter, NpyWriter or AsyncWriter, optional): Receives the saved snapshots.
+            start (int, optional): Time step to continue with, ``last`` and ``change`` already restored
+                from a checkpoint. The solve starts from the initial condition if omitted.
+            checkpoint (str, optional): Checkpoint file written every ``chki`` steps.
+
+        Returns:
+            bool: True if the solve completed, False if the solution criteria were violated.
+        """
+        prof = self.profiler
+        done = False
+        for ti, a, final in self.states(self.savi if writer or self.errors else 0, start, checkpoint,
+                                        writer.flush if writer else None):
+            if writer:
+                writer.write(ti, a, final, t=self.state_time(ti, final))
+                if prof:
+                    prof.lap("write")
+            if self.errors:
+                self.errors.record(ti, self.state_time(ti, final), a)
+                if prof:
+                    prof.lap("error")
+            done = final
+        return done
+
+    def iter_states(self, every=1, copy=False, reduce=False):
+        """
+        Solves the heat equation, yielding the solution every ``every`` time steps.
 
-        # Write initial condition
-        write_array(os.path.join(output_name, output_name + '_soln_{0}.curve'.format(0)),
-                    'Temperature', self.dx, self.last)
+        States are produced lazily as the solve advances, without file output and
+        in constant memory: the initial condition, every ``every``-th step and the
+        final solution, which is flagged ``final``. A solve that violates the
+        solution criteria ends without a final state.
+
+        By default the solution of a state is a read-only view of the solver
+        vector, valid until the generator is resumed. ``copy`` yields copies
+        instead, and ``reduce`` yields only a ``Reduction`` of the solution.
+
+        Args:
+            every (int): Interval in time steps of the states, 0 for the initial and final states only.
+            copy (bool): Yield copies of the solution that stay valid.
+            reduce (bool): Yield min, max, mean and norms of the solution instead of the solution.
+
+        Yields:
+            State or Reduction: Step index, time, l2 change and solution or reductions.
+        """
+        prof = self.profiler
+        for ti, a, final in self.states(every):
+            t = self.state_time(ti, final)
+            if reduce:
+                mean = np.sum(a, dtype=self.acc_dtype) / self.Nx
+                l2 = np.einsum('i,i->', a, a, dtype=self.acc_dtype) / self.Nx
+                amin, amax = a.min(), a.max()
+                yield Reduction(ti, t, self.change, final, amin, amax, mean, l2, max(-amin, amax))
+            else:
+                if copy:
+                    a = a.copy()
+                else:
+                    a = a.view()
+                    a.flags.writeable = False
+                yield State(ti, t, a, self.change, final)
+            if prof:
+                prof.lap("consume")
+
+    def states(self, every=0, start=None, checkpoint=None, flush=None):
+        """
+        Runs the time loop of a solve as a generator of solution states.
+
+        Yields the initial condition, the solution of every ``every``-th step and,
+        if the solve completes, the final solution. The yielded arrays are the
+        solver vectors themselves and must not be modified.
+
+        Args:
+            every (int): Interval in time steps of the states, 0 for the initial and final states only.
+            start (int, optional): Time step to continue with, ``last`` and ``change`` already restored
+                from a checkpoint. The solve starts from the initial condition, which is not yielded again,
+                if omitted.
+            checkpoint (str, optional): Checkpoint file written every ``chki`` steps.
+            flush (callable, optional): Called before a checkpoint is written.
+
+        Yields:
+            tuple: Step index, solution vector and whether it is the final solution.
+        """
+        prof = self.profiler
+        if prof:
+            prof.start()
+        if start is None:
+            self.initialize()
+            if prof:
+                prof.lap("init")
+            self.change = 0.0
+            yield 0, self.last, False
 
         # Iterate to max iterations or solution change is below threshold
-        ti = 0
-        while (ti * self.dt) < self.maxt:
+        ti = start or 0
+        steps = self.time_steps()
+        while ti < steps:
+            # Fuse the steps that need no change norm, output or save
+            event = self.next_event(ti, steps, every)
+            if event > ti:
+                if not self.advance(event - ti):
+                    print("Solution criteria violated. Make better choices\n")
+                    self.iterations = ti
+                    return
+                if prof:
+                    prof.lap("advance", event - ti)
+                ti = event
+
+            if checkpoint and ti > 0 and ti % self.chki == 0 and ti != start:
+                # The snapshots before ti must be on disk before the checkpoint claims them
+                if flush:
+                    flush()
+                save_checkpoint(checkpoint, self, ti)
+                if prof:
+                    prof.lap("checkpoint")
+
             if not self.update_solution():
                 print("Solution criteria violated. Make better choices\n")
+                self.iterations = ti
                 return
+            if prof:
+                prof.lap("update")
 
             # compute amount of change in solution
-            diff = self.curr - self.last
-            change = np.sum(diff*diff) / self.Nx
+            change = self.change_norm()
+            self.change = change
+            if prof:
+                prof.lap("norm")
 
-            if ti > 0 and self.savi and ti % self.savi == 0:
-                write_array(os.path.join(output_name, output_name + '_soln_{0}.curve'.format(ti)),
-                            'Temperature', self.dx, self.curr)
+            if ti > 0 and every and ti % every == 0:
+                yield ti, self.curr, False
 
             # Handle possible termination by change threshold
-            if self.maxt == self.max_iter and change < (-self.maxt * -self.maxt):
+            if self.maxt == self.max_iter and change < self.min_change:
+                # The current solution already holds the update of step ti
+                ti = ti + 1
                 print("Stopped after {0} iterations for threshold {1}\n".format(ti, change))
                 break
 
             if self.outi and ti % self.outi == 0:
                 print("Iteration {0}: last change l2={1}\n".format(ti, change))
+                if prof:
+                    prof.lap("print")
+
+            for interval, observer in self.observers:
+                if ti % interval == 0:
+                    observer(self, {"step": ti, "time": (ti + 1) * self.dt, "change": change})
+            if prof and self.observers:
+                prof.lap("observe")
 
             # Copy current solution to last
             self.last[:] = self.curr
             ti = ti + 1
-        write_array(os.path.join(output_name, output_name + '_soln_final.curve'),
-                         'Temperature', self.dx, self.curr)
+            if prof:
+                prof.lap("copy")
+        self.iterations = ti
+        yield ti, self.curr, True
+
+    def steady_state(self, out):
+        """
+        Solves directly for the steady state the solution relaxes to.
+
+        Both boundaries are fixed, so the steady state solves u'' = 0 with the
+        boundary values, one tridiagonal solve. The stencils of all schemes are
+        exact for the linear solution, so this is also the steady state of their
+        discrete equations. The solve runs in at least double precision.
+
+        Args:
+            out (np.ndarray): Array receiving the steady state.
+
+        Returns:
+            np.ndarray: The steady state ``out``.
+        """
+        rhs = np.zeros(self.Nx, self.acc_dtype)
+        rhs[0] = self.bc0
+        rhs[-1] = self.bc1
+        out[:] = steady_factorization(self.Nx, self.acc_dtype.name).solve(rhs, rhs)
+        return out
+
+    def iterate_steady(self, writer=None, warm=0):
+        """
+        Runs a steady state solve, handing the initial and final solutions to a writer.
+
+        After ``warm`` ordinary time steps the solution jumps to the steady state.
+        ``change`` is the l2 change of that jump, so it measures how far the
+        time stepped solution still was from steady state, and ``residual`` is
+        the largest residual of the discrete equations at the steady state.
+        Tracked errors are recorded for the initial solution and for the steady
+        state, which is compared with the exact solution at infinite time.
+
+        Args:
+            writer (CurveWriter, NpyWriter or AsyncWriter, optional): Receives the initial and final solutions.
+            warm (int): Number of time steps taken before the steady state solve.
+
+        Returns:
+            bool: True if the solve completed, False if the solution criteria were violated.
+        """
+        prof = self.profiler
+        if prof:
+            prof.start()
+        self.initialize()
+        if prof:
+            prof.lap("init")
+        if writer:
+            writer.write(0, self.last)
+            if prof:
+                prof.lap("write")
+        if self.errors:
+            self.errors.record(0, 0.0, self.last)
+            if prof:
+                prof.lap("error")
+
+        if warm:
+            if not self.advance(warm):
+                print("Solution criteria violated. Make better choices\n")
+                self.iterations = 0
+                return False
+            if prof:
+                prof.lap("advance", warm)
+
+        self.steady_state(self.curr)
+        if prof:
+            prof.lap("steady")
+        self.change = self.change_norm()
+        curv = np.diff(self.curr.astype(self.acc_dtype), 2)
+        self.residual = float(np.max(np.abs(curv))) if len(curv) else 0.0
+        if prof:
+            prof.lap("norm")
+        print("Steady state after {0} steps: last change l2={1} residual={2}\n".format(
+            warm, self.change, self.residual))
 
+        self.last[:] = self.curr
+        self.iterations = warm
+        if writer:
+            writer.write(warm, self.curr, final=True)
+            if prof:
+                prof.lap("write")
+        if self.errors:
+            self.errors.record(warm, math.inf, self.curr)
+            if prof:
+                prof.lap("error")
+        return True
@@ -0,0 +1,144 @@
+"""Parsing and vectorized evaluation of initial condition expressions."""
+import re
+from functools import lru_cache
+import numpy as np
+
+# Argument names of each initial condition form. spikes takes a constant
+# followed by any number of (amplitude, index) pairs.
+FORMS = {
+    "const": ("val",),
+    "step": ("left", "xmid", "right"),
+    "ramp": ("left", "right"),
+    "rand": ("seed", "base", "amp"),
+    "sin": (),
+    "spikes": ("const",),
+}
+
+_EXPR = re.compile(r"^\s*(\w+)\s*\((.*)\)\s*$")
+
+
+class InitialCondition:
+    """
+    Parsed and validated initial condition expression.
+
+    The supported forms are ``const(val)``, ``step(left,xmid,right)``,
+    ``ramp(left,right)``, ``rand(seed,base,amp)``, ``sin(PI*x)`` and
+    ``spikes(const,amp,idx,amp,idx,...)``. Evaluation is vectorized.
+
+    Args:
+        ic (str): Initial condition string, e.g. "const(1)" or "step(0,0.5,1)".
+
+    Attributes:
+        ic (str): The initial condition string.
+        kind (str): Name of the form, e.g. "step".
+        args (tuple): Parsed arguments of the form.
+    """
+    def __init__(self, ic):
+        match = _EXPR.match(ic)
+        if not match or match.group(1) not in FORMS:
+            raise ValueError("Unknown initial condition '{0}', expected one of {1}".format(
+                ic, ", ".join(name + "(" + ",".join(FORMS[name]) + ")" for name in FORMS)))
+        self.ic = ic
+        self.kind = match.group(1)
+        text = match.group(2).strip()
+        fields = [field.strip() for field in text.split(",")] if text else []
+        try:
+            if self.kind == "sin":
+                if fields and fields != ["PI*x"]:
+                    raise ValueError
+                self.args = ()
+            elif self.kind == "spikes":
+                if len(fields) % 2 != 1:
+                    raise ValueError
+                self.args = (float(fields[0]),) + tuple(
+                    (float(amp), int(idx)) for amp, idx in zip(fields[1::2], fields[2::2]))
+            else:
+                if len(fields) != len(FORMS[self.kind]):
+                    raise ValueError
+                self.args = tuple(int(field) if name == "seed" else float(field)
+                                  for name, field in zip(FORMS[self.kind], fields))
+        except ValueError:
+            raise ValueError("Malformed initial condition '{0}', expected {1}({2})".format(
+                ic, self.kind, "PI*x" if self.kind == "sin" else ",".join(FORMS[self.kind]) +
+                (",amp,idx,..." if self.kind == "spikes" else ""))) from None
+
+    def __repr__(self):
+        return "InitialCondition({0!r})".format(self.ic)
+
+    def evaluate(self, nx, dx, dtype=np.float64):
+        """
+        Evaluates the initial condition on a grid.
+
+        Args:
+            nx (int): Number of grid points.
+            dx (float): Spatial step size.
+            dtype (np.dtype): Floating point type of the result.
+
+        Returns:
+            np.ndarray: The initial condition at the nx grid points.
+        """
+        dtype = np.dtype(dtype)
+        if self.kind == "const":
+            return np.full(nx, self.args[0], dtype)
+        if self.kind == "step":
+            left, xmid, right = self.args
+            x = np.arange(nx) * dx
+            return np.where(x < xmid, left, right).astype(dtype)
+        if self.kind == "ramp":
+            return np.linspace(self.args[0], self.args[1], nx).astype(dtype)
+        if self.kind == "rand":
+            seed, base, amp = self.args
+            uniform = np.random.default_rng(seed).random(nx)
+            return (base + amp * (2 * uniform - 1)).astype(dtype)
+        if self.kind == "sin":
+            return np.sin(np.pi * np.arange(nx) * dx).astype(dtype)
+        out = np.full(nx, self.args[0], dtype)
+        for amp, idx in self.args[1:]:
+            if 0 <= idx < nx:
+                out[idx] = amp
+        return out
+
+
+@lru_cache(maxsize=64)
+def parse_ic(ic):
+    """
+    Returns the cached parsed form of an initial condition string.
+    """
+    return InitialCondition(ic)
+
+
+# Largest grid the evaluated initial conditions are cached for. Larger grids are
+# evaluated on every call, so the cache holds at most 8 * 64k points per dtype size.
+CACHE_MAX_NX = 1 << 16
+
+
+def initial_values(ic, nx, dx, dtype="float64"):
+    """
+    Returns the initial condition on a grid, cached for grids of up to CACHE_MAX_NX points.
+
+    Solvers and ensemble members with the same initial condition, grid and
+    precision share one read-only array and copy it into their solution.
+    Larger grids are evaluated on every call, so the cache never pins more
+    than a few small arrays.
+
+    Args:
+        ic (str): Initial condition string.
+        nx (int): Number of grid points.
+        dx (float): Spatial step size.
+        dtype (str): Name of the floating point type.
+
+    Returns:
+        np.ndarray: Read-only initial condition of shape (nx,).
+    """
+    if nx <= CACHE_MAX_NX:
+        return _cached_values(ic, nx, dx, dtype)
+    values = parse_ic(ic).evaluate(nx, dx, np.dtype(dtype))
+    values.flags.writeable = False
+    return values
+
+
+@lru_cache(maxsize=8)
+def _cached_values(ic, nx, dx, dtype):
+    values = parse_ic(ic).evaluate(nx, dx, np.dtype(dtype))
+    values.flags.writeable = False
+    return values
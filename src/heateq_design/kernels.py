@@ -0,0 +1,155 @@
+"""Stencil kernels used by the explicit heat equation schemes.
+
+Each scheme has two kernels: a reference ``*_loop`` kernel that updates the grid
+one point at a time, and a vectorized kernel that computes the whole step with
+slice arithmetic into preallocated buffers. The vectorized kernels operate on
+the last axis, so they accept a single solution vector of shape ``(Nx,)`` as
+well as a stack of solutions of shape ``(B, Nx)``. Kernels that need scratch
+space work through the grid in blocks the size of their scratch buffer.
+"""
+import numpy as np
+
+KERNELS = ("numpy", "python")
+# Points per block of the scratch buffers, small enough to stay in cache.
+WORK_POINTS = 1 << 14
+
+
+def ftcs_loop(last, curr, r):
+    """
+    Reference FTCS update, one grid point at a time.
+
+    Args:
+        last (np.ndarray): Solution vector from the previous time step.
+        curr (np.ndarray): Solution vector to write the interior points into.
+        r (float): Mesh ratio alpha * dt / dx^2.
+    """
+    for idx in range(1, len(last) - 1):
+        curr[idx] = r * last[idx + 1] + \
+                    (1 - 2 * r) * last[idx] + \
+                    r * last[idx - 1]
+
+
+def ftcs_step(last, curr, r):
+    """
+    Vectorized FTCS update of the interior points, without scratch space.
+
+    Args:
+        last (np.ndarray): Solution from the previous time step, shape (..., Nx).
+        curr (np.ndarray): Output array with the same shape as ``last``.
+        r (float or np.ndarray): Mesh ratio, a scalar or broadcastable to (..., 1).
+    """
+    inner = curr[..., 1:-1]
+    mid = last[..., 1:-1]
+    np.add(last[..., 2:], last[..., :-2], out=inner)
+    inner -= mid
+    inner -= mid
+    inner *= r
+    inner += mid
+
+
+def upwind15_coefficients(k):
+    """
+    Returns the stencil weights of the Upwind 1.5 scheme.
+
+    Args:
+        k (float or np.ndarray): Scheme ratio alpha^2 * dt / dx^2.
+
+    Returns:
+        tuple: Weights (c2, c1, c0) for the points at distance 2, 1 and 0.
+    """
+    k2 = k * k
+    c2 = (12 * k2 - 2 * k) / 24
+    c1 = -(12 * k2 - 8 * k) / 6
+    c0 = (12 * k2 - 10 * k + 4) / 4
+    return c2, c1, c0
+
+
+def upwind15_loop(last, curr, k):
+    """
+    Reference Upwind 1.5 update, one grid point at a time.
+
+    Args:
+        last (np.ndarray): Solution vector from the previous time step.
+        curr (np.ndarray): Solution vector to write the interior points into.
+        k (float): Scheme ratio alpha^2 * dt / dx^2.
+    """
+    f2 = 1.0 / 24
+    f1 = 1.0 / 6
+    f0 = 1.0 / 4
+    k2 = k * k
+    nx = len(last)
+
+    curr[1] = last[1] + k * (last[0] - 2 * last[1] + last[2])
+    curr[nx - 2] = last[nx - 2] + k * (last[nx - 3] - 2 * last[nx - 2] + last[nx - 1])
+    for idx in range(2, nx - 2):
+        curr[idx] = f2 * (12 * k2 - 2 * k) * last[idx - 2] \
+                    + f2 * (12 * k2 - 2 * k) * last[idx + 2] \
+                    - f1 * (12 * k2 - 8 * k) * last[idx - 1] \
+                    - f1 * (12 * k2 - 8 * k) * last[idx + 1] \
+                    + f0 * (12 * k2 - 10 * k + 4) * last[idx]
+
+
+def upwind15_step(last, curr, k, coeffs, work):
+    """
+    Vectorized Upwind 1.5 update of the interior points.
+
+    The points next to the boundaries fall back to the three point FTCS stencil.
+
+    Args:
+        last (np.ndarray): Solution from the previous time step, shape (..., Nx).
+        curr (np.ndarray): Output array with the same shape as ``last``.
+        k (float or np.ndarray): Scheme ratio, a scalar or broadcastable to (..., 1).
+        coeffs (tuple): Stencil weights as returned by ``upwind15_coefficients``.
+        work (np.ndarray): Scratch array of shape (..., m) for any m >= 1.
+    """
+    nx = last.shape[-1]
+    for idx in (1, nx - 2):
+        upwind15_edge(last, curr, k, idx)
+    upwind15_inner(last, curr, coeffs, work)
+
+
+def upwind15_edge(last, curr, k, idx):
+    """
+    Updates one point next to a boundary with the three point stencil.
+
+    Args:
+        last (np.ndarray): Solution from the previous time step, shape (..., Nx).
+        curr (np.ndarray): Output array with the same shape as ``last``.
+        k (float or np.ndarray): Scheme ratio, a scalar or broadcastable to (..., 1).
+        idx (int): Index of the point.
+    """
+    edge = curr[..., idx:idx + 1]
+    mid = last[..., idx:idx + 1]
+    np.add(last[..., idx - 1:idx], last[..., idx + 1:idx + 2], out=edge)
+    edge -= mid
+    edge -= mid
+    edge *= k
+    edge += mid
+
+
+def upwind15_inner(last, curr, coeffs, work):
+    """
+    Updates the points 2 to Nx - 3 with the five point Upwind 1.5 stencil.
+
+    The points are updated in blocks the size of ``work``.
+
+    Args:
+        last (np.ndarray): Solution from the previous time step, shape (..., Nx).
+        curr (np.ndarray): Output array with the same shape as ``last``.
+        coeffs (tuple): Stencil weights as returned by ``upwind15_coefficients``.
+        work (np.ndarray): Scratch array of shape (..., m) for any m >= 1.
+    """
+    c2, c1, c0 = coeffs
+    n = last.shape[-1] - 4
+    block = work.shape[-1]
+    for lo in range(0, n, block):
+        hi = min(lo + block, n)
+        inner = curr[..., lo + 2:hi + 2]
+        tmp = work[..., :hi - lo]
+        np.add(last[..., lo:hi], last[..., lo + 4:hi + 4], out=inner)
+        inner *= c2
+        np.add(last[..., lo + 1:hi + 1], last[..., lo + 3:hi + 3], out=tmp)
+        tmp *= c1
+        inner += tmp
+        np.multiply(last[..., lo + 2:hi + 2], c0, out=tmp)
+        inner += tmp
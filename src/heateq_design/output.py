@@ -0,0 +1,373 @@
+"""Writers for the solution snapshots saved during a solve."""
+import json
+import queue
+import threading
+import numpy as np
+
+OUTPUTS = ("curve", "npy")
+
+
+def write_array(file_name, var_name, dx, a):
+    with open(file_name, 'w') as out_f:
+        out_f.write('# {0}\n'.format(var_name))
+        for i in range(0, len(a)):
+            out_f.write('{0:8.4f} {1:8.4f}\n'.format(i*dx, a[i]))
+
+
+class CurveWriter:
+    """
+    Writes every snapshot to its own text ``.curve`` file.
+
+    Args:
+        prefix (str): Path prefix of the files, e.g. "run/run".
+        dx (float): Spatial step size.
+    """
+    def __init__(self, prefix, dx):
+        self.prefix = prefix
+        self.dx = dx
+
+    def write(self, ti, a, final=False, t=None):
+        """
+        Writes one snapshot.
+
+        Args:
+            ti (int): Time step index of the snapshot.
+            a (np.ndarray): Solution vector.
+            final (bool): Whether this is the final solution.
+            t (float, optional): Time of the snapshot. Defaults to ti * dt.
+        """
+        tag = 'final' if final else ti
+        write_array(self.prefix + '_soln_{0}.curve'.format(tag), 'Temperature', self.dx, a)
+
+    def flush(self):
+        """
+        Nothing to flush, every snapshot is written to its own file.
+        """
+        pass
+
+    def close(self):
+        """
+        Nothing to flush, every snapshot is written to its own file.
+        """
+        pass
+
+
+class NpyWriter:
+    """
+    Writes all snapshots into one preallocated, memory-mapped ``.npy`` file.
+
+    The snapshot array has shape (rows, Nx) and is stored in ``<prefix>_soln.npy``.
+    A JSON header ``<prefix>_soln.json`` holds dx, dt, the scheme, the number of
+    rows written and the step index and time of each row. Snapshots are written
+    by slice assignment, at full precision and without any text formatting.
+
+    The file grows in place when more than ``rows`` snapshots are written, and
+    is trimmed to the rows actually written on ``close``. The header on disk is
+    only current after ``flush`` or ``close``.
+
+    Args:
+        prefix (str): Path prefix of the files, e.g. "run/run".
+        dx (float): Spatial step size.
+        dt (float): Time step size.
+        nx (int): Number of spatial grid points.
+        rows (int): Expected number of snapshots.
+        scheme (str): Name of the scheme that produced the solution.
+        dtype (np.dtype): Data type of the stored snapshots.
+    """
+    def __init__(self, prefix, dx, dt, nx, rows, scheme, dtype=np.float64):
+        self.prefix = prefix
+        self.data = np.lib.format.open_memmap(prefix + '_soln.npy', mode='w+', dtype=dtype, shape=(max(rows, 1), nx))
+        self.meta = {"scheme": scheme, "dx": dx, "dt": dt, "nx": nx, "count": 0, "steps": [], "times": [],
+                     "final": False}
+        self.write_meta()
+
+    @classmethod
+    def resume(cls, prefix, ti):
+        """
+        Reopens the snapshots of an interrupted solve to continue writing at step ti.
+
+        Rows saved at or after step ti are dropped, the restarted solve writes them again.
+        The initial condition in the first row is always kept.
+
+        Args:
+            prefix (str): Path prefix the snapshots were written with.
+            ti (int): Index of the time step the solve continues with.
+
+        Returns:
+            NpyWriter: Writer appending after the kept rows.
+        """
+        writer = cls.__new__(cls)
+        writer.prefix = prefix
+        with open(prefix + '_soln.json') as in_f:
+            writer.meta = json.load(in_f)
+        writer.data = np.load(prefix + '_soln.npy', mmap_mode='r+')
+        steps = writer.meta["steps"][:writer.meta["count"]]
+        count = next((row for row, step in enumerate(steps) if row > 0 and step >= ti), len(steps))
+        writer.meta["count"] = count
+        writer.meta["steps"] = steps[:count]
+        writer.meta["times"] = writer.meta["times"][:count]
+        writer.meta["final"] = False
+        return writer
+
+    def write(self, ti, a, final=False, t=None):
+        """
+        Writes one snapshot.
+
+        Args:
+            ti (int): Time step index of the snapshot.
+            a (np.ndarray): Solution vector.
+            final (bool): Whether this is the final solution.
+            t (float, optional): Time of the snapshot. Defaults to ti * dt.
+        """
+        row = self.meta["count"]
+        if row == len(self.data):
+            self.resize(2 * row)
+        self.data[row] = a
+        self.meta["count"] = row + 1
+        self.meta["steps"].append(ti)
+        self.meta["times"].append(ti * self.meta["dt"] if t is None else float(t))
+        self.meta["final"] = final
+
+    def resize(self, rows):
+        """
+        Changes the number of snapshot rows of the file in place.
+
+        The npy header reserves room for the first dimension to grow, so only
+        the header is rewritten and the file extended or truncated.
+
+        Args:
+            rows (int): New number of rows.
+        """
+        file_name = self.prefix + '_soln.npy'
+        dtype, nx, offset = self.data.dtype, self.data.shape[1], self.data.offset
+        self.data.flush()
+        del self.data
+        with open(file_name, 'r+b') as out_f:
+            np.lib.format.write_array_header_1_0(out_f, {"descr": np.lib.format.dtype_to_descr(dtype),
+                                                         "fortran_order": False, "shape": (rows, nx)})
+            if out_f.tell() != offset:
+                raise IOError("Cannot resize {0} in place".format(file_name))
+            out_f.truncate(offset + rows * nx * dtype.itemsize)
+        self.data = np.memmap(file_name, dtype=dtype, mode='r+', offset=offset, shape=(rows, nx))
+
+    def write_meta(self):
+        with open(self.prefix + '_soln.json', 'w') as out_f:
+            json.dump(self.meta, out_f)
+
+    def flush(self):
+        """
+        Flushes the snapshots written so far to disk and writes the header.
+        """
+        self.data.flush()
+        self.write_meta()
+
+    def close(self):
+        """
+        Trims the unused rows, flushes the snapshots to disk and writes the header.
+        """
+        if 0 < self.meta["count"] < len(self.data):
+            self.resize(self.meta["count"])
+        self.data.flush()
+        self.write_meta()
+
+
+class AsyncWriter:
+    """
+    Hands snapshots to another writer running on a background thread.
+
+    Snapshots are copied into a ring of ``depth`` reusable buffers, so the time
+    loop only pays for one copy per snapshot while the wrapped writer formats
+    and writes to disk. When all buffers are in flight ``write`` blocks until
+    the background thread frees one. ``close`` drains the queue before closing
+    the wrapped writer, and re-raises any error the background thread hit.
+
+    Args:
+        writer (CurveWriter or NpyWriter): Writer doing the actual output.
+        nx (int): Number of spatial grid points.
+        dtype (np.dtype): Data type of the snapshots.
+        depth (int): Number of snapshot buffers.
+    """
+    def __init__(self, writer, nx, dtype=np.float64, depth=4):
+        self.writer = writer
+        self.error = None
+        self.free = queue.Queue()
+        for _ in range(depth):
+            self.free.put(np.empty(nx, dtype))
+        self.pending = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="heateq-writer", daemon=True)
+        self.thread.start()
+
+    def write(self, ti, a, final=False, t=None):
+        """
+        Queues one snapshot, waiting for a free buffer if the writer fell behind.
+
+        Args:
+            ti (int): Time step index of the snapshot.
+            a (np.ndarray): Solution vector. It is copied before returning.
+            final (bool): Whether this is the final solution.
+            t (float, optional): Time of the snapshot. Defaults to ti * dt.
+        """
+        self.check()
+        buf = self.free.get()
+        buf[:] = a
+        self.pending.put((ti, buf, final, t))
+
+    def run(self):
+        """
+        Writes queued snapshots until ``close`` is called.
+        """
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            ti, buf, final, t = item
+            try:
+                if self.error is None:
+                    self.writer.write(ti, buf, final, t)
+            except BaseException as err:
+                self.error = err
+            finally:
+                self.free.put(buf)
+                self.pending.task_done()
+
+    def check(self):
+        if self.error is not None:
+            raise RuntimeError("Background snapshot writer failed") from self.error
+
+    def flush(self):
+        """
+        Waits until the queued snapshots are written and flushes the wrapped writer.
+        """
+        self.pending.join()
+        self.check()
+        self.writer.flush()
+
+    def close(self):
+        """
+        Writes the remaining snapshots and closes the wrapped writer.
+        """
+        if self.thread.is_alive():
+            self.pending.put(None)
+            self.thread.join()
+        self.writer.close()
+        self.check()
+
+
+class RecordingWriter:
+    """
+    Keeps a copy of every snapshot in memory while passing it on to another writer.
+
+    The snapshots are stored in one (rows, nx) array grown by doubling, so a
+    solve without file output can still hand its snapshots to e.g. the result
+    cache. Once the snapshots would take more than ``max_bytes``, the recorded
+    ones are dropped and the rest are only passed on.
+
+    Args:
+        nx (int): Number of spatial grid points.
+        dtype (np.dtype): Data type of the snapshots.
+        writer (CurveWriter, NpyWriter or AsyncWriter, optional): Writer doing the file output, if any.
+        max_bytes (int, optional): Size bound of the recorded snapshots. Unbounded if omitted.
+
+    Attributes:
+        steps (list): Time step index of each recorded snapshot.
+        times (list): Time of each recorded snapshot, None where the writer defaults it.
+        final (bool): Whether the last recorded snapshot is the final solution.
+        overflow (bool): Whether the snapshots exceeded ``max_bytes`` and were dropped.
+    """
+    def __init__(self, nx, dtype=np.float64, writer=None, max_bytes=None):
+        self.writer = writer
+        self.max_rows = None if max_bytes is None else max(0, max_bytes) // (nx * np.dtype(dtype).itemsize)
+        self.rows = np.zeros((2 if self.max_rows is None else min(2, self.max_rows), nx), dtype)
+        self.steps = []
+        self.times = []
+        self.final = False
+        self.overflow = False
+
+    @property
+    def snapshots(self):
+        """
+        Returns the recorded snapshots, one row each.
+        """
+        return self.rows[:len(self.steps)]
+
+    def write(self, ti, a, final=False, t=None):
+        """
+        Records one snapshot and passes it on.
+
+        Args:
+            ti (int): Time step index of the snapshot.
+            a (np.ndarray): Solution vector.
+            final (bool): Whether this is the final solution.
+            t (float, optional): Time of the snapshot. Defaults to ti * dt.
+        """
+        row = len(self.steps)
+        if not self.overflow and row == len(self.rows):
+            self.grow()
+        if not self.overflow:
+            self.rows[row] = a
+            self.steps.append(ti)
+            self.times.append(None if t is None else float(t))
+        self.final = final
+        if self.writer:
+            self.writer.write(ti, a, final, t)
+
+    def grow(self):
+        """
+        Doubles the snapshot rows, or drops the snapshots if that exceeds the size bound.
+        """
+        rows = len(self.rows)
+        grown = 2 * rows if self.max_rows is None else min(2 * rows, self.max_rows)
+        if grown > rows:
+            self.rows = np.concatenate([self.rows, np.zeros((grown - rows, self.rows.shape[1]), self.rows.dtype)])
+        else:
+            self.overflow = True
+            self.rows = self.rows[:0].copy()
+            self.steps = []
+            self.times = []
+
+    def flush(self):
+        if self.writer:
+            self.writer.flush()
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+
+
+def snapshot_rows(steps, savi):
+    """
+    Returns the number of snapshots a solve of ``steps`` time steps saves.
+
+    These are the initial condition, every ``savi``-th step and the final solution.
+    """
+    saved = (steps - 1) // savi if savi and steps > 1 else 0
+    return 2 + saved
+
+
+def load_snapshots(prefix):
+    """
+    Opens the snapshots written by ``NpyWriter`` without copying them.
+
+    Args:
+        prefix (str): Path prefix the snapshots were written with.
+
+    Returns:
+        tuple: Read-only memory map of the written rows and the header dict.
+    """
+    with open(prefix + '_soln.json') as in_f:
+        meta = json.load(in_f)
+    data = np.load(prefix + '_soln.npy', mmap_mode='r')
+    return data[:meta["count"]], meta
+
+
+def export_curves(prefix):
+    """
+    Exports the snapshots written by ``NpyWriter`` as ``.curve`` text files.
+
+    Args:
+        prefix (str): Path prefix the snapshots were written with.
+    """
+    data, meta = load_snapshots(prefix)
+    writer = CurveWriter(prefix, meta["dx"])
+    for row, ti in enumerate(meta["steps"]):
+        writer.write(ti, data[row], final=meta["final"] and row == meta["count"] - 1)
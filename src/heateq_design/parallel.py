@@ -0,0 +1,409 @@
+"""Domain-decomposed schemes running the time steps on several worker processes.
+
+The two solution vectors live in ``multiprocessing.shared_memory`` and every
+worker updates one contiguous chunk of the grid. The explicit schemes read a
+halo of 1 (FTCS) or 2 (Upwind 1.5) cells of their neighbours' chunks straight
+from the shared vector; a barrier after every step makes the halos of the next
+step visible, so no halo copies are needed. Crank-Nicolson uses a partitioned
+(SPIKE) tridiagonal solve: every worker solves its own diagonal block, the
+unknowns at the chunk ends are coupled through a small reduced system of two
+rows per chunk, and each worker then corrects its chunk with the precomputed
+spikes of its block.
+"""
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+from .crankn import CrankN
+from .ftcs import FTCS
+from .kernels import WORK_POINTS, ftcs_step, upwind15_coefficients, upwind15_edge, upwind15_inner
+from .tridiag import TridiagFactor
+from .upwind15 import UpWind15
+
+# Cells each scheme reads beyond its chunk on either side.
+HALOS = {"ftcs": 1, "upwind15": 2, "crankn": 0}
+
+
+def partition(lo, hi, parts):
+    """
+    Splits the index range [lo, hi) into contiguous chunks of nearly equal size.
+
+    Returns:
+        list: (start, stop) pairs of the chunks.
+    """
+    edges = [lo + (hi - lo) * part // parts for part in range(parts + 1)]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def chunk_grid(alg, nx, workers):
+    """
+    Returns the chunks of the grid points the workers of a scheme update.
+
+    The explicit schemes update the interior points, Crank-Nicolson solves for all points.
+    """
+    lo, hi = (0, nx) if alg == "crankn" else (1, nx - 1)
+    return partition(lo, hi, max(1, min(workers, hi - lo)))
+
+
+def explicit_stepper(rank, chunks, nx, dtype, alg, params):
+    """
+    Returns the function updating one chunk by one FTCS or Upwind 1.5 step.
+    """
+    lo, hi = chunks[rank]
+    if alg == "ftcs":
+        r, bc0, bc1 = params
+
+        def step(last, curr):
+            ftcs_step(last[lo - 1:hi + 1], curr[lo - 1:hi + 1], r)
+            if lo == 1:
+                curr[0] = bc0
+            if hi == nx - 1:
+                curr[-1] = bc1
+        return step
+
+    k, bc0, bc1 = params
+    coeffs = upwind15_coefficients(k)
+    lo5, hi5 = max(lo, 2), min(hi, nx - 2)
+    work = np.empty(min(max(hi5 - lo5, 1), WORK_POINTS), dtype)
+
+    def step(last, curr):
+        if hi5 > lo5:
+            upwind15_inner(last[lo5 - 2:hi5 + 2], curr[lo5 - 2:hi5 + 2], coeffs, work)
+        if lo == 1:
+            curr[0] = bc0
+            upwind15_edge(last, curr, k, 1)
+        if hi == nx - 1:
+            upwind15_edge(last, curr, k, nx - 2)
+            curr[-1] = bc1
+    return step
+
+
+def spike_stepper(rank, chunks, nx, dtype, params, spikes, barrier):
+    """
+    Returns the function solving one chunk of a Crank-Nicolson step.
+
+    The worker factors its diagonal block of the Crank-Nicolson matrix and the
+    spikes, the responses of the block to its couplings with the neighbouring
+    chunks. Their end values go to the shared ``spikes`` array, from which every
+    worker builds the reduced system of the chunk end values. A step solves the
+    block, reads all chunk end values, solves the rows of the reduced system
+    it needs and subtracts the spikes scaled by the neighbouring end values.
+    """
+    w, bc0, bc1 = params
+    lo, hi = chunks[rank]
+    n = hi - lo
+    parts = len(chunks)
+    idx = np.arange(lo, hi)
+    interior = (idx > 0) & (idx < nx - 1)
+    w = np.asarray(w, dtype)
+    off = np.where(interior, -w, 0).astype(dtype)
+    diag = np.where(interior, 1.0 + 2.0 * w, 1).astype(dtype)
+    factor = TridiagFactor(off, diag, off)
+    work = factor.workspace((n,))
+
+    left = np.zeros(n, dtype)
+    right = np.zeros(n, dtype)
+    if rank > 0:
+        left[0] = off[0]
+        factor.solve(left, left)
+    if rank < parts - 1:
+        right[-1] = off[-1]
+        factor.solve(right, right)
+    spikes[rank] = (left[0], left[-1], right[0], right[-1])
+    barrier.wait()
+
+    # Reduced system of the first and last value of every chunk
+    reduced = np.eye(2 * parts)
+    for part in range(parts):
+        for row, end in ((2 * part, 0), (2 * part + 1, 1)):
+            if part > 0:
+                reduced[row, 2 * part - 1] = spikes[part, end]
+            if part < parts - 1:
+                reduced[row, 2 * part + 2] = spikes[part, 2 + end]
+    inverse = np.linalg.inv(reduced)
+    ends = np.array([[start, stop - 1] for start, stop in chunks]).ravel()
+    acc = np.result_type(dtype, np.float64)
+    prev_row = inverse[2 * rank - 1].astype(acc) if rank > 0 else None
+    next_row = inverse[2 * rank + 2].astype(acc) if rank < parts - 1 else None
+    tmp = np.empty(n, dtype)
+
+    def step(last, curr):
+        chunk = curr[lo:hi]
+        factor.solve(last[lo:hi], chunk, work)
+        barrier.wait()
+        rhs = curr[ends].astype(acc)
+        barrier.wait()
+        if prev_row is not None:
+            np.multiply(left, dtype.type(prev_row @ rhs), out=tmp)
+            chunk -= tmp
+        if next_row is not None:
+            np.multiply(right, dtype.type(next_row @ rhs), out=tmp)
+            chunk -= tmp
+        if lo == 0:
+            curr[0] = bc0
+        if hi == nx:
+            curr[-1] = bc1
+    return step
+
+
+def chunk_worker(rank, chunks, names, nx, dtype, alg, params, barrier, conn):
+    """
+    Runs the steps the pool asks for on one chunk until it is told to stop.
+
+    Every request is a (src, steps) pair: advance ``steps`` steps starting from
+    shared vector ``src``, alternating between the two vectors.
+    """
+    dtype = np.dtype(dtype)
+    shms = [shared_memory.SharedMemory(name=name) for name in names]
+    buffers = [np.ndarray(nx, dtype, buffer=shm.buf) for shm in shms[:2]]
+    try:
+        if alg == "crankn":
+            spikes = np.ndarray((len(chunks), 4), np.float64, buffer=shms[2].buf)
+            step = spike_stepper(rank, chunks, nx, dtype, params, spikes, barrier)
+        else:
+            step = explicit_stepper(rank, chunks, nx, dtype, alg, params)
+        error = None
+    except BaseException as err:
+        barrier.abort()
+        error = err
+    while True:
+        request = conn.recv()
+        if request is None:
+            return
+        if error is not None:
+            conn.send(repr(error))
+            continue
+        src, steps = request
+        try:
+            for _ in range(steps):
+                step(buffers[src], buffers[1 - src])
+                barrier.wait()
+                src = 1 - src
+            conn.send(None)
+        except BaseException as err:
+            barrier.abort()
+            error = err
+            conn.send(repr(err))
+
+
+class ChunkPool:
+    """
+    Worker processes sharing two solution vectors, each updating one chunk of the grid.
+
+    Args:
+        alg (str): Algorithm, one of "ftcs", "upwind15" or "crankn".
+        nx (int): Number of grid points.
+        dtype (np.dtype): Floating point type of the solution.
+        params (tuple): Scheme ratio and the two boundary values.
+        workers (int): Number of worker processes.
+
+    Attributes:
+        buffers (list): The two shared solution vectors.
+        chunks (list): (start, stop) grid points of each worker.
+    """
+    def __init__(self, alg, nx, dtype, params, workers):
+        dtype = np.dtype(dtype)
+        self.chunks = chunk_grid(alg, nx, workers)
+        parts = len(self.chunks)
+        ctx = multiprocessing.get_context()
+        self.shms = [shared_memory.SharedMemory(create=True, size=max(nx * dtype.itemsize, 1)) for _ in range(2)]
+        self.shms.append(shared_memory.SharedMemory(create=True, size=parts * 4 * 8))
+        self.buffers = [np.ndarray(nx, dtype, buffer=shm.buf) for shm in self.shms[:2]]
+        barrier = ctx.Barrier(parts)
+        self.conns = []
+        self.procs = []
+        for rank in range(parts):
+            conn, child = ctx.Pipe()
+            proc = ctx.Process(target=chunk_worker, name="heateq-chunk-{0}".format(rank), daemon=True,
+                               args=(rank, self.chunks, [shm.name for shm in self.shms], nx, dtype.str, alg,
+                                     params, barrier, child))
+            proc.start()
+            self.conns.append(conn)
+            self.procs.append(proc)
+
+    def run(self, src, steps):
+        """
+        Advances the shared solution by a number of steps, starting from buffer ``src``.
+
+        The result is in buffer ``src`` after an even number of steps and in the other buffer otherwise.
+        """
+        for conn in self.conns:
+            conn.send((src, steps))
+        errors = [conn.recv() for conn in self.conns]
+        errors = [error for error in errors if error]
+        if errors:
+            raise RuntimeError("Chunk worker failed: {0}".format(errors[0]))
+
+    def close(self):
+        """
+        Stops the workers and frees the shared memory.
+        """
+        for conn in self.conns:
+            conn.send(None)
+        for proc in self.procs:
+            proc.join()
+        del self.buffers
+        for shm in self.shms:
+            shm.close()
+            shm.unlink()
+
+
+class ParallelMixin:
+    """
+    Runs the time steps of a scheme on a pool of worker processes.
+
+    The pool is started on the first step, when the solution vectors move to
+    shared memory, and stopped when the time loop of ``states`` ends, also
+    when its consumer closes it early, or by ``close``, when they move back. Changes of the solution, output and observers run on the
+    main process between the fused steps. The explicit schemes give the same
+    results as the serial schemes, Crank-Nicolson agrees to round off.
+
+    Args:
+        workers (int): Number of worker processes.
+    """
+    __slots__ = ()
+
+    def __init__(self, *args, workers=2, **kwargs):
+        super().__init__(*args, **kwargs)
+        if workers < 1:
+            raise ValueError("Parallel schemes need at least one worker, got {0}".format(workers))
+        if self.kernel != "numpy":
+            raise ValueError("Parallel schemes only run the numpy kernel")
+        self.workers = workers
+        self.pool = None
+
+    def stable(self):
+        """
+        Returns whether the time step is within the stability limit the serial scheme checks.
+        """
+        return True
+
+    def start(self):
+        """
+        Starts the worker pool and moves the solution vectors to shared memory.
+        """
+        if self.pool is None:
+            self.pool = ChunkPool(self.alg, self.Nx, self.dtype, self.chunk_params(), self.workers)
+            last, curr = self.pool.buffers
+            last[:] = self.last
+            curr[:] = self.curr
+            self.last, self.curr = last, curr
+
+    def close(self):
+        """
+        Stops the worker pool and moves the solution vectors back to private memory.
+        """
+        if self.pool is not None:
+            self.last = self.last.copy()
+            self.curr = self.curr.copy()
+            self.pool.close()
+            self.pool = None
+
+    def run(self, steps):
+        self.start()
+        self.pool.run(0 if self.last is self.pool.buffers[0] else 1, steps)
+
+    def update_solution(self):
+        """
+        Computes curr from last on the workers.
+
+        Returns:
+            bool: True if the update is successful, False otherwise.
+        """
+        if not self.stable():
+            return False
+        self.run(1)
+        return True
+
+    def advance(self, steps):
+        """
+        Advances the solution by a number of steps on the workers, leaving the newest solution in ``last``.
+
+        Args:
+            steps (int): Number of time steps.
+
+        Returns:
+            bool: True if the updates are successful, False otherwise.
+        """
+        if not self.stable():
+            return False
+        self.run(steps)
+        if steps % 2:
+            self.last, self.curr = self.curr, self.last
+        return True
+
+    def set_dt(self, dt):
+        """
+        Changes the time step size, restarting the workers with the new scheme ratio.
+        """
+        self.close()
+        super().set_dt(dt)
+
+    def states(self, *args, **kwargs):
+        """
+        Runs the time loop like the serial scheme, stopping the workers when it ends.
+
+        The states are yielded from one private buffer rather than the shared
+        vectors, so a state the consumer still holds stays readable once the
+        shared memory is freed.
+        """
+        snapshot = np.empty(self.Nx, self.dtype)
+        try:
+            for ti, a, final in super().states(*args, **kwargs):
+                snapshot[:] = a
+                yield ti, snapshot, final
+        finally:
+            self.close()
+
+    def solve(self, *args, **kwargs):
+        """
+        Solves the heat equation like the serial scheme, stopping the workers at the end.
+        """
+        try:
+            return super().solve(*args, **kwargs)
+        finally:
+            self.close()
+
+
+class ParallelFTCS(ParallelMixin, FTCS):
+    """
+    FTCS scheme with the grid split across worker processes, see ``ParallelMixin``.
+    """
+    __slots__ = ("workers", "pool")
+    alg = "ftcs"
+
+    def stable(self):
+        return self.ratio(self.alpha) <= 0.5
+
+    def chunk_params(self):
+        return self.ratio(self.alpha), self.bc0, self.bc1
+
+
+class ParallelUpWind15(ParallelMixin, UpWind15):
+    """
+    Upwind 1.5 scheme with the grid split across worker processes, see ``ParallelMixin``.
+    """
+    __slots__ = ("workers", "pool")
+    alg = "upwind15"
+
+    def chunk_params(self):
+        return self.ratio(self.alpha * self.alpha), self.bc0, self.bc1
+
+
+class ParallelCrankN(ParallelMixin, CrankN):
+    """
+    Crank-Nicolson scheme with the grid split across worker processes, see ``ParallelMixin``.
+    """
+    __slots__ = ("workers", "pool")
+    alg = "crankn"
+
+    def r83_np_fa(self):
+        """
+        Nothing to factor here, every worker factors its own block of the matrix.
+        """
+        pass
+
+    def chunk_params(self):
+        return self.w, self.bc0, self.bc1
+
+
+PARALLEL_SCHEMES = {"ftcs": ParallelFTCS, "upwind15": ParallelUpWind15, "crankn": ParallelCrankN}
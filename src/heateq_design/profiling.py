@@ -0,0 +1,74 @@
+"""Opt-in instrumentation of the solver time loop."""
+import json
+from time import perf_counter
+
+
+class PhaseTimer:
+    """
+    Accumulates wall time and call counts per phase of a solve.
+
+    The timer works like a lap counter: every ``lap`` charges the time elapsed
+    since the previous lap to the named phase. A solve without a timer only
+    pays a truthiness check per phase.
+
+    Attributes:
+        seconds (dict): Phase name to accumulated seconds.
+        calls (dict): Phase name to number of calls (or steps, for fused phases).
+    """
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+        self.tick = perf_counter()
+
+    def start(self):
+        """
+        Restarts the lap clock without clearing the accumulated phases.
+        """
+        self.tick = perf_counter()
+
+    def lap(self, phase, count=1):
+        """
+        Charges the time since the previous lap to a phase.
+
+        Args:
+            phase (str): Phase name.
+            count (int): Number of calls or steps the lap covered.
+        """
+        now = perf_counter()
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + now - self.tick
+        self.calls[phase] = self.calls.get(phase, 0) + count
+        self.tick = now
+
+    def total(self):
+        """
+        Returns the time accumulated over all phases.
+        """
+        return sum(self.seconds.values())
+
+    def report(self):
+        """
+        Returns the accumulated phases as a dict suitable for JSON.
+        """
+        return {
+            "total": self.total(),
+            "phases": {phase: {"seconds": self.seconds[phase], "calls": self.calls[phase]}
+                       for phase in self.seconds},
+        }
+
+    def format(self):
+        """
+        Formats the accumulated phases as a table sorted by time.
+        """
+        total = self.total() or 1.0
+        lines = ["{0:>10} {1:>10} {2:>12} {3:>7}".format("phase", "calls", "seconds", "%")]
+        for phase in sorted(self.seconds, key=self.seconds.get, reverse=True):
+            lines.append("{0:>10} {1:>10} {2:>12.4e} {3:>7.2f}".format(
+                phase, self.calls[phase], self.seconds[phase], 100 * self.seconds[phase] / total))
+        return "\n".join(lines) + "\n"
+
+    def save(self, file_name):
+        """
+        Writes the accumulated phases to a JSON file.
+        """
+        with open(file_name, 'w') as out_f:
+            json.dump(self.report(), out_f, indent=1)
@@ -0,0 +1,145 @@
+"""Long-lived solver process answering run requests sent as JSON lines."""
+import contextlib
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from .sweep import expand_grid, job_key, run_job
+
+
+def handle_request(line, cache=None):
+    """
+    Runs the job described by one JSON request line.
+
+    A request is a JSON object of solver settings, any of the sweep settings
+    with the sweep defaults for the missing ones, plus an optional "id" echoed
+    in the reply and an optional "runame" directory to write the solution files
+    to. The reply is the job summary of ``run_job`` with the job key and id.
+    Invalid requests and failed jobs get a reply with status "error" and the
+    error message, so one bad request never stops the server.
+
+    The process keeps its caches between requests, e.g. the Crank-Nicolson
+    factorizations and the parsed initial conditions.
+
+    Args:
+        line (str): The request.
+        cache (ResultCache, optional): Result cache to look the job up in and store it to.
+
+    Returns:
+        dict: The reply.
+    """
+    job_id = None
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("Expected a JSON object of solver settings")
+        job_id = request.pop("id", None)
+        runame = request.pop("runame", None)
+        config = expand_grid({name: [value] for name, value in request.items()})[0]
+        result = run_job(config, runame, cache)
+    except (ValueError, TypeError) as err:
+        return {"id": job_id, "status": "error", "error": str(err)}
+    except Exception as err:
+        return {"id": job_id, "status": "error", "error": "{0}: {1}".format(type(err).__name__, err)}
+    return dict(result, id=job_id, job=job_key(config))
+
+
+def serve_lines(in_f, out_f, cache=None):
+    """
+    Answers the requests read from a text stream, one reply line per request line.
+
+    Blank lines are skipped. Every reply is flushed right away, so a client can
+    wait for each reply or send a batch of requests ahead. When the replies go
+    to stdout, the output of the solvers is sent to stderr while serving.
+
+    Args:
+        in_f (file): Stream of request lines.
+        out_f (file): Stream the reply lines are written to.
+        cache (ResultCache, optional): Result cache shared by the requests.
+
+    Returns:
+        int: Number of requests answered.
+    """
+    count = 0
+    # redirected once for the whole stream, stdout is shared by all threads of the process
+    with contextlib.redirect_stdout(sys.stderr) if out_f is sys.stdout else contextlib.nullcontext():
+        for line in in_f:
+            if not line.strip():
+                continue
+            out_f.write(json.dumps(handle_request(line, cache)) + "\n")
+            out_f.flush()
+            count = count + 1
+    return count
+
+
+class SolverServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Unix socket server answering JSON line requests with ``serve_lines``.
+
+    Every connection is served on its own thread for as long as the client
+    keeps it open, and all of them share the caches of the process. A stale
+    socket file left at ``path`` is replaced on start, any other file there is
+    an error. The socket file is removed by ``server_close``.
+
+    Args:
+        path (str): Path of the socket file.
+        cache (ResultCache, optional): Result cache shared by the requests.
+    """
+    def __init__(self, path, cache=None):
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("Unix sockets are not available on this platform, serve on stdin instead")
+        if os.path.exists(path):
+            if not stat.S_ISSOCK(os.stat(path).st_mode):
+                raise ValueError("{0} exists and is not a socket".format(path))
+            os.remove(path)
+        self.path = path
+        self.cache = cache
+        self.daemon_threads = True
+        super().__init__(path, SolverHandler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class SolverHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        with open(self.rfile.fileno(), 'r', encoding="utf-8", closefd=False) as in_f, \
+                open(self.wfile.fileno(), 'w', encoding="utf-8", closefd=False) as out_f:
+            serve_lines(in_f, out_f, self.server.cache)
+
+
+def submit(path, requests):
+    """
+    Sends a batch of requests to a ``SolverServer`` and returns the replies.
+
+    The requests are sent from a separate thread while the replies are read, so
+    a large batch cannot fill both socket buffers and stall.
+
+    Args:
+        path (str): Path of the server socket file.
+        requests (iterable): Request dicts.
+
+    Returns:
+        list: Reply dicts, in the order of the requests.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+
+        def send():
+            with sock.makefile('w') as out_f:
+                for request in requests:
+                    out_f.write(json.dumps(request) + "\n")
+            sock.shutdown(socket.SHUT_WR)
+
+        sender = threading.Thread(target=send, name="heateq-submit", daemon=True)
+        sender.start()
+        with sock.makefile('r') as in_f:
+            replies = [json.loads(line) for line in in_f]
+        sender.join()
+    return replies
+
@@ -0,0 +1,229 @@
+"""Parameter sweeps run across a pool of worker processes."""
+import hashlib
+import itertools
+import json
+import os.path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import time
+
+try:
+    import tomllib
+except ImportError:  # pragma: no cover
+    tomllib = None
+
+from .ftcs import FTCS
+from .upwind15 import UpWind15
+from .crankn import CrankN
+
+SCHEMES = {"ftcs": FTCS, "upwind15": UpWind15, "crankn": CrankN}
+
+# Solver settings a sweep may vary, with their defaults and types.
+DEFAULTS = {
+    "alg": "ftcs",
+    "alpha": 0.2,
+    "lenx": 1.0,
+    "dx": 0.1,
+    "dt": 0.004,
+    "maxt": 2.0,
+    "bc0": 0.0,
+    "bc1": 1.0,
+    "ic": "const(1)",
+    "kernel": "numpy",
+    "prec": "double",
+    "outi": 0,
+    "savi": 0,
+}
+
+STATE_FILE = "sweep_state.jsonl"
+SUMMARY_FILE = "summary.tsv"
+SUMMARY_COLUMNS = ("job", "alg", "prec", "alpha", "dx", "dt", "maxt", "bc0", "bc1", "ic",
+                   "status", "iterations", "change", "umin", "umax", "umean", "elapsed")
+
+
+def load_grid(file_name):
+    """
+    Reads a parameter grid from a JSON or TOML file.
+
+    The file maps setting names to a value or a list of values. The sweep runs
+    the cartesian product of all lists.
+
+    Args:
+        file_name (str): Path to a .json or .toml file.
+
+    Returns:
+        dict: Setting name to list of values.
+    """
+    if file_name.endswith(".toml"):
+        if tomllib is None:
+            raise ValueError("Reading TOML grids requires Python 3.11 or newer")
+        with open(file_name, 'rb') as in_f:
+            grid = tomllib.load(in_f)
+    else:
+        with open(file_name) as in_f:
+            grid = json.load(in_f)
+    return {name: values if isinstance(values, list) else [values] for name, values in grid.items()}
+
+
+def expand_grid(grid):
+    """
+    Expands a parameter grid into one complete configuration per job.
+
+    Args:
+        grid (dict): Setting name to list of values.
+
+    Returns:
+        list: Configuration dicts with every setting in DEFAULTS filled in.
+    """
+    unknown = set(grid) - set(DEFAULTS)
+    if unknown:
+        raise ValueError("Unknown sweep settings: {0}".format(", ".join(sorted(unknown))))
+    names = list(grid)
+    configs = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        config = dict(DEFAULTS)
+        for name, value in zip(names, values):
+            config[name] = type(DEFAULTS[name])(value)
+        configs.append(config)
+    return configs
+
+
+def job_key(config):
+    """
+    Returns a stable identifier of a job configuration.
+    """
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def make_solver(config):
+    """
+    Builds the solver described by a job configuration.
+    """
+    if config["alg"] not in SCHEMES:
+        raise ValueError("Unknown algorithm '{0}', expected one of {1}".format(config["alg"], tuple(SCHEMES)))
+    for name in ("lenx", "dx", "dt"):
+        if not config[name] > 0:
+            raise ValueError("Setting {0} must be positive, got {1}".format(name, config[name]))
+    scheme = SCHEMES[config["alg"]]
+    return scheme(config["lenx"], config["maxt"], config["alpha"], config["dx"], config["dt"],
+                  config["bc0"], config["bc1"], config["ic"], config["outi"], config["savi"],
+                  config["kernel"], config["prec"])
+
+
+def run_job(config, output_name=None, cache=None):
+    """
+    Runs one job of a sweep.
+
+    Solver setup that depends only on the grid, like the Crank-Nicolson
+    factorization, is cached per process and so reused by later jobs of the
+    same worker. With a result cache, jobs solved before by any sweep or run
+    are restored from it instead of solved again.
+
+    Args:
+        config (dict): Job configuration.
+        output_name (str, optional): Directory for the solution files. No files are written if omitted.
+        cache (ResultCache, optional): Result cache to look the job up in and store it to.
+
+    Returns:
+        dict: Summary of the run.
+    """
+    t0 = time()
+    heat_solver = make_solver(config)
+    if cache:
+        ok, cached = cache.solve(heat_solver, output_name or "", noout=not output_name)
+    else:
+        ok, cached = heat_solver.solve(output_name or "", noout=not output_name), False
+    return {
+        "status": "ok" if ok else "failed",
+        "cached": cached,
+        "iterations": heat_solver.iterations,
+        "change": float(heat_solver.change),
+        "umin": float(heat_solver.curr.min()),
+        "umax": float(heat_solver.curr.max()),
+        "umean": float(heat_solver.curr.mean()),
+        "elapsed": time() - t0,
+    }
+
+
+def load_state(output_name):
+    """
+    Reads the results of the jobs a previous sweep into this directory completed.
+
+    Returns:
+        dict: Job key to state record.
+    """
+    state = {}
+    file_name = os.path.join(output_name, STATE_FILE)
+    if os.path.isfile(file_name):
+        with open(file_name) as in_f:
+            for line in in_f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A sweep killed while appending leaves a partial last line.
+                    continue
+                state[record["job"]] = record
+    return state
+
+
+def format_summary(records):
+    """
+    Formats sweep results as a tab separated table.
+    """
+    lines = ["\t".join(SUMMARY_COLUMNS)]
+    for record in records:
+        row = dict(record["config"], job=record["job"], **record["result"])
+        lines.append("\t".join(str(row.get(column, "")) for column in SUMMARY_COLUMNS))
+    return "\n".join(lines) + "\n"
+
+
+def run_sweep(configs, output_name, jobs=None, resume=True, noout=False, progress=None, cache=None):
+    """
+    Runs the jobs of a sweep on a process pool.
+
+    Finished jobs are appended to a state file in the output directory as they
+    complete, so a rerun with ``resume`` only runs the jobs still missing. A job
+    that raises gets a record with status "error" and the error message. It is
+    not added to the state file, so a rerun tries it again.
+
+    Args:
+        configs (list): Job configurations, e.g. from ``expand_grid``.
+        output_name (str): Directory for the state file, summary table and job outputs.
+        jobs (int, optional): Number of worker processes. Defaults to the number of cores.
+        resume (bool): Skip jobs already completed in ``output_name``.
+        noout (bool): Do not write solution files for the jobs.
+        progress (callable, optional): Called with each new state record.
+        cache (ResultCache, optional): Result cache shared by the workers.
+
+    Returns:
+        list: State records of all jobs, in the order of ``configs``.
+    """
+    os.makedirs(output_name, exist_ok=True)
+    state = load_state(output_name) if resume else {}
+    if not resume and os.path.isfile(os.path.join(output_name, STATE_FILE)):
+        os.remove(os.path.join(output_name, STATE_FILE))
+
+    keys = [job_key(config) for config in configs]
+    pending = {key: config for key, config in zip(keys, configs) if key not in state}
+    with open(os.path.join(output_name, STATE_FILE), 'a') as state_f:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(run_job, config,
+                                   None if noout else os.path.join(output_name, "job_" + key), cache): key
+                       for key, config in pending.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    result = future.result()
+                except Exception as err:
+                    result = {"status": "error", "error": "{0}: {1}".format(type(err).__name__, err), "elapsed": 0.0}
+                record = {"job": key, "config": pending[key], "result": result}
+                if result["status"] != "error":
+                    state_f.write(json.dumps(record) + "\n")
+                    state_f.flush()
+                state[key] = record
+                if progress:
+                    progress(record)
+
+    records = [state[key] for key in keys]
+    with open(os.path.join(output_name, SUMMARY_FILE), 'w') as out_f:
+        out_f.write(format_summary(records))
+    return records
@@ -0,0 +1,263 @@
+"""Tridiagonal solvers used by the implicit Crank-Nicolson scheme.
+
+Matrices are kept as three contiguous diagonal arrays stacked row-wise in a
+``(3, ..., N)`` array: ``sub[i] = A(i, i-1)``, ``diag[i] = A(i, i)`` and
+``sup[i] = A(i, i+1)``. ``TridiagFactor`` factors such a matrix by cyclic
+reduction, so that every solve is ``O(N)`` work done in ``log2(N)`` vectorized
+passes instead of an interpreted loop over the grid.
+"""
+from functools import lru_cache
+import numpy as np
+
+
+def cn_matrix(nx, w, dtype=np.float64):
+    """
+    Builds the Crank-Nicolson system matrix in diagonal storage.
+
+    The first and last rows are identity rows that carry the boundary values.
+
+    Args:
+        nx (int): Number of grid points.
+        w (float or np.ndarray): Mesh ratio alpha * dt / dx^2, or one ratio per batch member.
+        dtype (np.dtype): Floating point type of the matrix.
+
+    Returns:
+        np.ndarray: Array of shape (3, ..., nx) holding the sub, main and super diagonals.
+    """
+    w = np.asarray(w, dtype)[..., np.newaxis]
+    mat = np.zeros((3,) + w.shape[:-1] + (nx,), dtype)
+    mat[0, ..., 1:-1] = -w
+    mat[1] = 1.0 + 2.0 * w
+    mat[2, ..., 1:-1] = -w
+    mat[1, ..., 0] = 1.0
+    mat[1, ..., -1] = 1.0
+    return mat
+
+
+class TridiagFactor:
+    """
+    Cyclic reduction factorization of one or more tridiagonal matrices.
+
+    Every reduction level eliminates the even rows, leaving a tridiagonal system
+    of half the size for the odd rows. The elimination weights of every level
+    are computed once here, so solving for a new right-hand side only replays
+    the reduction and the back substitution.
+
+    Coefficients may carry leading batch dimensions, in which case each batch
+    member is an independent matrix. Right-hand sides broadcast against them.
+
+    Args:
+        sub (np.ndarray): Sub-diagonal, shape (..., N). ``sub[..., 0]`` is ignored.
+        diag (np.ndarray): Main diagonal, shape (..., N).
+        sup (np.ndarray): Super-diagonal, shape (..., N). ``sup[..., -1]`` is ignored.
+
+    Attributes:
+        n (int): Size of the system.
+        levels (list): Per-level tuples (m, alpha, gamma, a_even, c_even, invb_even).
+        invb (np.ndarray): Inverse pivot of the final one-row system.
+    """
+    def __init__(self, sub, diag, sup):
+        a = np.array(sub, copy=True)
+        b = np.array(diag, copy=True)
+        c = np.array(sup, copy=True)
+        a[..., 0] = 0.0
+        c[..., -1] = 0.0
+        self.n = b.shape[-1]
+        self.levels = []
+        while b.shape[-1] > 1:
+            n = b.shape[-1]
+            m = n // 2
+            nr = (n - 1) // 2
+            invb = 1.0 / b[..., 0::2]
+            alpha = -a[..., 1::2] * invb[..., :m]
+            gamma = np.zeros_like(alpha)
+            gamma[..., :nr] = -c[..., 1:2 * nr:2] * invb[..., 1:nr + 1]
+
+            na = alpha * a[..., 0:2 * m:2]
+            nb = b[..., 1::2] + alpha * c[..., 0:2 * m:2]
+            nb[..., :nr] += gamma[..., :nr] * a[..., 2:2 * nr + 2:2]
+            nc = np.zeros_like(alpha)
+            nc[..., :nr] = gamma[..., :nr] * c[..., 2:2 * nr + 2:2]
+
+            self.levels.append((m, alpha, gamma, a[..., 0::2] * invb, c[..., 0::2] * invb, invb))
+            a, b, c = na, nb, nc
+        self.invb = 1.0 / b
+        for level in self.levels:
+            for arr in level[1:]:
+                arr.flags.writeable = False
+        self.invb.flags.writeable = False
+
+    @property
+    def dtype(self):
+        return self.invb.dtype
+
+    def workspace(self, shape):
+        """
+        Preallocates the buffers needed to solve right-hand sides of a given shape.
+
+        Args:
+            shape (tuple): Shape (..., N) of the right-hand sides.
+
+        Returns:
+            list: One (rhs, x, tmp) buffer triple per reduction level.
+        """
+        lead = tuple(shape[:-1])
+        work = []
+        n = self.n
+        for m, *_ in self.levels:
+            work.append((np.empty(lead + (m,), self.dtype),
+                         np.empty(lead + (n,), self.dtype),
+                         np.empty(lead + ((n + 1) // 2,), self.dtype)))
+            n = m
+        return work
+
+    def solve(self, d, out, work=None):
+        """
+        Solves A x = d.
+
+        Args:
+            d (np.ndarray): Right-hand side, shape (..., N). It is not modified.
+            out (np.ndarray): Array receiving the solution. May be the same array as ``d``.
+            work (list, optional): Buffers from ``workspace``. Allocated on the fly if omitted.
+
+        Returns:
+            np.ndarray: The solution ``out``.
+        """
+        if work is None:
+            work = self.workspace(d.shape)
+        if not self.levels:
+            np.multiply(d, self.invb, out=out)
+            return out
+
+        # Reduce the right-hand side down to the one-row system.
+        rhs = d
+        for (m, alpha, gamma, _, _, _), (nxt, _, tmp) in zip(self.levels, work):
+            nr = (rhs.shape[-1] - 1) // 2
+            np.multiply(alpha, rhs[..., 0:2 * m:2], out=nxt)
+            nxt += rhs[..., 1::2]
+            np.multiply(gamma[..., :nr], rhs[..., 2:2 * nr + 2:2], out=tmp[..., :nr])
+            nxt[..., :nr] += tmp[..., :nr]
+            rhs = nxt
+        x = rhs * self.invb
+
+        # Back substitute the eliminated rows level by level.
+        for idx in range(len(self.levels) - 1, -1, -1):
+            m, _, _, a_even, c_even, invb_even = self.levels[idx]
+            rhs = d if idx == 0 else work[idx - 1][0]
+            full = out if idx == 0 else work[idx][1]
+            n = rhs.shape[-1]
+            ne = (n + 1) // 2
+            tmp = work[idx][2]
+            even = full[..., 0::2]
+            np.multiply(rhs[..., 0::2], invb_even, out=tmp)
+            full[..., 1::2] = x
+            even[...] = tmp
+            np.multiply(a_even[..., 1:], x[..., :ne - 1], out=tmp[..., :ne - 1])
+            even[..., 1:] -= tmp[..., :ne - 1]
+            np.multiply(c_even[..., :m], x, out=tmp[..., :m])
+            even[..., :m] -= tmp[..., :m]
+            x = full
+        return out
+
+
+@lru_cache(maxsize=32)
+def cn_factorization(nx, w, dtype="float64"):
+    """
+    Returns the cached factorization of the Crank-Nicolson matrix for a grid.
+
+    Solvers on the same grid with the same mesh ratio and precision share one factorization,
+    which is read-only.
+
+    Args:
+        nx (int): Number of grid points.
+        w (float): Mesh ratio alpha * dt / dx^2.
+        dtype (str): Name of the floating point type of the factorization.
+
+    Returns:
+        TridiagFactor: Factorization of ``cn_matrix(nx, w, dtype)``.
+    """
+    return TridiagFactor(*cn_matrix(nx, w, np.dtype(dtype)))
+
+
+def steady_matrix(nx, dtype=np.float64):
+    """
+    Builds the matrix of the steady state problem u'' = 0 in diagonal storage.
+
+    Interior rows hold the second difference (-1, 2, -1), the first and last rows
+    are identity rows that carry the boundary values.
+
+    Args:
+        nx (int): Number of grid points.
+        dtype (np.dtype): Floating point type of the matrix.
+
+    Returns:
+        np.ndarray: Array of shape (3, nx) holding the sub, main and super diagonals.
+    """
+    mat = np.zeros((3, nx), dtype)
+    mat[0, 1:-1] = -1.0
+    mat[1] = 2.0
+    mat[2, 1:-1] = -1.0
+    mat[1, 0] = 1.0
+    mat[1, -1] = 1.0
+    return mat
+
+
+@lru_cache(maxsize=32)
+def steady_factorization(nx, dtype="float64"):
+    """
+    Returns the cached factorization of the steady state matrix for a grid.
+
+    Args:
+        nx (int): Number of grid points.
+        dtype (str): Name of the floating point type of the factorization.
+
+    Returns:
+        TridiagFactor: Factorization of ``steady_matrix(nx, dtype)``.
+    """
+    return TridiagFactor(*steady_matrix(nx, np.dtype(dtype)))
+
+
+def thomas_factor(sub, diag, sup):
+    """
+    Reference LU factorization of a tridiagonal matrix, one row at a time.
+
+    Args:
+        sub (np.ndarray): Sub-diagonal.
+        diag (np.ndarray): Main diagonal.
+        sup (np.ndarray): Super-diagonal.
+
+    Returns:
+        tuple: Multipliers of L and the diagonal of U.
+    """
+    lower = np.zeros_like(sub)
+    upper = np.array(diag, copy=True)
+    for idx in range(1, len(upper)):
+        assert (upper[idx - 1] != 0.0)
+        # Store the multiplier in L.
+        lower[idx] = sub[idx] / upper[idx - 1]
+        # Modify the diagonal entry in the next column.
+        upper[idx] = upper[idx] - lower[idx] * sup[idx - 1]
+    assert (upper[-1] != 0.0)
+    return lower, upper
+
+
+def thomas_solve(lower, upper, sup, x):
+    """
+    Reference forward and back substitution with factors from ``thomas_factor``.
+
+    Args:
+        lower (np.ndarray): Multipliers of L.
+        upper (np.ndarray): Diagonal of U.
+        sup (np.ndarray): Super-diagonal of the matrix.
+        x (np.ndarray): Right-hand side, overwritten with the solution.
+    """
+    nx = len(x)
+    # Solve L * Y = B.
+    for idx in range(1, nx):
+        x[idx] = x[idx] - lower[idx] * x[idx - 1]
+
+    # Solve U * X = Y.
+    for idx in range(nx, 0, -1):
+        x[idx - 1] = x[idx - 1] / upper[idx - 1]
+        if 1 < idx:
+            x[idx - 2] = x[idx - 2] - sup[idx - 2] * x[idx - 1]
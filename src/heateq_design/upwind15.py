@@ -1,4 +1,5 @@
 from .heateq import HeatEq
+from .kernels import upwind15_coefficients, upwind15_loop, upwind15_step
 
 
 class UpWind15(HeatEq):
@@ -12,10 +13,21 @@ class UpWind15(HeatEq):
         update_solution():
             Updates the solution using the Upwind 1.5 algorithm.
 
+        advance():
+            Advances the solution by a number of Upwind 1.5 steps.
+
+        diffusivity():
+            Returns alpha^2, the diffusivity of the equation the scheme solves.
+
+        stable_dt():
+            Returns the largest stable time step, k = alpha^2 * dt / dx^2 <= 0.5.
+
     Attributes:
         Inherits attributes from the base class HeatEq.
 
     """
+    __slots__ = ()
+
     def initialize(self):
         """
         Initializes the Upwind 1.5 scheme by setting the initial conditions.
@@ -29,24 +41,57 @@ class UpWind15(HeatEq):
         Returns:
             bool: True if the update is successful, False otherwise.
         """
-        f2 = 1.0 / 24
-        f1 = 1.0 / 6
-        f0 = 1.0 / 4
-        k = self.alpha * self.alpha * self.dt / (self.dx * self.dx)
-        k2 = k * k
+        k = self.ratio(self.alpha * self.alpha)
 
         self.curr[0] = self.bc0
-        self.curr[1] = self.last[1] + k * (self.last[0] - 2 * self.last[1] + self.last[2])
-        self.curr[self.Nx - 2] = self.last[self.Nx - 2] + k * \
-                                 (self.last[self.Nx - 3] -
-                                  2 * self.last[self.Nx - 2] +
-                                  self.last[self.Nx - 1])
+        if self.kernel == "python":
+            upwind15_loop(self.last, self.curr, k)
+        else:
+            upwind15_step(self.last, self.curr, k, upwind15_coefficients(k), self.work)
         self.curr[self.Nx - 1] = self.bc1
-        for idx in range(2, self.Nx - 2):
-            self.curr[idx] = f2 * (12 * k2 - 2 * k) * self.last[idx - 2] \
-                             + f2 * (12 * k2 - 2 * k) * self.last[idx + 2] \
-                             - f1 * (12 * k2 - 8 * k) * self.last[idx - 1] \
-                             - f1 * (12 * k2 - 8 * k) * self.last[idx + 1] \
-                             + f0 * (12 * k2 - 10 * k + 4) * self.last[idx]
 
         return True
+
+    def advance(self, steps):
+        """
+        Advances the solution by a number of Upwind 1.5 steps without computing the solution change.
+
+        The stencil weights are computed once for all steps, and the solution
+        vectors are swapped after every step, leaving the newest solution in ``last``.
+
+        Args:
+            steps (int): Number of time steps.
+
+        Returns:
+            bool: True if the updates are successful, False otherwise.
+        """
+        if self.kernel == "python":
+            return super().advance(steps)
+        k = self.ratio(self.alpha * self.alpha)
+        coeffs = upwind15_coefficients(k)
+        last, curr, work = self.last, self.curr, self.work
+        for _ in range(steps):
+            upwind15_step(last, curr, k, coeffs, work)
+            curr[0] = self.bc0
+            curr[-1] = self.bc1
+            last, curr = curr, last
+        self.last, self.curr = last, curr
+        return True
+
+    def diffusivity(self):
+        """
+        Returns alpha^2, the diffusivity of the equation the Upwind 1.5 stencil solves.
+        """
+        return self.alpha * self.alpha
+
+    def stable_dt(self):
+        """
+        Returns the largest stable time step, where k = alpha^2 * dt / dx^2 <= 0.5.
+
+        The five point interior stencil is stable up to k = 2/3, the three point
+        stencil next to the boundaries only up to k = 1/2.
+
+        Returns:
+            float: The time step limit.
+        """
+        return 0.5 * self.dx * self.dx / (self.alpha * self.alpha)
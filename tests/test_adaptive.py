@@ -0,0 +1,63 @@
+from heateq_design.adaptive import AdaptiveSolver
+from heateq_design.crankn import CrankN
+from heateq_design.ftcs import FTCS
+from heateq_design.output import load_snapshots
+from heateq_design.profiling import PhaseTimer
+from pytest import approx
+import numpy as np
+import os.path
+
+
+def test_adaptive_crankn_takes_fewer_steps(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reference = CrankN(1.0, 2.0, 0.2, 0.02, 0.0005, 0, 1, 'step(0,0.5,1)', 0, 0)
+    reference.solve('reference', noout=1)
+
+    heat_solver = CrankN(1.0, 2.0, 0.2, 0.02, 0.0005, 0, 1, 'step(0,0.5,1)', 0, 50)
+    adaptive = AdaptiveSolver(heat_solver, tol=1e-3)
+    assert adaptive.solve('adaptive', output="npy")
+    assert adaptive.t == approx(2.0)
+    assert heat_solver.iterations < reference.iterations / 4
+    assert max(adaptive.dts) > 10 * min(adaptive.dts)
+    assert heat_solver.curr == approx(reference.curr, abs=1e-3)
+
+    data, meta = load_snapshots(os.path.join('adaptive', 'adaptive'))
+    assert meta["times"][-1] == approx(2.0)
+    assert meta["times"][1:-1] == approx([adaptive.times[ti] for ti in meta["steps"][1:-1]])
+    steps = np.loadtxt(os.path.join('adaptive', 'adaptive_steps.txt'))
+    assert len(steps) == heat_solver.iterations
+
+
+def test_adaptive_explicit_respects_stability(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    heat_solver = FTCS(1.0, 0.5, 0.2, 0.02, 0.01, 0, 1, 'const(1)', 0, 0)
+    adaptive = AdaptiveSolver(heat_solver)
+    assert adaptive.solve('explicit', noout=1)
+    assert max(adaptive.dts) <= heat_solver.stable_dt()
+    assert np.all(np.isfinite(heat_solver.curr))
+
+
+def test_adaptive_change_threshold(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reference = CrankN(1.0, -0.001, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0)
+    reference.solve('reference', noout=1)
+
+    heat_solver = CrankN(1.0, -0.001, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0)
+    adaptive = AdaptiveSolver(heat_solver)
+    assert adaptive.solve('threshold', noout=1)
+    assert adaptive.t == approx(reference.iterations * reference.dt, rel=0.05)
+    assert heat_solver.curr == approx(reference.curr, abs=1e-2)
+    assert heat_solver.iterations < reference.iterations
+
+
+def test_adaptive_default_tolerance_and_profile(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reference = CrankN(1.0, 2.0, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0)
+    reference.solve('reference', noout=1)
+
+    heat_solver = CrankN(1.0, 2.0, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0)
+    heat_solver.profiler = PhaseTimer()
+    assert AdaptiveSolver(heat_solver).solve('default', noout=1)
+    assert heat_solver.iterations < reference.iterations / 2
+    assert heat_solver.profiler.calls["update"] >= heat_solver.iterations
+    assert heat_solver.curr == approx(reference.curr, abs=1e-2)
@@ -0,0 +1,38 @@
+from heateq_design.crankn import CrankN
+from heateq_design.ftcs import FTCS
+from heateq_design.upwind15 import UpWind15
+from pytest import approx, raises
+import numpy as np
+import tracemalloc
+
+
+def test_event_steps_do_not_allocate():
+    for scheme in (FTCS, UpWind15, CrankN):
+        heat_solver = scheme(1.0, 1e-3, 0.2, 1e-5, 1e-10, 0, 1, 'step(0,0.5,1)', 0, 0)
+        states = heat_solver.iter_states(every=1, reduce=True)
+        for _ in range(3):
+            next(states)
+        tracemalloc.start()
+        try:
+            for _ in range(20):
+                next(states)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            states.close()
+        # far below one solution vector of 800 kB
+        assert peak < 20000
+
+
+def test_lean_state():
+    heat_solver = FTCS(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'step(0,0.5,1)', 0, 0)
+    assert heat_solver._exact is None and heat_solver.errors is None
+    assert heat_solver.exact.shape == (heat_solver.Nx,)
+    assert heat_solver.exact is heat_solver.exact
+    with raises(AttributeError):
+        heat_solver.unknown_setting = 1
+
+    heat_solver.initialize()
+    heat_solver.update_solution()
+    expected = np.sum((heat_solver.curr - heat_solver.last) ** 2) / heat_solver.Nx
+    assert heat_solver.change_norm() == approx(expected)
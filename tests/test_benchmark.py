@@ -0,0 +1,27 @@
+from heateq_design.benchmark import compare_results, load_results, run_benchmarks, save_results
+from heateq_design.__main__ import main
+from click.testing import CliRunner
+from pytest import approx
+
+
+def test_run_benchmarks(tmp_path):
+    results = run_benchmarks(["ftcs", "crankn"], [100], [5, 10], output="curve", snapshots=3)
+    assert [(r["scheme"], r["steps"]) for r in results] == [("ftcs", 5), ("ftcs", 10), ("crankn", 5), ("crankn", 10)]
+    for result in results:
+        assert result["solve"] > 0 and result["setup"] > 0 and result["io"] > 0
+        assert result["points_per_s"] == approx(result["steps_per_s"] * 100)
+        assert result["nx"] == 100
+
+    file_name = str(tmp_path / "bench.json")
+    save_results(results, file_name)
+    baseline = load_results(file_name)
+    assert compare_results(results, baseline) == []
+    slower = [dict(result, solve=result["solve"] * 2) for result in results]
+    assert len(compare_results(slower, baseline, tolerance=0.5)) == 4
+
+
+def test_bench_cli(tmp_path):
+    result = CliRunner().invoke(main, ["bench", "--alg", "upwind15", "--nx", "101", "--steps", "5",
+                                       "--save", str(tmp_path / "bench.json")])
+    assert result.exit_code == 0, result.output
+    assert len(load_results(str(tmp_path / "bench.json"))) == 1
@@ -0,0 +1,109 @@
+from heateq_design.cache import ResultCache, config_key, solve_config
+from heateq_design.__main__ import main
+from heateq_design.crankn import CrankN
+from heateq_design.ftcs import FTCS
+from heateq_design.output import RecordingWriter, load_snapshots
+from heateq_design.sweep import expand_grid, run_sweep
+from click.testing import CliRunner
+from pytest import approx, raises
+import numpy as np
+import os
+import os.path
+
+
+def test_config_key():
+    key = config_key(solve_config(FTCS(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0)))
+    assert key == config_key(solve_config(FTCS(1, 0.5, 0.2, 0.1, 0.004, 0.0, 1.0, 'const(1.0)', 100, 0)))
+    assert key != config_key(solve_config(FTCS(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 10)))
+    assert key != config_key(solve_config(CrankN(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0)))
+    assert key != config_key(solve_config(FTCS(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0), "steady"))
+    with raises(ValueError):
+        ResultCache(max_bytes=0)
+
+
+def test_cache_hit(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    heat_solver = CrankN(1.0, 0.5, 0.2, 0.02, 0.002, 0, 1, 'step(0,0.5,1)', 0, 50)
+    heat_solver.track_errors()
+    assert cache.solve(heat_solver, str(tmp_path / "first"), output="npy") == (True, False)
+
+    again = CrankN(1.0, 0.5, 0.2, 0.02, 0.002, 0, 1, 'step(0,0.5,1)', 0, 50)
+    again.track_errors()
+    assert cache.solve(again, str(tmp_path / "second"), output="npy") == (True, True)
+    assert again.curr == approx(heat_solver.curr, abs=0)
+    assert (again.iterations, again.change) == (heat_solver.iterations, heat_solver.change)
+    assert again.error_history == approx(heat_solver.error_history)
+    first, meta = load_snapshots(str(tmp_path / "first" / "first"))
+    second, cached_meta = load_snapshots(str(tmp_path / "second" / "second"))
+    assert np.array_equal(first, second)
+    assert cached_meta["steps"] == meta["steps"] and cached_meta["final"]
+    assert cached_meta["times"] == approx(meta["times"])
+    assert os.path.isfile(str(tmp_path / "second" / "second_errors.txt"))
+
+    # a solve without output restores the final state only
+    quiet = CrankN(1.0, 0.5, 0.2, 0.02, 0.002, 0, 1, 'step(0,0.5,1)', 0, 50)
+    quiet.track_errors()
+    assert cache.solve(quiet, "", noout=1) == (True, True)
+    assert quiet.curr == approx(heat_solver.curr, abs=0)
+
+
+def test_cache_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=1 << 20)
+    for maxt in (0.1, 0.2, 0.3):
+        cache.solve(FTCS(1.0, maxt, 0.2, 0.01, 0.0002, 0, 1, 'const(1)', 0, 0), "", noout=1)
+    entries = sorted(cache.entries())
+    assert len(entries) == 3
+    size = max(size for _, size, _ in entries)
+
+    # reading the oldest entry makes it the most recently used
+    oldest = entries[0][2]
+    os.utime(oldest, ns=(entries[0][0] - 10 ** 9, entries[0][0] - 10 ** 9))
+    assert cache.solve(FTCS(1.0, 0.1, 0.2, 0.01, 0.0002, 0, 1, 'const(1)', 0, 0), "", noout=1)[1]
+    cache.max_bytes = 2 * size
+    assert cache.evict() == 1
+    assert os.path.isfile(oldest)
+    assert cache.size() <= cache.max_bytes
+
+    # entries larger than the cache are not stored
+    small = ResultCache(str(tmp_path / "small"), max_bytes=100)
+    assert small.solve(FTCS(1.0, 0.1, 0.2, 0.01, 0.0002, 0, 1, 'const(1)', 0, 0), "", noout=1) == (True, False)
+    assert small.entries() == []
+
+    # snapshots beyond the bound are not kept in memory
+    record = RecordingWriter(11, max_bytes=3 * 11 * 8)
+    for ti in range(3):
+        record.write(ti, np.full(11, ti, float), t=ti * 0.5)
+    assert record.steps == [0, 1, 2] and record.times == [0.0, 0.5, 1.0] and not record.overflow
+    record.write(3, np.zeros(11), True)
+    assert record.overflow and record.final and len(record.snapshots) == 0
+    bounded = ResultCache(str(tmp_path / "bounded"), max_bytes=4096)
+    assert bounded.solve(FTCS(1.0, 0.1, 0.2, 0.1, 0.002, 0, 1, 'const(1)', 0, 1), "", noout=1) == (True, False)
+    assert bounded.entries() == []
+
+    # a corrupt entry is a miss
+    with open(oldest, 'wb') as out_f:
+        out_f.write(b'broken')
+    assert cache.solve(FTCS(1.0, 0.1, 0.2, 0.01, 0.0002, 0, 1, 'const(1)', 0, 0), "", noout=1)[1] is False
+
+
+def test_cache_cli(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("HEATEQ_CACHE_DIR", str(tmp_path / "cache"))
+    args = ["--alg", "crankn", "--maxt", "0.5", "--savi", "50", "--outi", "0"]
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 0, result.output
+    assert "cache" not in result.output
+    with open(os.path.join("heat_results", "heat_results_soln_final.curve")) as in_f:
+        final = in_f.read()
+    os.remove(os.path.join("heat_results", "heat_results_soln_final.curve"))
+
+    result = CliRunner().invoke(main, args)
+    assert "Result restored from cache." in result.output
+    with open(os.path.join("heat_results", "heat_results_soln_final.curve")) as in_f:
+        assert in_f.read() == final
+    result = CliRunner().invoke(main, args + ["--no-cache"])
+    assert "cache" not in result.output
+
+    configs = expand_grid({"alg": ["crankn", "ftcs"], "maxt": [0.5], "savi": [50]})
+    records = run_sweep(configs, "sweep", jobs=1, noout=True, cache=ResultCache())
+    assert [record["result"]["cached"] for record in records] == [True, False]
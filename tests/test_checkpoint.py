@@ -0,0 +1,71 @@
+from heateq_design.checkpoint import checkpoint_file, load_checkpoint
+from heateq_design.crankn import CrankN
+from heateq_design.ftcs import FTCS
+from heateq_design.output import load_snapshots
+from pytest import raises
+import numpy as np
+import os.path
+
+
+class Interrupt(Exception):
+    pass
+
+
+def kill_at(step):
+    def observer(solver, metrics):
+        if metrics["step"] == step:
+            raise Interrupt()
+    return observer
+
+
+def test_restart_matches_uninterrupted(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for scheme in (FTCS, CrankN):
+        for output in ("curve", "npy"):
+            full = scheme(1.0, 1.0, 0.2, 0.05, 0.004, 0, 1, 'step(0,0.5,1)', 0, 20)
+            full.track_errors()
+            full.solve('full', output=output)
+
+            killed = scheme(1.0, 1.0, 0.2, 0.05, 0.004, 0, 1, 'step(0,0.5,1)', 0, 20)
+            killed.chki = 30
+            killed.track_errors()
+            killed.add_observer(kill_at(140))
+            with raises(Interrupt):
+                killed.solve('restart', output=output)
+
+            restarted = scheme(1.0, 1.0, 0.2, 0.05, 0.004, 0, 1, 'step(0,0.5,1)', 0, 20)
+            restarted.chki = 30
+            restarted.track_errors()
+            assert restarted.solve('restart', output=output, restart=True)
+            assert restarted.iterations == full.iterations
+            assert np.array_equal(restarted.curr, full.curr)
+            assert restarted.change == full.change
+            assert np.array_equal(restarted.error_history, full.error_history)
+            assert (tmp_path / 'full' / 'full_errors.txt').read_text() == \
+                   (tmp_path / 'restart' / 'restart_errors.txt').read_text()
+
+            if output == "npy":
+                data, meta = load_snapshots(os.path.join('restart', 'restart'))
+                full_data, full_meta = load_snapshots(os.path.join('full', 'full'))
+                assert meta["steps"] == full_meta["steps"]
+                assert np.array_equal(data, full_data)
+            else:
+                names = sorted(name for name in os.listdir('full') if name.endswith('.curve'))
+                assert [name.replace('full', 'restart') for name in names] == \
+                       sorted(name for name in os.listdir('restart') if name.endswith('.curve'))
+                for name in names:
+                    assert (tmp_path / 'full' / name).read_text() == \
+                           (tmp_path / 'restart' / name.replace('full', 'restart')).read_text()
+
+
+def test_checkpoint_rejects_other_settings(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    heat_solver = FTCS(1.0, 0.2, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0)
+    heat_solver.chki = 10
+    heat_solver.solve('ckpt')
+    file_name = checkpoint_file(os.path.join('ckpt', 'ckpt'))
+    assert load_checkpoint(file_name, FTCS(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0)) == 40
+    with raises(ValueError, match="alpha"):
+        load_checkpoint(file_name, FTCS(1.0, 0.2, 0.1, 0.1, 0.004, 0, 1, 'const(1)', 0, 0))
+    with raises(ValueError, match="scheme"):
+        load_checkpoint(file_name, CrankN(1.0, 0.2, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0))
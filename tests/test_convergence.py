@@ -0,0 +1,64 @@
+from heateq_design.convergence import analyze, format_report, level_configs, prolong, run_levels, run_study, save_report
+from heateq_design.sweep import DEFAULTS
+from heateq_design.__main__ import main
+from click.testing import CliRunner
+from pytest import approx, raises
+import json
+import numpy as np
+import os.path
+
+
+def test_level_configs():
+    configs = level_configs(dict(DEFAULTS, alg="crankn", maxt=-0.01), 3)
+    assert [config["dt"] for config in configs] == approx([0.004, 0.001, 0.00025])
+    assert [config["maxt"] for config in configs] == approx([-0.01, -0.0025, -0.000625])
+    assert configs[2]["dx"] == approx(0.025)
+    with raises(ValueError):
+        level_configs(dict(DEFAULTS, ic="rand(1,0,1)"), 3)
+    with raises(ValueError):
+        level_configs(DEFAULTS, 1)
+    assert prolong(np.array([0.0, 1.0, 3.0]), 2) == approx([0, 0.5, 1, 2, 3])
+
+
+def test_observed_order(tmp_path):
+    for alg in ("ftcs", "crankn"):
+        report = run_study(dict(DEFAULTS, alg=alg, ic="sin(PI*x)", bc1=0.0, maxt=0.1, dt=0.002), levels=3, jobs=2)
+        rows = report["levels"]
+        assert [row["nx"] for row in rows] == [11, 21, 41]
+        assert [row["time"] for row in rows] == approx([0.1] * 3)
+        assert report["observed_order"] == approx(2, abs=0.05)
+        # the extrapolated solution is far more accurate than the finest level
+        assert report["extrapolated_error"] < rows[-1]["error"] / 20
+        assert report["finest_error_estimate"] == approx(rows[-1]["error"], rel=0.1)
+
+    save_report(report, str(tmp_path / "study"))
+    with open(str(tmp_path / "study" / "study_convergence.json")) as in_f:
+        saved = json.load(in_f)
+    assert saved["levels"][2]["error"] == rows[2]["error"] and len(saved["extrapolated"]) == 11
+    assert os.path.isfile(str(tmp_path / "study" / "study_extrapolated.curve"))
+
+
+def test_warm_start():
+    configs = level_configs(dict(DEFAULTS, alg="crankn", maxt=-0.001), 3)
+    warm = run_levels(configs, warm_start=True)
+    cold = run_levels(configs, warm_start=False)
+    assert warm[0]["steps"] == cold[0]["steps"]
+    assert sum(result["steps"] for result in warm[1:]) < sum(result["steps"] for result in cold[1:]) / 10
+    # both stop at about the same distance from steady state
+    warm_report, cold_report = analyze(configs, warm), analyze(configs, cold)
+    assert warm_report["error_kind"] == "steady"
+    assert warm_report["observed_order"] is None and warm_report["extrapolated"] is None
+    assert "no order or extrapolation" in format_report(warm_report)
+    assert [row["error"] for row in warm_report["levels"]] == approx(
+        [row["error"] for row in cold_report["levels"]], rel=0.05)
+
+
+def test_converge_cli(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = CliRunner().invoke(main, ["converge", "--ic", "sin(PI*x)", "--bc1", "0", "--maxt", "0.1",
+                                       "--levels", "3", "--no-cache"])
+    assert result.exit_code == 0, result.output
+    assert "Observed order: 1.9" in result.output
+    assert (tmp_path / "heat_convergence" / "heat_convergence_convergence.txt").is_file()
+    result = CliRunner().invoke(main, ["converge", "--ic", "spikes(0,1,5)", "--no-cache"])
+    assert result.exit_code != 0 and "depends on the grid" in result.output
@@ -0,0 +1,42 @@
+from heateq_design.ensemble import HeatEqEnsemble
+from heateq_design.ftcs import FTCS
+from heateq_design.upwind15 import UpWind15
+from heateq_design.crankn import CrankN
+from pytest import approx, raises
+
+SCHEMES = {"ftcs": FTCS, "upwind15": UpWind15, "crankn": CrankN}
+
+
+def test_members_match_standalone_runs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    alpha = [0.2, 0.1, 0.2, 0.05]
+    bc0 = [0, 1, 0.5, 0]
+    bc1 = [1, 0, 0.5, 2]
+    ic = ['const(1)', 'ramp(0,1)', 'step(0,0.5,1)', 'spikes(0,5,5)']
+    for alg, scheme in SCHEMES.items():
+        ensemble = HeatEqEnsemble(alg, 1.0, 0.5, 0.1, 0.004, alpha, bc0, bc1, ic)
+        result = ensemble.solve()
+        assert result.shape == (4, 11)
+        for member in range(4):
+            heat_solver = scheme(1.0, 0.5, alpha[member], 0.1, 0.004, bc0[member], bc1[member], ic[member], 0, 0)
+            heat_solver.solve('{0}_{1}'.format(alg, member))
+            assert result[member] == approx(heat_solver.curr, rel=1e-10, abs=1e-12)
+
+
+def test_members_stop_at_change_threshold(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    alpha = [0.2, 0.05]
+    for alg, scheme in SCHEMES.items():
+        ensemble = HeatEqEnsemble(alg, 1.0, -0.001, 0.1, 0.004, alpha, 0, 1, 'step(0,0.5,1)')
+        result = ensemble.solve()
+        for member in range(2):
+            heat_solver = scheme(1.0, -0.001, alpha[member], 0.1, 0.004, 0, 1, 'step(0,0.5,1)', 0, 0)
+            heat_solver.solve('{0}_{1}'.format(alg, member), noout=1)
+            assert result[member] == approx(heat_solver.curr, rel=1e-10, abs=1e-12)
+            assert ensemble.change[member] == approx(heat_solver.change)
+        assert ensemble.iterations[0] != ensemble.iterations[1]
+
+
+def test_unstable_ftcs_members_are_rejected():
+    with raises(ValueError):
+        HeatEqEnsemble("ftcs", 1.0, 0.5, 0.1, 0.004, [0.2, 2.0], 0, 1, 'const(1)')
@@ -0,0 +1,58 @@
+from heateq_design.crankn import CrankN
+from heateq_design.exact import ExactSolution, ErrorTracker, HISTORY_COLUMNS
+from heateq_design.ftcs import FTCS
+from heateq_design.upwind15 import UpWind15
+from pytest import approx, raises
+import numpy as np
+import os.path
+
+
+def test_exact_solution():
+    x = np.linspace(0.0, 1.0, 101)
+    out = np.zeros(101)
+    exact = ExactSolution('sin(PI*x)', 0, 0, 1.0, 0.2, 101)
+    assert exact.evaluate(0.3, out) == approx(np.sin(np.pi * x) * np.exp(-0.2 * np.pi ** 2 * 0.3), abs=1e-12)
+    assert ExactSolution('ramp(0.5,2)', 0.5, 2, 1.0, 0.2, 101).evaluate(0.1, out) == approx(0.5 + 1.5 * x)
+
+    # the series of a step sums to the step, away from the jump
+    exact = ExactSolution('step(0,0.5,1)', 0, 1, 1.0, 0.2, 101)
+    assert exact.evaluate(1e-7, out)[1:40] == approx(0, abs=1e-3)
+    assert exact.evaluate(1e-7, out)[60:] == approx(1, abs=1e-3)
+    assert exact.evaluate(100.0, out) == approx(x)
+    assert len(exact.basis) >= exact.modes(1e-7)
+
+    with raises(ValueError):
+        ExactSolution('rand(1,0,1)', 0, 1, 1.0, 0.2, 101)
+
+
+def test_error_history(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    errors = []
+    for dx in (0.02, 0.01):
+        heat_solver = CrankN(1.0, 0.5, 0.2, dx, dx * dx, 0, 1, 'const(1)', 0, 50)
+        heat_solver.track_errors()
+        heat_solver.solve('errors')
+        history = heat_solver.error_history
+        assert history.shape == (len(heat_solver.error_history), len(HISTORY_COLUMNS))
+        assert history[0, 1:] == approx(0)
+        assert history[-1, 1] == approx(0.5)
+        assert np.all(history[:, 2] <= history[:, 3]) and np.all(history[:, 3] <= history[:, 4])
+        errors.append(history[-1, 3])
+    # second order in space
+    assert errors[0] / errors[1] == approx(4, rel=0.05)
+    saved = np.loadtxt(os.path.join('errors', 'errors_errors.txt'))
+    assert saved == approx(history)
+
+    heat_solver = UpWind15(1.0, 0.5, 0.2, 0.01, 0.0002, 0, 0, 'sin(PI*x)', 0, 0)
+    heat_solver.track_errors()
+    heat_solver.solve('', noout=1)
+    assert heat_solver.error_history[-1, 4] < 1e-4
+
+
+def test_tracker_grows():
+    tracker = ErrorTracker(ExactSolution('const(1)', 1, 1, 1.0, 0.2, 11))
+    for step in range(40):
+        tracker.record(step, 0.01 * step, np.ones(11))
+    assert tracker.history.shape == (40, 5)
+    assert tracker.history[:, 2:] == approx(0)
+    assert FTCS(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0).error_history.shape == (0, 5)
@@ -0,0 +1,42 @@
+from heateq_design.ftcs import FTCS
+from heateq_design.initial import CACHE_MAX_NX, InitialCondition, initial_values
+from pytest import approx, raises
+import numpy as np
+
+
+def test_forms():
+    x = np.arange(11) * 0.1
+    assert np.array_equal(InitialCondition('const(2.5)').evaluate(11, 0.1), np.full(11, 2.5))
+    assert np.array_equal(InitialCondition('step(0,0.5,1)').evaluate(11, 0.1), np.where(x < 0.5, 0.0, 1.0))
+    assert InitialCondition('ramp(1, 3)').evaluate(11, 0.1) == approx(1 + 2 * x)
+    assert InitialCondition('sin(PI*x)').evaluate(11, 0.1) == approx(np.sin(np.pi * x))
+    spikes = InitialCondition('spikes(1,5,2,-3,7,9,40)')
+    assert spikes.args == (1.0, (5.0, 2), (-3.0, 7), (9.0, 40))
+    assert np.array_equal(spikes.evaluate(11, 0.1), [1, 1, 5, 1, 1, 1, 1, -3, 1, 1, 1])
+
+    rand = InitialCondition('rand(7,1,0.5)').evaluate(1000, 0.001)
+    assert np.array_equal(rand, InitialCondition('rand(7,1,0.5)').evaluate(1000, 0.001))
+    assert 0.5 <= rand.min() < 0.6 and 1.4 < rand.max() <= 1.5
+
+
+def test_invalid_forms():
+    for ic in ('cos(1)', 'const(1', 'const(a)', 'step(0,1)', 'rand(0.5,1,1)', 'spikes(1,2)', 'sin(x)'):
+        with raises(ValueError):
+            InitialCondition(ic)
+    with raises(ValueError, match="step"):
+        FTCS(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'step(0)', 0, 0)
+
+
+def test_cached_values():
+    values = initial_values('step(0,0.5,1)', 101, 0.01, 'float32')
+    assert values is initial_values('step(0,0.5,1)', 101, 0.01, 'float32')
+    assert values.dtype == np.float32 and not values.flags.writeable
+    # large grids are not kept alive by the cache
+    large = initial_values('const(1)', CACHE_MAX_NX + 1, 1e-6)
+    assert large is not initial_values('const(1)', CACHE_MAX_NX + 1, 1e-6)
+    assert not large.flags.writeable
+
+    heat_solver = FTCS(1.0, 0.5, 0.2, 0.01, 0.0002, 0, 1, 'step(0,0.5,1)', 0, 0, prec="float")
+    heat_solver.initialize()
+    assert np.array_equal(heat_solver.last, values)
+    assert heat_solver.last.flags.writeable
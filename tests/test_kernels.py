@@ -0,0 +1,68 @@
+from heateq_design.kernels import ftcs_loop, ftcs_step, upwind15_coefficients, upwind15_loop, upwind15_step
+from heateq_design.ftcs import FTCS
+from heateq_design.upwind15 import UpWind15
+from pytest import approx
+import numpy as np
+
+
+def test_ftcs_step_matches_loop():
+    last = np.random.default_rng(1).random(101)
+    ref = last.copy()
+    out = last.copy()
+    ftcs_loop(last, ref, 0.3)
+    ftcs_step(last, out, 0.3)
+    assert out == approx(ref, rel=1e-12, abs=1e-14)
+
+
+def test_upwind15_step_matches_loop():
+    last = np.random.default_rng(2).random(101)
+    k = 0.08
+    ref = last.copy()
+    out = last.copy()
+    upwind15_loop(last, ref, k)
+    upwind15_step(last, out, k, upwind15_coefficients(k), np.zeros(99))
+    assert out == approx(ref, rel=1e-12, abs=1e-14)
+    # a scratch block smaller than the grid updates it block by block
+    blocked = last.copy()
+    upwind15_step(last, blocked, k, upwind15_coefficients(k), np.zeros(7))
+    assert np.array_equal(blocked, out)
+
+
+def test_blocked_change_norm():
+    heat_solver = FTCS(1.0, 0.5, 0.2, 0.01, 0.0002, 0, 1, 'step(0,0.5,1)', 0, 0)
+    heat_solver.initialize()
+    heat_solver.update_solution()
+    change = heat_solver.change_norm()
+    heat_solver.work = np.zeros(7)
+    assert heat_solver.change_norm() == approx(change, rel=1e-14)
+
+
+def test_kernel_modes_agree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for scheme in (FTCS, UpWind15):
+        results = []
+        for kernel in ("python", "numpy"):
+            heat_solver = scheme(1.0, 0.5, 0.2, 0.02, 0.0008, 0, 1, 'const(1)', 0, 0, kernel)
+            heat_solver.solve('kernel_' + kernel)
+            results.append(heat_solver.curr.copy())
+        assert results[1] == approx(results[0], rel=1e-10, abs=1e-12)
+
+
+def test_fused_steps_match_single_steps(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for scheme in (FTCS, UpWind15):
+        fused = scheme(1.0, 0.5, 0.2, 0.05, 0.002, 0, 1, 'step(0,0.5,1)', 0, 0)
+        fused.initialize()
+        single = scheme(1.0, 0.5, 0.2, 0.05, 0.002, 0, 1, 'step(0,0.5,1)', 0, 0)
+        single.initialize()
+        assert fused.advance(37)
+        for _ in range(37):
+            single.update_solution()
+            single.last[:] = single.curr
+        assert np.array_equal(fused.last, single.last)
+
+        # a solve only computes the change at the last step when nothing is saved or printed
+        fused.solve('fused', noout=1)
+        assert fused.iterations == fused.time_steps() == 250
+        assert fused.change > 0
+        assert fused.next_event(0, 250) == 249
@@ -0,0 +1,94 @@
+from heateq_design.crankn import CrankN
+from heateq_design.ftcs import FTCS
+from heateq_design.output import AsyncWriter, NpyWriter, export_curves, load_snapshots, snapshot_rows
+from pytest import approx, raises
+import numpy as np
+import os.path
+
+
+def test_npy_snapshots_match_curves(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    heat_solver = CrankN(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'step(0,0.5,1)', 0, 25)
+    heat_solver.solve('npy_run', output="npy")
+    data, meta = load_snapshots(os.path.join('npy_run', 'npy_run'))
+    assert data.shape == (snapshot_rows(125, 25), 11)
+    assert meta["steps"] == [0, 25, 50, 75, 100, 125]
+    # the state saved at step 25 holds the solution after 26 steps
+    assert meta["times"][1] == approx(26 * 0.004)
+    assert meta["times"][-1] == approx(125 * 0.004)
+    assert meta["scheme"] == "CrankN" and meta["final"]
+    assert np.array_equal(data[-1], heat_solver.curr)
+
+    heat_solver.solve('curve_run')
+    export_curves(os.path.join('npy_run', 'npy_run'))
+    for tag in (0, 50, 'final'):
+        name = '{0}_soln_{1}.curve'
+        assert (tmp_path / 'npy_run' / name.format('npy_run', tag)).read_text() == \
+               (tmp_path / 'curve_run' / name.format('curve_run', tag)).read_text()
+
+
+def test_early_stop_keeps_written_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    heat_solver = FTCS(1.0, 0.5, 0.2, 0.1, 0.04, 0, 1, 'const(1)', 0, 1)
+    assert not heat_solver.solve('unstable', output="npy")
+    data, meta = load_snapshots(os.path.join('unstable', 'unstable'))
+    assert len(data) == 1 and not meta["final"]
+
+
+class RecordingWriter:
+    def __init__(self, fail_at=None):
+        self.rows = []
+        self.closed = False
+        self.fail_at = fail_at
+
+    def write(self, ti, a, final=False, t=None):
+        if ti == self.fail_at:
+            raise IOError("disk full")
+        self.rows.append((ti, a.copy(), final))
+
+    def close(self):
+        self.closed = True
+
+
+def test_async_writer_copies_and_drains():
+    inner = RecordingWriter()
+    writer = AsyncWriter(inner, 5, depth=2)
+    a = np.zeros(5)
+    for ti in range(10):
+        a[:] = ti
+        writer.write(ti, a, final=ti == 9)
+    writer.close()
+    assert inner.closed
+    assert [ti for ti, _, _ in inner.rows] == list(range(10))
+    assert all(np.all(row == ti) for ti, row, _ in inner.rows)
+    assert inner.rows[-1][2]
+
+
+def test_async_writer_reports_errors():
+    writer = AsyncWriter(RecordingWriter(fail_at=3), 5, depth=2)
+    with raises(RuntimeError):
+        for ti in range(10):
+            writer.write(ti, np.zeros(5))
+        writer.close()
+
+
+def test_async_solve_matches_sync(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    FTCS(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 1).solve('sync_run', output="npy")
+    FTCS(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 1).solve('async_run', output="npy", outq=3)
+    sync_data, sync_meta = load_snapshots(os.path.join('sync_run', 'sync_run'))
+    async_data, async_meta = load_snapshots(os.path.join('async_run', 'async_run'))
+    assert np.array_equal(sync_data, async_data)
+    assert sync_meta["steps"] == async_meta["steps"]
+
+
+def test_npy_writer_grows_and_trims(tmp_path):
+    prefix = str(tmp_path / 'grow')
+    writer = NpyWriter(prefix, 0.1, 0.01, 4, 2, "FTCS")
+    for ti in range(7):
+        writer.write(ti, np.full(4, ti), t=ti * 0.5)
+    writer.close()
+    data, meta = load_snapshots(prefix)
+    assert np.load(prefix + '_soln.npy').shape == (7, 4)
+    assert np.array_equal(data[:, 0], np.arange(7))
+    assert meta["times"][-1] == 3.0
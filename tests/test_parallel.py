@@ -0,0 +1,58 @@
+from heateq_design.output import load_snapshots
+from heateq_design.parallel import PARALLEL_SCHEMES, chunk_grid, partition
+from heateq_design.sweep import SCHEMES
+from heateq_design.__main__ import main
+from click.testing import CliRunner
+from pytest import approx, raises
+import numpy as np
+import os.path
+
+
+def test_partition():
+    assert partition(1, 10, 3) == [(1, 4), (4, 7), (7, 10)]
+    assert chunk_grid("ftcs", 5, 8) == [(1, 2), (2, 3), (3, 4)]
+    assert chunk_grid("crankn", 11, 2) == [(0, 5), (5, 11)]
+
+
+def test_parallel_matches_serial(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for alg in ("ftcs", "upwind15", "crankn"):
+        args = (1.0, 0.2, 0.2, 0.01, 0.0002, 0.3, 1, 'step(0,0.5,1)', 0, 100)
+        serial = SCHEMES[alg](*args)
+        serial.solve('serial', output="npy")
+        parallel = PARALLEL_SCHEMES[alg](*args, workers=3)
+        assert parallel.solve('parallel', output="npy")
+        assert parallel.pool is None
+        assert parallel.iterations == serial.iterations
+        data, _ = load_snapshots(os.path.join('parallel', 'parallel'))
+        serial_data, _ = load_snapshots(os.path.join('serial', 'serial'))
+        if alg == "crankn":
+            assert data == approx(serial_data, abs=1e-12)
+        else:
+            assert np.array_equal(data, serial_data)
+
+
+def test_parallel_states_stop_workers():
+    args = (1.0, 0.2, 0.2, 0.01, 0.0002, 0, 1, 'step(0,0.5,1)', 0, 0)
+    serial = [state.solution for state in SCHEMES["ftcs"](*args).iter_states(every=250, copy=True)]
+    parallel = PARALLEL_SCHEMES["ftcs"](*args, workers=2)
+    states = parallel.iter_states(every=250)
+    next(states)
+    state = next(states)
+    assert parallel.pool is not None
+    states.close()
+    # the last state stays readable after the shared memory is freed
+    assert parallel.pool is None and np.array_equal(state.solution, serial[1])
+    assert np.array_equal([state.solution.copy() for state in parallel.iter_states(every=250)], serial)
+    assert parallel.pool is None
+
+
+def test_parallel_checks():
+    with raises(ValueError):
+        PARALLEL_SCHEMES["ftcs"](1.0, 0.2, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0, workers=0)
+    with raises(ValueError):
+        PARALLEL_SCHEMES["ftcs"](1.0, 0.2, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0, "python", workers=2)
+    unstable = PARALLEL_SCHEMES["ftcs"](1.0, 0.2, 0.2, 0.1, 0.04, 0, 1, 'const(1)', 0, 0, workers=2)
+    assert not unstable.solve('', noout=1)
+    result = CliRunner().invoke(main, ["--workers", "2", "--kernel", "python", "--noout", "1"])
+    assert result.exit_code == 2 and "numpy kernel" in result.output
@@ -0,0 +1,35 @@
+from heateq_design.ftcs import FTCS
+from heateq_design.upwind15 import UpWind15
+from heateq_design.crankn import CrankN
+from heateq_design.ensemble import HeatEqEnsemble
+from heateq_design.heateq import PRECISIONS
+from pytest import approx, raises
+import numpy as np
+
+TOLERANCE = {"half": 5e-2, "float": 1e-5, "double": 1e-12, "quad": 1e-12}
+
+
+def test_precisions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for scheme in (FTCS, UpWind15, CrankN):
+        reference = scheme(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'step(0,0.5,1)', 0, 0)
+        reference.solve('reference', noout=1)
+        for prec, dtype in PRECISIONS.items():
+            heat_solver = scheme(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'step(0,0.5,1)', 0, 0, "numpy", prec)
+            heat_solver.solve(prec, noout=1)
+            assert heat_solver.curr.dtype == dtype and heat_solver.last.dtype == dtype
+            assert heat_solver.curr.astype(float) == approx(reference.curr, abs=TOLERANCE[prec])
+
+
+def test_crankn_precision():
+    heat_solver = CrankN(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0, "numpy", "float")
+    assert heat_solver.cn_Amat.dtype == np.float32
+    assert heat_solver.cn_factor.dtype == np.float32
+    assert heat_solver.cn_factor is not CrankN(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0).cn_factor
+
+
+def test_ensemble_precision():
+    ensemble = HeatEqEnsemble("crankn", 1.0, 0.5, 0.1, 0.004, [0.1, 0.2], 0, 1, 'const(1)', "float")
+    assert ensemble.solve().dtype == np.float32
+    with raises(ValueError):
+        FTCS(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0, "numpy", "single")
@@ -0,0 +1,37 @@
+from heateq_design.ftcs import FTCS
+from heateq_design.profiling import PhaseTimer
+from pytest import approx, raises
+import json
+import numpy as np
+
+
+def test_phase_timer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    heat_solver = FTCS(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 50, 25)
+    heat_solver.profiler = PhaseTimer()
+    heat_solver.solve('profiled')
+    calls = heat_solver.profiler.calls
+    assert calls["advance"] + calls["update"] == heat_solver.iterations == 125
+    assert calls["write"] == 6
+    assert calls["print"] == 3
+    assert set(heat_solver.profiler.seconds) >= {"open", "init", "norm", "copy", "close"}
+    assert "advance" in heat_solver.profiler.format()
+    heat_solver.profiler.save('profile.json')
+    with open('profile.json') as in_f:
+        assert json.load(in_f)["total"] == approx(heat_solver.profiler.total())
+
+
+def test_observers(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reference = FTCS(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0)
+    reference.solve('reference', noout=1)
+
+    heat_solver = FTCS(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0)
+    seen = []
+    heat_solver.add_observer(lambda solver, metrics: seen.append((metrics, solver.curr.copy())), every=40)
+    heat_solver.solve('observed', noout=1)
+    assert [metrics["step"] for metrics, _ in seen] == [0, 40, 80, 120]
+    assert seen[1][0]["time"] == approx(41 * 0.004)
+    assert np.array_equal(heat_solver.curr, reference.curr)
+    with raises(ValueError):
+        heat_solver.add_observer(print, every=0)
@@ -0,0 +1,94 @@
+from heateq_design.cache import ResultCache
+from heateq_design.server import SolverServer, handle_request, serve_lines, submit
+from heateq_design.sweep import expand_grid, run_job
+from heateq_design.__main__ import main
+from click.testing import CliRunner
+from pytest import approx, raises
+import io
+import json
+import socket
+import subprocess
+import sys
+import threading
+
+
+def test_handle_request():
+    reply = handle_request('{"id": 7, "alg": "crankn", "maxt": 0.5, "ic": "step(0,0.5,1)"}')
+    expected = run_job(expand_grid({"alg": ["crankn"], "maxt": [0.5], "ic": ["step(0,0.5,1)"]})[0])
+    assert reply["id"] == 7 and reply["status"] == "ok" and not reply["cached"]
+    assert reply["umean"] == approx(expected["umean"], abs=0)
+    assert reply["iterations"] == expected["iterations"]
+
+    for line in ('{"alg": "bad"}', '{"beta": 1}', '{"id": 3, "dx": "wide"}', 'nonsense', '[1, 2]', '{"dx": 0}',
+                 '{"dt": -1}'):
+        reply = handle_request(line)
+        assert reply["status"] == "error" and reply["error"]
+    assert handle_request('{"id": 3, "dx": "wide"}')["id"] == 3
+
+
+def test_serve_lines(tmp_path):
+    requests = io.StringIO('{"id": 1, "maxt": 0.5}\n\n{"id": 2, "beta": 1}\n{"id": 3, "maxt": 0.5}\n')
+    out_f = io.StringIO()
+    assert serve_lines(requests, out_f, ResultCache(str(tmp_path))) == 3
+    replies = [json.loads(line) for line in out_f.getvalue().splitlines()]
+    assert [reply["id"] for reply in replies] == [1, 2, 3]
+    assert [reply["status"] for reply in replies] == ["ok", "error", "ok"]
+    assert [reply.get("cached") for reply in replies] == [False, None, True]
+
+    # a job failing at run time is answered too and the next request still runs
+    (tmp_path / "file").write_text("")
+    runame = str(tmp_path / "file" / "run")
+    requests = io.StringIO('{{"id": 1, "maxt": 0.1, "runame": {0}}}\n{{"id": 2, "maxt": 0.1}}\n'.format(
+        json.dumps(runame)))
+    out_f = io.StringIO()
+    assert serve_lines(requests, out_f) == 2
+    replies = [json.loads(line) for line in out_f.getvalue().splitlines()]
+    assert [reply["status"] for reply in replies] == ["error", "ok"]
+
+
+def test_serve_lines_keeps_stdout_for_replies(capsys):
+    assert serve_lines(io.StringIO('{"id": 1, "outi": 100}\n{"id": 2, "outi": 100}\n'), sys.stdout) == 2
+    captured = capsys.readouterr()
+    assert [json.loads(line)["id"] for line in captured.out.splitlines()] == [1, 2]
+    assert "Iteration 100" in captured.err
+    assert sys.stdout is not sys.stderr
+
+
+def test_socket_server(tmp_path):
+    path = str(tmp_path / "heateq.sock")
+    # a socket file left behind by a killed server is replaced, other files are kept
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(path)
+    (tmp_path / "data.txt").write_text("keep")
+    with raises(ValueError, match="not a socket"):
+        SolverServer(str(tmp_path / "data.txt"))
+    assert (tmp_path / "data.txt").read_text() == "keep"
+    server = SolverServer(path)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        replies = submit(path, [{"id": i, "alg": "ftcs", "alpha": 0.1 + 0.0005 * i} for i in range(200)])
+        runame = str(tmp_path / "run")
+        assert submit(path, [{"id": "out", "alg": "upwind15", "runame": runame}])[0]["status"] == "ok"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+    assert [reply["id"] for reply in replies] == list(range(200))
+    assert all(reply["status"] == "ok" for reply in replies)
+    assert (tmp_path / "run" / "run_soln_final.curve").is_file()
+    assert not (tmp_path / "heateq.sock").exists()
+
+
+def test_serve_cli(tmp_path, monkeypatch):
+    monkeypatch.setenv("HEATEQ_CACHE_DIR", str(tmp_path / "cache"))
+    result = CliRunner().invoke(main, ["serve", "--no-cache"], input='{"id": 1, "alg": "crankn"}\n')
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)["status"] == "ok"
+    assert not (tmp_path / "cache").exists()
+
+
+def test_lazy_imports():
+    # the command line only imports numpy once a command needs it
+    code = "import sys, heateq_design.__main__; print('numpy' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True, text=True).stdout.strip() == "False"
@@ -0,0 +1,80 @@
+from heateq_design.crankn import CrankN
+from heateq_design.ftcs import FTCS
+from heateq_design.heateq import Reduction
+from heateq_design.output import load_snapshots
+from pytest import approx, raises
+import numpy as np
+import os.path
+
+
+def test_states_match_saved_snapshots(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    heat_solver = CrankN(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'step(0,0.5,1)', 0, 25)
+    heat_solver.solve('saved', output="npy")
+    data, meta = load_snapshots(os.path.join('saved', 'saved'))
+
+    streamed = CrankN(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'step(0,0.5,1)', 0, 0)
+    states = list(streamed.iter_states(every=25, copy=True))
+    assert [state.step for state in states] == meta["steps"]
+    assert [state.final for state in states] == [False] * 5 + [True]
+    assert states[1].time == approx(26 * 0.004)
+    assert states[-1].time == approx(0.5)
+    assert np.array_equal(np.array([state.solution for state in states]), data)
+    assert streamed.iterations == heat_solver.iterations
+
+
+def test_state_views_are_read_only():
+    heat_solver = FTCS(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0)
+    states = heat_solver.iter_states(every=10)
+    state = next(states)
+    assert state.step == 0 and state.time == 0.0
+    with raises(ValueError):
+        state.solution[0] = 2.0
+    assert next(states).step == 10
+    states.close()
+
+
+def test_state_reductions():
+    heat_solver = FTCS(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'step(0,0.5,1)', 0, 0)
+    reference = FTCS(1.0, 0.5, 0.2, 0.1, 0.004, 0, 1, 'step(0,0.5,1)', 0, 0)
+    for reduced, state in zip(heat_solver.iter_states(every=20, reduce=True),
+                              reference.iter_states(every=20)):
+        assert isinstance(reduced, Reduction)
+        assert reduced.step == state.step and reduced.change == state.change
+        assert reduced.min == state.solution.min() and reduced.max == state.solution.max()
+        assert reduced.mean == approx(state.solution.mean())
+        assert reduced.l2 == approx(np.mean(state.solution ** 2))
+        assert reduced.linf == np.abs(state.solution).max()
+    assert reduced.final
+
+
+def test_state_reductions_half_precision():
+    # the sum of squares of 10^5 ones overflows float16, the norm is accumulated in float64
+    heat_solver = FTCS(1.0, 1e-10, 0.2, 1e-5, 1e-11, 1, 1, 'const(1)', 0, 0, prec="half")
+    reduced = next(heat_solver.iter_states(reduce=True))
+    assert reduced.mean == approx(1.0)
+    assert reduced.l2 == approx(1.0)
+
+
+def test_states_with_observer_interval(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    heat_solver = FTCS(1.0, 0.2, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0)
+    heat_solver.add_observer(lambda solver, metrics: None, every=3)
+    assert [state.step for state in heat_solver.iter_states(every=10)] == [0, 10, 20, 30, 40, 50]
+
+    saved = FTCS(1.0, 0.2, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 10)
+    saved.add_observer(lambda solver, metrics: None, every=7)
+    saved.solve('observed', output="npy")
+    assert load_snapshots(os.path.join('observed', 'observed'))[1]["steps"] == [0, 10, 20, 30, 40, 50]
+
+
+def test_threshold_final_state_time():
+    heat_solver = CrankN(1.0, -1e-4, 0.2, 0.05, 0.01, 0, 1, 'const(1)', 0, 0)
+    final = list(heat_solver.iter_states(copy=True))[-1]
+    assert final.final and final.step == heat_solver.iterations
+    assert final.time == approx(heat_solver.iterations * 0.01)
+
+    reference = CrankN(1.0, 0.5, 0.2, 0.05, 0.01, 0, 1, 'const(1)', 0, 0)
+    reference.initialize()
+    reference.advance(heat_solver.iterations)
+    assert np.array_equal(final.solution, reference.last)
@@ -0,0 +1,59 @@
+from heateq_design.crankn import CrankN
+from heateq_design.ftcs import FTCS
+from heateq_design.upwind15 import UpWind15
+from pytest import approx
+import numpy as np
+import os.path
+
+
+def test_steady_state_is_linear(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    heat_solver = FTCS(1.0, 2.0, 0.2, 0.1, 0.004, 0.5, 2, 'step(0,0.5,1)', 0, 0)
+    assert heat_solver.solve('steady', mode="steady")
+    assert heat_solver.curr == approx(np.linspace(0.5, 2, heat_solver.Nx))
+    assert heat_solver.iterations == 0
+    assert heat_solver.residual < 1e-12
+    assert heat_solver.change > 0
+    final = np.loadtxt(os.path.join('steady', 'steady_soln_final.curve'))
+    assert final[:, 1] == approx(np.linspace(0.5, 2, heat_solver.Nx), abs=1e-4)
+    assert os.path.isfile(os.path.join('steady', 'steady_soln_0.curve'))
+
+
+def test_steady_errors(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    heat_solver = CrankN(1.0, 2.0, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 0, 0)
+    heat_solver.track_errors()
+    assert heat_solver.solve('steady_err', mode="steady", warm=10)
+    history = np.loadtxt(os.path.join('steady_err', 'steady_err_errors.txt'))
+    assert history.shape == (2, 5)
+    assert list(history[:, 0]) == [0, 10] and history[0, 1] == 0 and history[1, 1] == np.inf
+    assert history[0, 2:] == approx(0, abs=1e-12)
+    # every grid represents the linear steady state exactly
+    assert history[1, 2:] == approx(0, abs=1e-12)
+
+
+def test_steady_matches_long_transient():
+    for scheme in (FTCS, UpWind15, CrankN):
+        transient = scheme(1.0, 60.0, 0.2, 0.05, 0.002, 0, 1, 'const(1)', 0, 0)
+        transient.solve('', noout=1)
+        steady = scheme(1.0, 60.0, 0.2, 0.05, 0.002, 0, 1, 'const(1)', 0, 0)
+        steady.solve('', noout=1, mode="steady")
+        assert steady.curr == approx(transient.curr, abs=1e-6)
+
+
+def test_steady_warm_start_change():
+    cold = CrankN(1.0, 2.0, 0.2, 0.05, 0.01, 0, 1, 'const(1)', 0, 0)
+    cold.solve('', noout=1, mode="steady")
+    warm = CrankN(1.0, 2.0, 0.2, 0.05, 0.01, 0, 1, 'const(1)', 0, 0)
+    warm.solve('', noout=1, mode="steady", warm=100)
+    assert warm.iterations == 100
+    assert warm.curr == approx(cold.curr)
+    assert warm.change < cold.change
+
+
+def test_change_threshold():
+    heat_solver = CrankN(1.0, -1e-4, 0.2, 0.05, 0.01, 0, 1, 'const(1)', 0, 0)
+    assert heat_solver.min_change == approx(1e-8)
+    heat_solver.solve('', noout=1)
+    assert 0 < heat_solver.iterations < 99999
+    assert heat_solver.change < 1e-8
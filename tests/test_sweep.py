@@ -0,0 +1,61 @@
+from heateq_design.sweep import expand_grid, load_grid, run_sweep, run_job, STATE_FILE
+from heateq_design.__main__ import main
+from click.testing import CliRunner
+from pytest import raises
+import json
+import os.path
+
+
+def test_expand_grid():
+    configs = expand_grid({"alg": ["ftcs", "crankn"], "alpha": [0.1, "0.2"]})
+    assert len(configs) == 4
+    assert configs[-1]["alg"] == "crankn" and configs[-1]["alpha"] == 0.2
+    assert configs[0]["ic"] == "const(1)"
+    with raises(ValueError):
+        expand_grid({"beta": [1]})
+
+
+def test_load_grid(tmp_path):
+    grid_file = tmp_path / "grid.json"
+    grid_file.write_text(json.dumps({"alg": "crankn", "dt": [0.004, 0.002]}))
+    assert load_grid(str(grid_file)) == {"alg": ["crankn"], "dt": [0.004, 0.002]}
+
+
+def test_sweep_resumes(tmp_path):
+    output_name = str(tmp_path / "sweep")
+    configs = expand_grid({"alg": ["ftcs", "upwind15"], "maxt": [0.5]})
+    done = []
+    records = run_sweep(configs, output_name, jobs=2, progress=done.append)
+    assert len(done) == 2
+    assert records[0]["result"] == dict(run_job(configs[0]), elapsed=records[0]["result"]["elapsed"])
+    assert os.path.isfile(os.path.join(output_name, "job_" + records[0]["job"], "job_" + records[0]["job"] + "_soln_final.curve"))
+
+    done.clear()
+    records = run_sweep(configs + expand_grid({"alg": ["crankn"], "maxt": [0.5]}), output_name, jobs=2,
+                        progress=done.append)
+    assert [record["config"]["alg"] for record in done] == ["crankn"]
+    assert len(records) == 3
+    with open(os.path.join(output_name, STATE_FILE)) as in_f:
+        assert len(in_f.readlines()) == 3
+
+
+def test_sweep_keeps_going_after_errors(tmp_path):
+    output_name = str(tmp_path / "sweep")
+    configs = expand_grid({"ic": ["const(1)", "step(0)"], "maxt": [0.5]})
+    records = run_sweep(configs, output_name, jobs=2, noout=True)
+    assert [record["result"]["status"] for record in records] == ["ok", "error"]
+    assert "step" in records[1]["result"]["error"]
+    with open(os.path.join(output_name, "summary.tsv")) as in_f:
+        assert len(in_f.readlines()) == 3
+    with open(os.path.join(output_name, STATE_FILE)) as in_f:
+        assert len(in_f.readlines()) == 1
+
+
+def test_sweep_cli(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("HEATEQ_CACHE_DIR", str(tmp_path / "cache"))
+    result = CliRunner().invoke(main, ["sweep", "--param", "alg=crankn", "--param", "ic=step(0,0.5,1)",
+                                       "--jobs", "1", "--noout", "1"])
+    assert result.exit_code == 0, result.output
+    assert "step(0,0.5,1)" in result.output
+    assert (tmp_path / "heat_sweep" / "summary.tsv").is_file()
@@ -0,0 +1,54 @@
+from heateq_design.tridiag import TridiagFactor, cn_factorization, cn_matrix, thomas_factor, thomas_solve
+from heateq_design.crankn import CrankN
+from pytest import approx
+import numpy as np
+
+
+def dense(sub, diag, sup):
+    return np.diag(diag) + np.diag(sub[1:], -1) + np.diag(sup[:-1], 1)
+
+
+def test_cyclic_reduction_matches_dense_solve():
+    rng = np.random.default_rng(3)
+    for n in range(1, 40):
+        sub, sup = rng.random(n), rng.random(n)
+        diag = 3.0 + rng.random(n)
+        d = rng.random(n)
+        x = TridiagFactor(sub, diag, sup).solve(d, np.empty(n))
+        assert x == approx(np.linalg.solve(dense(sub, diag, sup), d), rel=1e-10, abs=1e-12)
+
+
+def test_cyclic_reduction_batched():
+    rng = np.random.default_rng(4)
+    sub, sup = rng.random((3, 17)), rng.random((3, 17))
+    diag = 3.0 + rng.random((3, 17))
+    d = rng.random((3, 17))
+    factor = TridiagFactor(sub, diag, sup)
+    x = factor.solve(d, d.copy(), factor.workspace(d.shape))
+    for b in range(3):
+        assert x[b] == approx(np.linalg.solve(dense(sub[b], diag[b], sup[b]), d[b]), rel=1e-10)
+
+
+def test_thomas_matches_cyclic_reduction():
+    mat = cn_matrix(101, 0.8)
+    d = np.random.default_rng(5).random(101)
+    x = d.copy()
+    lower, upper = thomas_factor(*mat)
+    thomas_solve(lower, upper, mat[2], x)
+    assert x == approx(cn_factorization(101, 0.8).solve(d, np.empty(101)), rel=1e-12)
+
+
+def test_factorization_is_cached():
+    first = CrankN(1.0, 2.0, 0.2, 0.1, 0.004, 0, 1, 'const(1)', 100, 10)
+    second = CrankN(1.0, 2.0, 0.2, 0.1, 0.004, 0, 2, 'ramp(0,2)', 100, 10)
+    assert first.cn_factor is second.cn_factor
+
+
+def test_kernel_modes_agree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    results = []
+    for kernel in ("python", "numpy"):
+        heat_solver = CrankN(1.0, 0.5, 0.2, 0.02, 0.004, 0, 1, 'const(1)', 0, 0, kernel)
+        heat_solver.solve('crankn_' + kernel)
+        results.append(heat_solver.curr.copy())
+    assert results[1] == approx(results[0], rel=1e-10, abs=1e-12)